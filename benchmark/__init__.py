@@ -0,0 +1,2 @@
+"""热点路径微基准：无需连接设备，使用合成截图与桩识别器运行。
+用法：python -m benchmark [名称...]"""
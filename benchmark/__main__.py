@@ -0,0 +1,19 @@
+import sys
+
+from benchmark import ai_image, ai_latency, hub, matching, morphology, red_text, worker
+
+BENCHMARKS = {
+    "red_text": red_text.run,
+    "morphology": morphology.run,
+    "ai_image": ai_image.run,
+    "worker": worker.run,
+    "ai_latency": ai_latency.run,
+    "matching": matching.run,
+    "hub": hub.run,
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        print(f"== {name}")
+        BENCHMARKS[name]()
@@ -0,0 +1,53 @@
+"""AIResolver 图片预处理：逐张缩放 + 拼接 + 单独编码(旧) 与单次流水线(新) 对比"""
+
+from base64 import b64encode
+from io import BytesIO
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+from benchmark.common import bench
+from benchmark.fixtures import load
+
+
+def legacy_prepare(imgs: list[np.ndarray], pre_scale: float) -> str:
+    if pre_scale != 1.0:
+        imgs = [
+            np.array(
+                Image.fromarray(img).resize(
+                    (round(img.shape[1] * pre_scale), round(img.shape[0] * pre_scale)),
+                    Image.Resampling.LANCZOS,
+                )
+            )
+            for img in imgs
+        ]
+    max_h = max(img.shape[0] for img in imgs)
+    total_w = sum(img.shape[1] for img in imgs)
+    new_img = np.zeros((max_h, total_w, 3), dtype=np.uint8)
+    x_offset = 0
+    for img in imgs:
+        new_img[: img.shape[0], x_offset : x_offset + img.shape[1]] = img
+        x_offset += img.shape[1]
+    buffered = BytesIO()
+    Image.fromarray(new_img).filter(ImageFilter.SHARPEN).save(buffered, format="JPEG")
+    return "data:image/jpg;base64," + b64encode(buffered.getvalue()).decode()
+
+
+def run():
+    from utils import AIResolver
+
+    imgs = [load("options"), load("hint")]
+    for fmt in ["JPEG", "WEBP"]:
+        resolver = AIResolver(api_key="", model="benchmark", image_format=fmt)
+        bench(
+            f"prepare_image {fmt}(2张, 0.5x)",
+            resolver.prepare_image,
+            imgs,
+            0.5,
+            baseline=legacy_prepare,
+            repeat=20,
+        )
+        print(f"{'':<36}载荷 {resolver.last_image_bytes / 1024:.1f} KB")
+    resolver = AIResolver(api_key="", model="benchmark", max_image_bytes=30 * 1024)
+    bench("prepare_image JPEG(上限30KB)", resolver.prepare_image, imgs, 0.5, repeat=20)
+    print(f"{'':<36}载荷 {resolver.last_image_bytes / 1024:.1f} KB")
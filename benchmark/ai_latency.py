@@ -0,0 +1,155 @@
+"""AIResolver 端到端延迟压测：经本地模拟服务并发调用 resolve_choice/resolve_blank/resolve_click_blank，
+输出每种题型的 p50/p95/p99 延迟、失败率(返回 None)与无效率(格式不符)。
+
+用法：python -m benchmark.ai_latency [--requests 200] [--concurrency 16]
+                                     [--latency lognormal:0.8,0.5] [--error-rate 0.05]
+                                     [--malformed-rate 0.05] [--url http://host:port/v1]
+不指定 --url 时在后台线程启动 benchmark.mock_ai 模拟服务。"""
+
+import argparse
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import numpy as np
+
+from benchmark.fixtures import load
+from benchmark.mock_ai import MockConfig, create_app
+
+BLANK_NUM = 4
+
+
+def valid_choice(answer) -> bool:
+    return bool(answer) and all(a in "ABCDEF" for a in answer)
+
+
+def valid_blank(answer) -> bool:
+    return len(answer) == BLANK_NUM and re.fullmatch(r"\w+", answer) is not None
+
+
+def valid_click_blank(answer) -> bool:
+    return len([a for a in answer.split(",") if a.strip()]) >= 2
+
+
+# 题型 → (调用方式, 答案格式校验)
+CALLS = {
+    "选择题": (lambda r, imgs: r.resolve_choice(imgs), valid_choice),
+    "填空题": (lambda r, imgs: r.resolve_blank(imgs, False, BLANK_NUM), valid_blank),
+    "点选填空题": (lambda r, imgs: r.resolve_click_blank(imgs), valid_click_blank),
+}
+
+
+def start_mock(config: MockConfig) -> str:
+    """在后台线程启动模拟服务(随机端口)，返回 base_url"""
+    import uvicorn
+
+    server = uvicorn.Server(
+        uvicorn.Config(
+            create_app(config), host="127.0.0.1", port=0, log_level="warning"
+        )
+    )
+    threading.Thread(target=server.run, name="mock_ai", daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return f"http://127.0.0.1:{port}/v1"
+
+
+def drive(resolver, imgs: list, call, requests: int, concurrency: int) -> list:
+    """以 concurrency 个线程并发调用同步接口，返回 [(耗时秒, 结果)]"""
+
+    def one(_):
+        t0 = time.perf_counter()
+        result = call(resolver, imgs)
+        return time.perf_counter() - t0, result
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(one, range(requests)))
+
+
+def summarize(name: str, samples: list, validate) -> None:
+    latencies = np.array([s for s, _ in samples]) * 1000
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    failed = sum(result is None for _, result in samples)
+    invalid = sum(result is not None and not validate(result) for _, result in samples)
+    n = len(samples)
+    print(
+        f"{name:<12}n={n:<5}p50={p50:>8.1f} ms  p95={p95:>8.1f} ms  p99={p99:>8.1f} ms"
+        f"  失败={failed / n:>6.1%}  无效={invalid / n:>6.1%}"
+    )
+
+
+def measure_stream(base_url: str, requests: int = 20) -> None:
+    """流式接口的首个分片延迟与完整耗时"""
+    body = {
+        "model": "benchmark",
+        "stream": True,
+        "messages": [{"role": "system", "content": "选择题"}],
+    }
+    first, total = [], []
+    with httpx.Client(timeout=60) as client:
+        for _ in range(requests):
+            t0 = time.perf_counter()
+            t_first = None
+            with client.stream("POST", f"{base_url}/chat/completions", json=body) as r:
+                for line in r.iter_lines():
+                    if t_first is None and line.startswith("data:"):
+                        t_first = time.perf_counter() - t0
+            first.append((t_first or 0.0) * 1000)
+            total.append((time.perf_counter() - t0) * 1000)
+    print(
+        f"{'流式输出':<12}n={requests:<5}首分片p50={np.median(first):>8.1f} ms"
+        f"  完整p50={np.median(total):>8.1f} ms"
+    )
+
+
+def run(
+    requests: int = 60,
+    concurrency: int = 8,
+    config: MockConfig | None = None,
+    url: str | None = None,
+):
+    from utils import AIResolver
+
+    config = config or MockConfig(
+        latency="lognormal:0.05,0.5", error_rate=0.05, malformed_rate=0.05, seed=0
+    )
+    base_url = url or start_mock(config)
+    resolver = AIResolver(api_key="mock", model="benchmark", base_url=base_url)
+    imgs = [load("options"), load("hint")]
+    print(
+        f"地址={base_url} 并发={concurrency} 延迟={config.latency} "
+        f"错误率={config.error_rate:.0%} 畸形率={config.malformed_rate:.0%}"
+    )
+    for name, (call, validate) in CALLS.items():
+        summarize(name, drive(resolver, imgs, call, requests, concurrency), validate)
+    print(f"{'':<12}{resolver.stats()}")
+    if url is None:
+        measure_stream(base_url)
+        stats = httpx.get(base_url.removesuffix("/v1") + "/mock/stats").json()
+        print(f"{'':<12}模拟服务注入: {stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="每种题型的请求数")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", default=MockConfig().latency)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--malformed-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--url", help="已运行的 OpenAI 兼容服务 base_url")
+    args = parser.parse_args()
+    run(
+        args.requests,
+        args.concurrency,
+        MockConfig(
+            latency=args.latency,
+            error_rate=args.error_rate,
+            malformed_rate=args.malformed_rate,
+            seed=args.seed,
+        ),
+        args.url,
+    )
@@ -0,0 +1,47 @@
+import time
+import tracemalloc
+
+import numpy as np
+
+
+def timeit(fn, *args, repeat: int = 50, warmup: int = 3) -> float:
+    """返回 fn(*args) 的中位耗时(毫秒)"""
+    for _ in range(warmup):
+        fn(*args)
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - t0)
+    return float(np.median(samples) * 1000)
+
+
+def peak_alloc(fn, *args) -> float:
+    """单次调用 fn(*args) 期间的内存分配峰值(KiB)，NumPy 数组同样会被 tracemalloc 统计"""
+    tracemalloc.start()
+    try:
+        fn(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def report(
+    name: str,
+    ms: float,
+    baseline_ms: float | None = None,
+    alloc_kib: float | None = None,
+):
+    line = f"{name:<36}{ms:>10.3f} ms"
+    if alloc_kib is not None:
+        line += f"{alloc_kib:>10.0f} KiB"
+    if baseline_ms is not None:
+        line += f"   (旧实现 {baseline_ms:.3f} ms, 提速 {baseline_ms / ms:.1f}x)"
+    print(line)
+
+
+def bench(name: str, fn, *args, baseline=None, repeat: int = 50):
+    """测量耗时与分配峰值并输出一行；baseline 为同参数的旧实现，用于对比"""
+    base_ms = timeit(baseline, *args, repeat=repeat) if baseline else None
+    report(name, timeit(fn, *args, repeat=repeat), base_ms, peak_alloc(fn, *args))
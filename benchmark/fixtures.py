@@ -0,0 +1,168 @@
+"""基准用 1280x720 截图夹具：提示面板、选项列表、推荐流页面、点选填空题选项框。
+图片由本模块按固定随机种子合成并提交到 fixtures/ 目录，修改绘制逻辑后运行
+python -m benchmark.fixtures 重新生成。"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+SCREEN_W, SCREEN_H = 720, 1280
+# 提示区域，与 RedTextOCR.ROI_* 保持一致
+HINT_ROI = (0, 483, 720, 517)
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+
+BACKGROUND = (245, 245, 245)
+BLACK_TEXT = (50, 50, 50)
+RED_TEXT = (40, 40, 220)
+# 未读标题 rgb(45, 51, 56) 与已读标题的灰色，BGR
+UNREAD_TITLE = (56, 51, 45)
+READ_TITLE = (150, 150, 150)
+# 点选填空题选项框描边，与 MaaWorker.CHIP_BORDER 一致；圆角处是更浅的抗锯齿像素
+CHIP_BORDER = (212, 208, 204)
+CHIP_CORNER = (232, 230, 228)
+GLYPH = 24
+
+
+def _glyphs(rng: np.random.Generator, count: int = 32) -> list[np.ndarray]:
+    """生成一组固定的稀疏笔画字形，用来模拟汉字(重复使用利于 PNG 压缩)"""
+    return [rng.random((GLYPH, GLYPH)) < 0.35 for _ in range(count)]
+
+
+def _draw_text(img, glyphs, rng, x, y, n, color, gap=4):
+    for _ in range(n):
+        if x + GLYPH > img.shape[1]:
+            break
+        strokes = glyphs[rng.integers(len(glyphs))]
+        img[y : y + GLYPH, x : x + GLYPH][strokes] = color
+        x += GLYPH + gap
+    return x
+
+
+def make_hint(seed: int = 0) -> np.ndarray:
+    """提示面板：黑字中夹杂若干段红字，部分红字跨行"""
+    rng = np.random.default_rng(seed)
+    glyphs = _glyphs(rng)
+    img = np.full((SCREEN_H, SCREEN_W, 3), BACKGROUND, dtype=np.uint8)
+    _draw_text(img, glyphs, rng, 30, 200, 12, BLACK_TEXT)
+    _, ry, rw, rh = HINT_ROI
+    img[ry : ry + rh] = 255
+    line_h = 44
+    red_left = 0
+    for line in range(rh // line_h - 1):
+        y = ry + 20 + line * line_h
+        x = 14
+        while x + GLYPH < rw - 14:
+            if red_left == 0 and rng.random() < 0.08:
+                red_left = int(rng.integers(2, 8))
+            color = RED_TEXT if red_left else BLACK_TEXT
+            red_left = max(0, red_left - 1)
+            x = _draw_text(img, glyphs, rng, x, y, 1, color)
+    return img
+
+
+def make_options(seed: int = 1) -> np.ndarray:
+    """选择题页面：题干 + A-D 四个选项，字母在左侧圆框内"""
+    rng = np.random.default_rng(seed)
+    glyphs = _glyphs(rng)
+    img = np.full((SCREEN_H, SCREEN_W, 3), BACKGROUND, dtype=np.uint8)
+    for line in range(4):
+        _draw_text(img, glyphs, rng, 30, 260 + line * 40, 22, BLACK_TEXT)
+    for i in range(4):
+        top = 460 + i * 110
+        img[top : top + 90, 20:700] = 255
+        img[top + 25 : top + 65, 40:80] = (200, 200, 200)
+        _draw_text(
+            img, glyphs, rng, 100, top + 33, int(rng.integers(3, 15)), BLACK_TEXT
+        )
+    return img
+
+
+def make_feed(seed: int = 2) -> tuple[np.ndarray, list[list[int]]]:
+    """推荐流页面：若干文章卡片，标题颜色区分已读/未读。返回 (截图, 卡片框列表)"""
+    rng = np.random.default_rng(seed)
+    glyphs = _glyphs(rng)
+    img = np.full((SCREEN_H, SCREEN_W, 3), BACKGROUND, dtype=np.uint8)
+    boxes = []
+    for i in range(6):
+        top = 120 + i * 190
+        box = [20, top, 680, 170]
+        img[top : top + 170, 20:700] = 255
+        color = UNREAD_TITLE if i % 2 == 0 else READ_TITLE
+        _draw_text(img, glyphs, rng, 40, top + 20, 12, color)
+        _draw_text(img, glyphs, rng, 40, top + 52, 8, color)
+        img[top + 110 : top + 130, 40:200] = READ_TITLE
+        img[top + 20 : top + 150, 500:680] = rng.integers(0, 255, 3, dtype=np.uint8)
+        boxes.append(box)
+    return img, boxes
+
+
+def _draw_chip(img, box, corner=3, bottom=5):
+    """空心选项框：两侧与顶边 2px、底边较粗，四角留出浅色的圆角缺口"""
+    x, y, w, h = box
+    img[y : y + 2, x : x + w] = CHIP_BORDER
+    img[y + h - bottom : y + h, x : x + w] = CHIP_BORDER
+    img[y : y + h, x : x + 2] = CHIP_BORDER
+    img[y : y + h, x + w - 2 : x + w] = CHIP_BORDER
+    for cy in (y, y + h - corner):
+        for cx in (x, x + w - corner):
+            img[cy : cy + corner, cx : cx + corner] = CHIP_CORNER
+
+
+def make_chips(seed: int = 3) -> tuple[np.ndarray, list[list[int]]]:
+    """点选填空题页面：两行 1-4 字的选项框，同一行的框顶边相差几个像素；
+    另有实心色块、分隔线、过矮的小框等同色干扰。返回 (截图, 按阅读顺序的选项框)"""
+    rng = np.random.default_rng(seed)
+    glyphs = _glyphs(rng)
+    img = np.full((SCREEN_H, SCREEN_W, 3), 255, dtype=np.uint8)
+    for line in range(3):
+        _draw_text(img, glyphs, rng, 30, 260 + line * 40, 22, BLACK_TEXT)
+    # (x, y, 字数)，框宽随字数增加，高 74
+    chips = [(40, 820, 1), (134, 820, 2), (254, 823, 3), (403, 818, 4)]
+    chips += [(40, 930, 4), (208, 932, 2)]
+    boxes = []
+    for x, y, n in chips:
+        box = [x, y, 46 + 28 * n, 74]
+        _draw_chip(img, box)
+        _draw_text(img, glyphs, rng, x + 22, y + 24, n, BLACK_TEXT, gap=4)
+        boxes.append(box)
+    img[760:762, 20:700] = CHIP_BORDER
+    img[1060:1130, 40:160] = CHIP_BORDER
+    _draw_chip(img, [200, 1070, 120, 40], bottom=2)
+    return img, boxes
+
+
+def generate():
+    FIXTURE_DIR.mkdir(exist_ok=True)
+    feed, boxes = make_feed()
+    chips, chip_boxes = make_chips()
+    for name, img in [
+        ("hint", make_hint()),
+        ("options", make_options()),
+        ("feed", feed),
+        ("chips", chips),
+    ]:
+        Image.fromarray(img[:, :, ::-1]).save(
+            FIXTURE_DIR / f"{name}.png", optimize=True
+        )
+    (FIXTURE_DIR / "feed.json").write_text(json.dumps({"boxes": boxes}))
+    (FIXTURE_DIR / "chips.json").write_text(json.dumps({"boxes": chip_boxes}))
+
+
+def load(name: str) -> np.ndarray:
+    """读取夹具为 BGR 数组(与 MAA 截图格式一致)"""
+    with Image.open(FIXTURE_DIR / f"{name}.png") as im:
+        return np.ascontiguousarray(np.asarray(im.convert("RGB"))[:, :, ::-1])
+
+
+def load_feed_boxes() -> list[list[int]]:
+    return json.loads((FIXTURE_DIR / "feed.json").read_text())["boxes"]
+
+
+def load_chip_boxes() -> list[list[int]]:
+    return json.loads((FIXTURE_DIR / "chips.json").read_text())["boxes"]
+
+
+if __name__ == "__main__":
+    generate()
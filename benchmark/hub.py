@@ -0,0 +1,241 @@
+"""日志广播压测：后台线程运行挂载 Hub.stream 的 WebSocket 服务，主线程模拟大量浏览器客户端，
+worker 线程按固定速率发布消息，输出不同客户端数下的投递延迟分位数、漏收数与空闲时服务端的 CPU 占用。
+客户端与服务端在同一进程，延迟包含客户端自身的处理时间。
+另测长时间运行后按序号重连补发的耗时。
+对照组为原先每个连接每 10ms 检查一次共享 SimpleQueue 的轮询写法(只测空闲 CPU 与消息被瓜分的情况)。
+
+用法：python -m benchmark.hub [--clients 1,100,300,500] [--messages 100] [--rate 20]"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from queue import SimpleQueue
+
+import numpy as np
+from fastapi import FastAPI, WebSocket
+
+from hub import Hub
+
+
+def event(message: str, **payload) -> dict:
+    """与 MaaWorker.send_log 相同结构的日志事件"""
+    return {
+        "time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
+        "level": "info",
+        "stage": "选读文章",
+        "device": "benchmark",
+        "question": None,
+        "message": message,
+        "payload": payload,
+    }
+
+
+class Server:
+    """在后台线程的独立事件循环中运行 uvicorn，hub 绑定到该循环。
+    指定 endpoint(websocket) 时用它代替 hub.stream 处理连接，用于模拟旧实现。"""
+
+    def __init__(self, hub: Hub, endpoint=None):
+        import uvicorn
+
+        app = FastAPI()
+
+        @app.websocket("/ws")
+        async def ws(websocket: WebSocket):
+            await websocket.accept()
+            if endpoint:
+                await endpoint(websocket)
+            else:
+                since = int(websocket.query_params.get("since", 0))
+                await hub.stream(websocket, since)
+
+        self.server = uvicorn.Server(
+            uvicorn.Config(
+                app, host="127.0.0.1", port=0, log_level="warning", lifespan="off"
+            )
+        )
+        self.loop = asyncio.new_event_loop()
+        hub.bind(self.loop)
+        self.thread = threading.Thread(
+            target=self.loop.run_until_complete,
+            args=(self.server.serve(),),
+            name="hub_server",
+            daemon=True,
+        )
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        port = self.server.servers[0].sockets[0].getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}/ws"
+
+    def cpu_seconds(self, seconds: float) -> float:
+        """主线程休眠 seconds 秒期间整个进程占用的 CPU 时间，即服务端的开销"""
+        start = time.process_time()
+        time.sleep(seconds)
+        return time.process_time() - start
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+async def client(url: str, received: list, ready: asyncio.Event, count: int):
+    """一个模拟浏览器：收到 count 条消息后断开，每条记录 (发布时刻, 收到时刻)"""
+    import websockets
+
+    async with websockets.connect(url, max_queue=None) as ws:
+        ready.set()
+        while len(received) < count:
+            events = json.loads(await ws.recv())
+            now = time.perf_counter()
+            received.extend((event["payload"]["sent"], now) for event in events)
+
+
+def publish(hub: Hub, messages: int, rate: float):
+    """模拟 worker 线程按 rate 条/秒发布事件，payload 中带发布时刻"""
+    for _ in range(messages):
+        hub.put(event("正在阅读第1篇文章", sent=time.perf_counter()))
+        time.sleep(1 / rate)
+
+
+async def run_clients(url: str, hub: Hub, clients: int, messages: int, rate: float):
+    received = [[] for _ in range(clients)]
+    readies = [asyncio.Event() for _ in range(clients)]
+    tasks = [
+        asyncio.create_task(client(url, received[i], readies[i], messages))
+        for i in range(clients)
+    ]
+    await asyncio.gather(*(r.wait() for r in readies))
+    # 等全部连接完成订阅再开始发布
+    while len(hub.subscribers) < clients:
+        await asyncio.sleep(0.01)
+    publisher = threading.Thread(target=publish, args=(hub, messages, rate))
+    publisher.start()
+    _, pending = await asyncio.wait(tasks, timeout=messages / rate + 10)
+    for task in pending:
+        task.cancel()
+    publisher.join()
+    return received
+
+
+async def reconnect(url: str, since: int, frames: int) -> tuple[float, str]:
+    """以 since 重连并收齐 frames 帧补发消息，返回 (耗时毫秒, 最后一帧)"""
+    import websockets
+
+    t0 = time.perf_counter()
+    async with websockets.connect(f"{url}?since={since}", max_queue=None) as ws:
+        for _ in range(frames):
+            frame = await ws.recv()
+    return (time.perf_counter() - t0) * 1000, frame
+
+
+def measure_reconnect(runs: int = 20):
+    """长时间运行积累 50000 条日志后的重连：旧实现逐条补发全部历史，现为按序号一帧补发缺失的 10 条"""
+    total = 50000
+    history = [f"2025-01-01 00:00:00 {i} 正在阅读第1篇文章" for i in range(total)]
+
+    async def legacy_endpoint(websocket: WebSocket):
+        for message in history:
+            await websocket.send_text(message)
+
+    server = Server(Hub(), legacy_endpoint)
+    full, _ = asyncio.run(reconnect(server.url, 0, total))
+    server.stop()
+    hub = Hub()
+    server = Server(hub)
+    hub._dispatch([event(message) for message in history])
+    tail = []
+    for _ in range(runs):
+        ms, frame = asyncio.run(reconnect(server.url, total - 10, 1))
+        assert [e["seq"] for e in json.loads(frame)] == list(
+            range(total - 9, total + 1)
+        )
+        tail.append(ms)
+    server.stop()
+    print(
+        f"重连补发: since=N 补发10条 p50={np.median(tail):.1f} ms, 内存历史{len(hub.history)}条"
+        f"  (旧实现补发全部{total}条 {full:.0f} ms)"
+    )
+
+
+def legacy_idle_cpu(clients: int, seconds: float) -> tuple[float, list[int]]:
+    """旧写法：clients 个协程轮询同一 SimpleQueue。返回空闲 seconds 秒的 CPU 时间，
+    以及随后发布 100 条消息时每个协程各拿到的条数(消息被瓜分而不是广播)"""
+    queue = SimpleQueue()
+    got = [0] * clients
+
+    async def poll(i):
+        while True:
+            if not queue.empty():
+                queue.get_nowait()
+                got[i] += 1
+            await asyncio.sleep(0.01)
+
+    async def main():
+        tasks = [asyncio.create_task(poll(i)) for i in range(clients)]
+        await asyncio.sleep(0.1)
+        start = time.process_time()
+        await asyncio.sleep(seconds)
+        cpu = time.process_time() - start
+        for _ in range(100):
+            queue.put("msg")
+        await asyncio.sleep(0.5)
+        for task in tasks:
+            task.cancel()
+        return cpu
+
+    return asyncio.run(main()), got
+
+
+def check_backpressure():
+    """没有消费者的订阅者：队列保持有界，丢弃超过上限后被断开"""
+    hub = Hub(queue_size=8, max_dropped=16)
+    sub, _ = hub.subscribe()
+    for i in range(10):
+        hub._dispatch([event(str(i))])
+    assert sub.queue.qsize() == 8 and sub.dropped == 2
+    assert json.loads(sub.queue.get_nowait())[0]["seq"] == 3, "应丢弃最旧的消息"
+    for i in range(30):
+        hub._dispatch([event(str(i))])
+    assert sub.closed and sub.queue.qsize() == 1 and sub.queue.get_nowait() is None
+    print("背压: 队列上限8条，丢弃最旧消息，累计丢弃超过16条后断开 ✓")
+
+
+def run(clients=(1, 100, 300, 500), messages: int = 100, rate: float = 20):
+    check_backpressure()
+    measure_reconnect()
+    for n in clients:
+        hub = Hub()
+        server = Server(hub)
+        received = asyncio.run(run_clients(server.url, hub, n, messages, rate))
+        latencies = np.array([(t - s) * 1000 for r in received for s, t in r])
+        missing = n * messages - len(latencies)
+        # 客户端全部断开后测服务端空闲开销
+        time.sleep(0.2)
+        idle = server.cpu_seconds(1.0)
+        server.stop()
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(
+            f"客户端={n:<5}消息={messages}  p50={p50:>7.2f} ms  p95={p95:>7.2f} ms"
+            f"  p99={p99:>7.2f} ms  漏收={missing}  空闲CPU={idle * 1000:.1f} ms/s"
+        )
+    for n in clients:
+        cpu, got = legacy_idle_cpu(n, 1.0)
+        print(
+            f"旧实现 客户端={n:<5}空闲CPU={cpu * 1000:.1f} ms/s"
+            f"  100条消息被{sum(g > 0 for g in got)}个连接瓜分(最多一个连接收到{max(got)}条)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", default="1,100,300,500", help="逗号分隔的客户端数")
+    parser.add_argument("--messages", type=int, default=100, help="每轮发布的消息数")
+    parser.add_argument("--rate", type=float, default=20, help="每秒发布的消息数")
+    args = parser.parse_args()
+    run(
+        tuple(int(n) for n in args.clients.split(",")),
+        args.messages,
+        args.rate,
+    )
@@ -0,0 +1,136 @@
+"""单选题红字匹配：枚举排列(旧) 与拼接指派 matching.best_option(新) 对比，
+并在随机用例上与穷举全部排列的参照实现校验匹配等级一致"""
+
+import random
+import re
+from itertools import permutations
+
+from benchmark.common import bench
+from matching import EXACT, FUZZY, SUBSTRING, best_option
+
+HANZI = "甲乙丙丁戊己庚辛壬癸子丑寅卯辰巳午未申酉戌亥"
+
+
+def legacy_grades(option_texts: dict, joined: str) -> dict:
+    """旧实现对一种拼接顺序的逐选项判定：{字母: 精确/子串/模糊}"""
+    joined_clean = re.sub(r"\W", "", joined)
+    grades = {}
+    for letter, text in option_texts.items():
+        text_clean = re.sub(r"\W", "", text)
+        if not text_clean:
+            if text in joined:
+                grades[letter] = "精确"
+        elif text_clean == joined_clean:
+            grades[letter] = "精确"
+        elif text_clean in joined_clean or joined_clean in text_clean:
+            grades[letter] = "子串"
+        elif (
+            min(len(text_clean), len(joined_clean))
+            / max(len(text_clean), len(joined_clean))
+            >= 2 / 3
+        ):
+            grades[letter] = "模糊"
+    return grades
+
+
+def legacy_tier(option_texts: dict, joined: str, tiers: tuple) -> tuple | None:
+    grades = legacy_grades(option_texts, joined)
+    for tier in tiers:
+        for letter, grade in grades.items():
+            if grade == tier:
+                return letter, tier
+    return None
+
+
+def legacy_best(option_texts: dict, red_texts: list) -> tuple | None:
+    """旧实现：原顺序拼接按 精确/子串/模糊 匹配，失败后枚举全部排列"""
+    result = legacy_tier(option_texts, "".join(red_texts), ("精确", "子串", "模糊"))
+    if result or len(red_texts) < 2:
+        return result
+    for perm in permutations(red_texts):
+        result = legacy_tier(option_texts, "".join(perm), ("精确", "子串"))
+        if result:
+            return result
+    return None
+
+
+def reference_best(option_texts: dict, red_texts: list) -> tuple | None:
+    """穷举全部排列的参照实现，等级顺序同 best_option：
+    原顺序拼接的精确/子串 > 任意顺序拼接的精确/子串 > 原顺序拼接的模糊。
+    返回 (最优等级, 达到该等级的选项字母集合)，都不匹配返回 None"""
+    in_order = legacy_grades(option_texts, "".join(red_texts))
+    stages = [{k: v for k, v in in_order.items() if v != FUZZY}, {}]
+    if len(red_texts) > 1:
+        for perm in permutations(red_texts):
+            for letter, grade in legacy_grades(option_texts, "".join(perm)).items():
+                if grade != FUZZY and stages[1].get(letter) != EXACT:
+                    stages[1][letter] = grade
+    stages.append(in_order)
+    for grades in stages:
+        for tier in (EXACT, SUBSTRING, FUZZY):
+            letters = {letter for letter, grade in grades.items() if grade == tier}
+            if letters:
+                return tier, letters
+    return None
+
+
+def random_case(rng: random.Random) -> tuple[dict, list]:
+    """把随机文字切成 2-5 段并打乱作为红字；选项为原文、原文片段、
+    前后夹杂同样文字的原文(使红字在选项中多处出现)或无关文字。字表很小，重复子串很常见"""
+    alphabet = HANZI[: rng.randint(2, 6)]
+    base = "".join(rng.choices(alphabet, k=rng.randint(3, 12)))
+    cuts = sorted(
+        rng.sample(range(1, len(base)), min(len(base) - 1, rng.randint(1, 4)))
+    )
+    frags = [base[a:b] for a, b in zip([0, *cuts], [*cuts, len(base)])]
+    rng.shuffle(frags)
+    options = {}
+    for letter in "ABCD":
+        start = rng.randint(0, len(base) - 1)
+        noise = ["".join(rng.choices(alphabet, k=rng.randint(0, 4))) for _ in range(2)]
+        shuffled = rng.sample(frags, len(frags))
+        options[letter] = rng.choice(
+            [
+                base,
+                base[start : start + rng.randint(1, len(base))],
+                noise[0] + "".join(shuffled) + noise[1],
+                noise[0] + rng.choice(frags) + "".join(shuffled)[1:],
+                "".join(rng.choices(HANZI, k=rng.randint(2, 10))),
+            ]
+        )
+    return options, frags
+
+
+def check_equivalence(trials: int = 3000, seed: int = 0):
+    """随机用例上与穷举排列的参照实现比较：等级一致，且选中的字母达到该等级"""
+    rng = random.Random(seed)
+    for _ in range(trials):
+        options, frags = random_case(rng)
+        expected = reference_best(options, frags)
+        actual = best_option(options, frags, time_limit=1.0)
+        assert (expected is None) == (actual is None), (frags, options, actual)
+        if expected:
+            tier, letters = expected
+            assert actual[1] == tier and actual[0] in letters, (
+                frags,
+                options,
+                expected,
+                actual,
+            )
+
+
+def run():
+    check_equivalence()
+    # 最坏情况：所有排列都不匹配，旧实现需尝试 n! 种顺序
+    options = {"A": "午未申", "B": "酉戌亥", "C": "午未申酉戌", "D": "午未"}
+    for n in (4, 6, 7):
+        frags = [HANZI[2 * i : 2 * i + 2] for i in range(n)]
+        repeat = 50 if n < 7 else 3
+        bench(
+            f"单选题红字匹配({n}段)",
+            best_option,
+            options,
+            frags,
+            baseline=legacy_best,
+            repeat=repeat,
+        )
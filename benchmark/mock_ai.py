@@ -0,0 +1,198 @@
+"""本地 OpenAI 兼容 chat/completions 模拟服务，用于离线压测 AIResolver。
+按请求中的系统提示词生成格式正确的假答案，可配置延迟分布、错误率、畸形回复率与流式输出。
+
+用法：python -m benchmark.mock_ai [--port 8001] [--latency lognormal:0.8,0.5]
+                                  [--error-rate 0.05] [--malformed-rate 0.05]
+运行中可 POST /mock/config 修改行为，GET /mock/stats 查看已注入的错误与畸形回复数量。"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from collections import Counter
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
+
+HANZI = "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最立代想已通并提直题党程展五果料象员革位入常文总次品式活设及管特件长求老头基资边流路级少图山统接知较将组见计别她手角期根论运农指几九区强放决西被干做必战先回则任取据处理府研质"
+CLICK_WORDS = ["改革", "开放", "创新", "协调", "绿色", "共享", "发展", "人民", "法治"]
+ERROR_STATUS = [429, 500, 502, 503]
+MALFORMED_KINDS = ["truncated", "schema", "content"]
+
+
+def parse_latency(spec: str):
+    """解析延迟分布描述，返回 rng -> 秒数 的采样函数。单位均为秒：
+    fixed:0.5 / uniform:0.2,1.5 / normal:0.8,0.2 / lognormal:中位数,sigma / exp:均值"""
+    kind, _, args = spec.partition(":")
+    params = [float(v) for v in args.split(",") if v]
+    match kind:
+        case "fixed":
+            (value,) = params
+            return lambda rng: value
+        case "uniform":
+            low, high = params
+            return lambda rng: rng.uniform(low, high)
+        case "normal":
+            mu, sigma = params
+            return lambda rng: max(0.0, rng.gauss(mu, sigma))
+        case "lognormal":
+            median, sigma = params
+            return lambda rng: rng.lognormvariate(math.log(median), sigma)
+        case "exp":
+            (mean,) = params
+            return lambda rng: rng.expovariate(1 / mean)
+    raise ValueError(f"未知的延迟分布: {spec}")
+
+
+class MockConfig(BaseModel):
+    latency: str = "lognormal:0.8,0.5"
+    # 返回 HTTP 错误(429/5xx)的概率
+    error_rate: float = 0.0
+    # 返回 200 但内容畸形(截断JSON/缺字段/答非所问)的概率
+    malformed_rate: float = 0.0
+    # 流式输出每个分片之间的间隔(秒)
+    chunk_interval: float = 0.02
+    seed: int | None = None
+
+
+def system_prompt(body: dict) -> str:
+    content = body["messages"][0]["content"]
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") for part in content)
+
+
+def fake_answer(prompt: str, rng: random.Random) -> str:
+    """按题型给出格式正确的答案：选择题字母、点选逗号分隔词组、填空题指定字数汉字"""
+    if "点选" in prompt:
+        return ",".join(rng.sample(CLICK_WORDS, rng.randint(2, 4)))
+    if "选择题" in prompt:
+        return "".join(sorted(rng.sample("ABCD", rng.choice([1, 1, 1, 2, 3]))))
+    m = re.search(r"答案为(\d+)个字符", prompt)
+    return "".join(rng.choices(HANZI, k=int(m.group(1)) if m else 4))
+
+
+def completion(model: str, content: str) -> dict:
+    return {
+        "id": f"mock-{time.monotonic_ns()}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 0, "completion_tokens": len(content)},
+    }
+
+
+def create_app(config: MockConfig | None = None) -> FastAPI:
+    app = FastAPI()
+    app.state.config = config or MockConfig()
+    app.state.sampler = parse_latency(app.state.config.latency)
+    app.state.rng = random.Random(app.state.config.seed)
+    app.state.stats = Counter()
+
+    @app.post("/mock/config")
+    def set_config(new: MockConfig):
+        app.state.sampler = parse_latency(new.latency)
+        app.state.config = new
+        app.state.rng = random.Random(new.seed)
+        app.state.stats.clear()
+        return {"status": "success"}
+
+    @app.get("/mock/stats")
+    def get_stats():
+        return dict(app.state.stats)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        config: MockConfig = app.state.config
+        rng: random.Random = app.state.rng
+        stats: Counter = app.state.stats
+        stats["requests"] += 1
+        delay = app.state.sampler(rng)
+        model = body.get("model", "mock")
+        if rng.random() < config.error_rate:
+            await asyncio.sleep(delay)
+            status = rng.choice(ERROR_STATUS)
+            stats[f"error_{status}"] += 1
+            return JSONResponse(
+                {"error": {"message": "mock error", "code": status}}, status_code=status
+            )
+        content = fake_answer(system_prompt(body), rng)
+        malformed = None
+        if rng.random() < config.malformed_rate:
+            malformed = rng.choice(MALFORMED_KINDS)
+            stats[f"malformed_{malformed}"] += 1
+            if malformed == "content":
+                content = "抱歉，我无法识别图片中的内容。"
+        else:
+            stats["ok"] += 1
+        if body.get("stream"):
+            return StreamingResponse(
+                stream_chunks(model, content, delay, config.chunk_interval),
+                media_type="text/event-stream",
+            )
+        await asyncio.sleep(delay)
+        if malformed == "truncated":
+            text = json.dumps(completion(model, content), ensure_ascii=False)
+            return Response(text[: len(text) // 2], media_type="application/json")
+        if malformed == "schema":
+            return JSONResponse({"id": "mock", "object": "chat.completion"})
+        return JSONResponse(completion(model, content))
+
+    return app
+
+
+async def stream_chunks(model: str, content: str, delay: float, interval: float):
+    """SSE 流式输出：首个分片前等待 delay，之后每个字一个分片"""
+    await asyncio.sleep(delay)
+    for char in content:
+        chunk = {
+            "id": "mock",
+            "object": "chat.completion.chunk",
+            "model": model,
+            "choices": [{"index": 0, "delta": {"content": char}}],
+        }
+        yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+        await asyncio.sleep(interval)
+    yield "data: [DONE]\n\n"
+
+
+def serve(config: MockConfig, host: str = "127.0.0.1", port: int = 8001):
+    import uvicorn
+
+    uvicorn.run(create_app(config), host=host, port=port, log_level="warning")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", default=MockConfig().latency)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--chunk-interval", type=float, default=0.02)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    print(f"模拟服务地址: http://{args.host}:{args.port}/v1")
+    serve(
+        MockConfig(
+            latency=args.latency,
+            error_rate=args.error_rate,
+            malformed_rate=args.malformed_rate,
+            chunk_interval=args.chunk_interval,
+            seed=args.seed,
+        ),
+        args.host,
+        args.port,
+    )
@@ -0,0 +1,25 @@
+"""形态学膨胀：逐偏移"或"(旧) 与可分离倍增滑窗(新) 对比，逐像素一致性由 tests/test_vision.py 校验"""
+
+import numpy as np
+
+from benchmark.common import bench
+from benchmark.fixtures import HINT_ROI, load
+from vision import dilate, red_mask
+
+
+def legacy_dilate(mask: np.ndarray, kh: int, kw: int) -> np.ndarray:
+    ph, pw = kh // 2, kw // 2
+    padded = np.pad(mask, ((ph, ph), (pw, pw)), mode="constant", constant_values=False)
+    h, w = mask.shape
+    result = np.zeros_like(mask)
+    for di in range(kh):
+        for dj in range(kw):
+            result |= padded[di : di + h, dj : dj + w]
+    return result
+
+
+def run():
+    rx, ry, rw, rh = HINT_ROI
+    mask = red_mask(load("hint")[ry : ry + rh, rx : rx + rw], 50)
+    for kh, kw in [(1, 5), (1, 24), (1, 40), (5, 24)]:
+        bench(f"膨胀 {kh}x{kw}", dilate, mask, kh, kw, baseline=legacy_dilate)
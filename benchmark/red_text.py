@@ -0,0 +1,122 @@
+"""RedTextOCR 分块阶段：逐像素 Python 循环(旧) 与 NumPy 游程检测(新) 对比"""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from benchmark.common import bench
+from benchmark.fixtures import HINT_ROI, load
+from benchmark.morphology import legacy_dilate
+from vision import find_runs, pack_crops, red_mask, segment_blocks, whiten_crop
+
+
+def _legacy_runs(flags, min_len):
+    runs = []
+    start = None
+    for i, has in enumerate(flags):
+        if has and start is None:
+            start = i
+        elif not has and start is not None:
+            if i - start > min_len:
+                runs.append((start, i))
+            start = None
+    if start is not None and len(flags) - start > min_len:
+        runs.append((start, len(flags)))
+    return runs
+
+
+def legacy_scan(dilated: np.ndarray) -> list[list[int]]:
+    blocks = []
+    for r_start, r_end in _legacy_runs(np.any(dilated, axis=1), 5):
+        cols_with_text = np.any(dilated[r_start:r_end], axis=0)
+        for c_start, c_end in _legacy_runs(cols_with_text, 5):
+            blocks.append(
+                [
+                    max(0, c_start - 5),
+                    max(0, r_start - 5),
+                    c_end - c_start + 10,
+                    r_end - r_start + 10,
+                ]
+            )
+    return blocks
+
+
+def legacy_dilate_scan(mask: np.ndarray, min_size: int, pad: int, kw: int):
+    return legacy_scan(legacy_dilate(mask, 1, kw))
+
+
+def legacy_segment(hint_img: np.ndarray, dilate=legacy_dilate):
+    redness = hint_img[:, :, 2].astype(np.int16) - np.maximum(
+        hint_img[:, :, 0], hint_img[:, :, 1]
+    ).astype(np.int16)
+    mask = redness > 50
+    processed = np.full_like(hint_img, 255)
+    processed[mask] = hint_img[mask]
+    line_heights = [e - s for s, e in _legacy_runs(np.any(mask, axis=1), 0)]
+    if not line_heights:
+        return [], []
+    text_h = int(np.median(line_heights))
+    blocks = legacy_scan(dilate(mask, 1, max(5, text_h)))
+    crops = [
+        processed[max(0, by) : by + bh, max(0, bx) : bx + bw].copy()
+        for bx, by, bw, bh in blocks
+    ]
+    return crops, blocks
+
+
+def segment(hint_img: np.ndarray):
+    mask = red_mask(hint_img, 50)
+    lh_starts, lh_ends = find_runs(np.any(mask, axis=1))
+    if lh_starts.size == 0:
+        return [], []
+    text_h = int(np.median(lh_ends - lh_starts))
+    blocks = segment_blocks(mask, 5, 5, max(5, text_h)).tolist()
+    crops = [whiten_crop(hint_img, mask, block) for block in blocks]
+    return crops, blocks
+
+
+class StubContext:
+    """替代 MAA Context：不做OCR，只统计调用次数，用于测量 Python 侧耗时"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def run_recognition(self, entry, image, pipeline_override=None):
+        self.calls += 1
+
+    def run_recognition_direct(self, reco_type, reco_param, image):
+        self.calls += 1
+
+
+def run():
+    rx, ry, rw, rh = HINT_ROI
+    frame = load("hint")
+    hint_img = frame[ry : ry + rh, rx : rx + rw]
+    old_crops, old_blocks = legacy_segment(hint_img)
+    new_crops, new_blocks = segment(hint_img)
+    assert old_blocks == new_blocks, "分块结果与旧实现不一致"
+    assert all(np.array_equal(a, b) for a, b in zip(old_crops, new_crops))
+
+    # 膨胀 + 行列扫描：旧实现膨胀整幅掩码后逐像素扫描，新实现只膨胀每行的列投影
+    mask = red_mask(hint_img, 50)
+    bench("膨胀+行列扫描", segment_blocks, mask, 5, 5, 24, baseline=legacy_dilate_scan)
+    # 完整分块：过滤、估算行高、膨胀、扫描与裁剪
+    bench(
+        f"红字分块({len(new_blocks)}块)",
+        segment,
+        hint_img,
+        baseline=legacy_segment,
+    )
+
+    bench(f"批量OCR拼图({len(new_crops)}块)", pack_crops, new_crops)
+
+    # 完整 analyze(OCR 由桩替代)
+    from utils import RedTextOCR
+
+    context = StubContext()
+    bench(
+        "RedTextOCR.analyze(桩OCR)",
+        RedTextOCR().analyze,
+        context,
+        SimpleNamespace(image=frame, custom_recognition_param="{}"),
+    )
@@ -0,0 +1,190 @@
+"""MaaWorker 中不依赖设备的判定逻辑：已读检测、极速答题匹配，以及在脚本化画面上的正误检测"""
+
+import time
+from queue import SimpleQueue
+
+import numpy as np
+from maa.controller import CustomController
+from PIL import Image
+
+from benchmark.common import bench
+from benchmark.fixtures import load, load_feed_boxes
+from hub import Hub
+
+BOX = [100, 500, 500, 60]
+
+# 题型, 选项, 红字, 格子数
+FAST_CASES = {
+    "单选-精确匹配": (
+        "单选题",
+        {"A": ("实事求是", BOX), "B": ("与时俱进", BOX), "C": ("求真务实", BOX)},
+        ["实事求是"],
+        0,
+    ),
+    "单选-判断题": (
+        "单选题",
+        {"A": ("正确", BOX), "B": ("错误", BOX)},
+        ["正确"],
+        0,
+    ),
+    "单选-6段红字排列": (
+        "单选题",
+        {
+            "A": ("坚持以人民为中心的发展思想", BOX),
+            "B": ("全面深化改革开放不断推进", BOX),
+            "C": ("推动经济实现高质量发展", BOX),
+            "D": ("加快建设现代化经济体系", BOX),
+        },
+        ["甲", "乙", "丙", "丁", "戊", "己"],
+        0,
+    ),
+    "多选-逐条匹配": (
+        "多选题",
+        {
+            "A": ("经济建设", BOX),
+            "B": ("政治建设", BOX),
+            "C": ("文化建设", BOX),
+            "D": ("社会建设", BOX),
+            "E": ("生态文明建设", BOX),
+        },
+        ["经济建设", "文化建设"],
+        0,
+    ),
+    "填空-字数一致": ("填空题", {}, ["新发展", "理念"], 5),
+}
+
+
+def legacy_send_log(queue: SimpleQueue, msg):
+    """旧实现：格式化字符串放入 SimpleQueue 后休眠 50ms"""
+    queue.put(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())} {msg}")
+    time.sleep(0.05)
+
+
+def legacy_has_unread_text(queue: SimpleQueue, img: np.ndarray) -> bool:
+    """旧实现：逐张卡片裁剪左上 1/4 区域做颜色过滤，每张卡片输出一条日志"""
+    h, w = img.shape[:2]
+    roi = img[: h // 2, : w // 2]
+    lower = np.array([41, 36, 30], dtype=np.uint8)
+    upper = np.array([71, 66, 60], dtype=np.uint8)
+    count = np.count_nonzero(np.all((roi >= lower) & (roi <= upper), axis=2))
+    unread = bool(count > 80)
+    legacy_send_log(
+        queue,
+        f"[颜色检测] 黑色像素={count}, 阈值=80, 判定={'未读' if unread else '已读'}",
+    )
+    return unread
+
+
+class ScriptedController(CustomController):
+    """点击确定后按时间切换画面的控制器：作答画面 → 过渡动画(两帧线性混合) → 结果画面"""
+
+    def __init__(self, before: np.ndarray, transition: float = 0.3):
+        super().__init__()
+        self.before = before
+        self.after = before
+        self.transition = transition
+        self.clicked = None
+
+    def connect(self) -> bool:
+        return True
+
+    def request_uuid(self) -> str:
+        return "scripted"
+
+    def press(self, after: np.ndarray):
+        """模拟点击确定，之后的截图逐渐变为 after"""
+        self.after = after
+        self.clicked = time.monotonic()
+
+    def screencap(self) -> np.ndarray:
+        t = (time.monotonic() - self.clicked) / self.transition
+        if t >= 1:
+            return self.after
+        return (self.before * (1 - t) + self.after * t).astype(np.uint8)
+
+
+def legacy_check_answer(worker, answered: np.ndarray) -> bool:
+    """旧实现：下一题检测 按节点超时等待，答对后再等画面离开上一题并静止(原在预取线程中)"""
+    next_btn = worker.tasker.post_task("下一题检测").wait().get()
+    worker.invalidate_frame()
+    if next_btn.status.failed:
+        worker.wait_until_stable(timeout=3, changed_from=answered)
+    return next_btn.status.failed
+
+
+def bench_check_answer(worker):
+    """点击确定到得出正误的耗时：答对时画面跳到下一题，答错时确定按钮处出现"下一题" """
+    from utils import resource
+
+    answered = load("options")
+    wrong = answered.copy()
+    with Image.open("resource/image/答错的下一题.png") as im:
+        button = np.asarray(im.convert("RGB"))[:, :, ::-1]
+    h, w = button.shape[:2]
+    wrong[47 : 47 + h, 555 : 555 + w] = button
+    outcomes = {"答对": (load("hint"), True), "答错": (wrong, False)}
+
+    controller = ScriptedController(answered)
+    controller.post_connection().wait()
+    worker.tasker.bind(resource, controller)
+    for name, (after, correct) in outcomes.items():
+
+        def check_new(after=after):
+            controller.press(after)
+            return worker._check_answer(answered)
+
+        def check_old(after=after):
+            controller.press(after)
+            return legacy_check_answer(worker, answered)
+
+        assert check_new() is correct
+        assert check_old() is correct
+        bench(f"正误检测-{name}", check_new, baseline=check_old, repeat=5)
+
+
+def run():
+    from utils import MaaWorker
+
+    worker = MaaWorker(Hub(), api_key="", model="benchmark")
+    legacy_queue = SimpleQueue()
+    feed = load("feed")
+    boxes = load_feed_boxes()
+
+    def legacy_all(image, boxes):
+        return [
+            legacy_has_unread_text(legacy_queue, image[y : y + h, x : x + w])
+            for x, y, w, h in boxes
+        ]
+
+    def classify_new(image, boxes):
+        worker.card_memo.clear()
+        return worker._classify_cards(image, boxes)[0]
+
+    expected = [i % 2 == 0 for i in range(len(boxes))]
+    assert legacy_all(feed, boxes) == classify_new(feed, boxes) == expected
+    bench(
+        f"卡片已读判定({len(boxes)}张)",
+        classify_new,
+        feed,
+        boxes,
+        baseline=legacy_all,
+        repeat=10,
+    )
+    # 滑动后卡片仍在屏幕上：全部命中记忆，不再计数像素
+    worker._classify_cards(feed, boxes)
+    assert worker._classify_cards(feed, boxes)[0] == expected
+    bench(
+        f"卡片已读判定({len(boxes)}张, 记忆命中)",
+        lambda: worker._classify_cards(feed, boxes),
+        repeat=10,
+    )
+    bench(
+        "send_log",
+        worker.send_log,
+        "[正误检测] 第1题答对",
+        baseline=lambda msg: legacy_send_log(legacy_queue, msg),
+        repeat=20,
+    )
+    for name, args in FAST_CASES.items():
+        bench(f"_fast_try_answer {name}", worker._fast_try_answer, *args, repeat=10)
+    bench_check_answer(worker)
@@ -1,61 +1,63 @@
 // Reference: https://juejin.cn/post/7175043923709001765
-let Socket = ''
+// 每条消息为一批日志事件 [{"seq": 序号, "time", "level", "stage", "device", "question", "message", "kind"?, "payload"?}]，
+// 断线后按指数退避重连，
+// 重连时带上已收到的最大序号 since，服务端只补发缺失的部分
+let Socket = null
+let lastSeq = 0
+let retryDelay = 1000
+let retryTimer = null
+
+const MIN_RETRY_DELAY = 1000
+const MAX_RETRY_DELAY = 30000
 
 export const createSocket = () => {
-  Socket && Socket.close()
-  if (!Socket) {
-    console.log('建立websocket连接')
-    Socket = new WebSocket('ws://'+window.location.host+'/api/ws')
-    Socket.onmessage = onmessageWS
-    Socket.onerror = onerrorWS
-    Socket.onclose = oncloseWS
-  } else {
+  if (Socket && Socket.readyState <= 1) {
     console.log('websocket已连接')
+    return
   }
+  clearTimeout(retryTimer)
+  console.log('建立websocket连接')
+  Socket = new WebSocket('ws://' + window.location.host + '/api/ws?since=' + lastSeq)
+  Socket.onopen = onopenWS
+  Socket.onmessage = onmessageWS
+  Socket.onerror = onerrorWS
+  Socket.onclose = oncloseWS
+}
+
+const onopenWS = () => {
+  retryDelay = MIN_RETRY_DELAY
 }
 
+// 出错后浏览器总会接着触发 close，重连统一在 oncloseWS 中处理
 const onerrorWS = () => {
-  Socket.close()
-  console.log('连接失败重连中')
-  if (Socket.readyState !== 3) {
-    Socket = null
-    createSocket()
-  }
+  console.log('websocket连接出错')
 }
 
 const onmessageWS = e => {
-  window.dispatchEvent(new CustomEvent('onmessageWS', {
-    detail: {
-      data: e.data
+  for (const event of JSON.parse(e.data)) {
+    // 重连前后可能重复收到同一条，按序号去重
+    if (event.seq <= lastSeq) {
+      continue
     }
-  }))
+    lastSeq = event.seq
+    window.dispatchEvent(new CustomEvent('onmessageWS', {
+      detail: event
+    }))
+  }
 }
 
-const connecting = message => {
-  setTimeout(() => {
-    if (Socket.readyState === 0) {
-      connecting(message)
-    } else {
-      Socket.send(JSON.stringify(message))
-    }
-  }, 1000)
+const oncloseWS = () => {
+  // 抖动避免多个标签页同时重连
+  const delay = retryDelay * (0.5 + Math.random() / 2)
+  console.log(`websocket已断开，${Math.round(delay / 1000)}秒后重连`)
+  retryDelay = Math.min(retryDelay * 2, MAX_RETRY_DELAY)
+  retryTimer = setTimeout(createSocket, delay)
 }
 
 export const sendWSPush = message => {
-  if (Socket.readyState === 3) {
-    Socket.close()
-    createSocket()
-  } else if (Socket.readyState === 1) {
+  if (Socket && Socket.readyState === 1) {
     Socket.send(JSON.stringify(message))
-  } else if (Socket.readyState === 0) {
-    connecting(message)
+  } else {
+    console.log('websocket未连接，消息未发送')
   }
 }
-
-const oncloseWS = () => {
-  console.log('websocket已断开....正在尝试重连')
-  if (Socket.readyState !== 2) {
-    Socket = null
-    createSocket()
-  }
-}
\ No newline at end of file
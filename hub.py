@@ -0,0 +1,229 @@
+"""WebUI 的事件广播：worker 线程发布结构化事件，事件循环把事件分批分发给所有 WebSocket 订阅者。
+- 线程安全：publish 可在任意线程调用，事件放入有界的待发送队列即返回，不加锁、不阻塞、不休眠；
+  一个批次内只经 loop.call_soon_threadsafe 唤醒事件循环一次，BATCH_DELAY 内到达的事件合并为一帧发送
+- 广播：每个订阅者都收到全部消息，多个浏览器标签页互不抢消息
+- 背压：每个订阅者一个有界队列，满了丢弃最旧的消息；累计丢弃过多的慢客户端被断开，重连后从历史补齐
+- 空闲零开销：订阅者 await 队列，没有消息时不轮询
+- 有界历史：每个事件带递增序号，内存中只保留最近 HISTORY_SIZE 条，客户端重连时按 since=序号 只补发缺失部分；
+  全部消息同时写入按大小轮转的磁盘日志，更早的记录经 page 分页读取"""
+
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from itertools import islice
+from logging.handlers import RotatingFileHandler
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+
+class LogArchive:
+    """按大小轮转的磁盘日志，每行一个以 {"seq": 序号, 开头的事件 JSON。
+    当前文件为 path，轮转出的旧文件为 path.1 ... path.backups(数字越大越旧)。"""
+
+    def __init__(self, path: str, max_bytes: int = 1 << 20, backups: int = 5):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.backups = backups
+        self.handler = RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+        )
+
+    @staticmethod
+    def _seq(line: str) -> int:
+        # 行首固定为 {"seq": 序号, 不必整行解析 JSON
+        return int(line[8 : line.index(",")])
+
+    def _files(self) -> list[str]:
+        """从新到旧的日志文件"""
+        names = [self.path] + [f"{self.path}.{i}" for i in range(1, self.backups + 1)]
+        return [name for name in names if os.path.exists(name)]
+
+    def last_seq(self) -> int:
+        """磁盘上最新一条记录的序号，没有记录返回 0，用于重启后序号接续"""
+        for name in self._files():
+            with open(name, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            if lines:
+                return self._seq(lines[-1])
+        return 0
+
+    def write(self, frame: str):
+        self.handler.emit(logging.makeLogRecord({"msg": frame}))
+
+    def page(self, before: int | None = None, limit: int = 100) -> list[dict]:
+        """序号小于 before(不指定则为全部)的最新 limit 条记录，按序号升序返回"""
+        found = []
+        for name in self._files():
+            with open(name, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            for line in reversed(lines):
+                if before is None or self._seq(line) < before:
+                    found.append(line)
+                    if len(found) >= limit:
+                        return [json.loads(line) for line in reversed(found)]
+        return [json.loads(line) for line in reversed(found)]
+
+    def close(self):
+        self.handler.close()
+
+
+class Subscriber:
+    """一个订阅者的有界消息队列，由 Hub 在事件循环线程中写入"""
+
+    def __init__(self, maxsize: int, max_dropped: int):
+        # 多留一格给断开标记 None
+        self.queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize + 1)
+        self.maxsize = maxsize
+        self.max_dropped = max_dropped
+        self.dropped = 0
+        self.closed = False
+
+    def offer(self, frame: str):
+        """放入一帧，队列已满时丢弃最旧的一帧；丢弃过多时清空队列并放入断开标记"""
+        if self.closed:
+            return
+        if self.queue.qsize() >= self.maxsize:
+            self.queue.get_nowait()
+            self.dropped += 1
+            if self.dropped > self.max_dropped:
+                self.closed = True
+                while not self.queue.empty():
+                    self.queue.get_nowait()
+                self.queue.put_nowait(None)
+                return
+        self.queue.put_nowait(frame)
+
+    async def get(self) -> str | None:
+        """等待下一帧；订阅者因过慢被关闭时返回 None"""
+        return await self.queue.get()
+
+
+class Hub:
+    """事件广播中心。bind 绑定事件循环之前发布的事件直接记入历史，订阅时一并补发。
+    worker 通过 put(event) 发布 dict 事件，与原先的 SimpleQueue 接口一致。
+    每个事件编码为以序号开头的 JSON 对象 {"seq": 序号, ...}，序号从 1 开始连续递增，
+    指定 archive 时序号接续磁盘日志中的最后一条；推送给客户端的每一帧为一批事件组成的 JSON 数组。"""
+
+    # 每个订阅者最多积压的帧数
+    QUEUE_SIZE = 256
+    # 订阅者累计丢弃超过该帧数即视为慢客户端，断开连接
+    MAX_DROPPED = 1024
+    # 内存中保留的历史事件数
+    HISTORY_SIZE = 1000
+    # 事件循环来不及处理时最多暂存的事件数，超出丢弃最旧的
+    PENDING_SIZE = 10000
+    # 首个事件到达后等待多久(秒)再打包发送，期间到达的事件合并为一帧
+    BATCH_DELAY = 0.02
+
+    def __init__(
+        self,
+        queue_size: int = QUEUE_SIZE,
+        max_dropped: int = MAX_DROPPED,
+        history_size: int = HISTORY_SIZE,
+        archive: LogArchive | None = None,
+        batch_delay: float = BATCH_DELAY,
+    ):
+        self.queue_size = queue_size
+        self.max_dropped = max_dropped
+        self.batch_delay = batch_delay
+        self.loop: asyncio.AbstractEventLoop | None = None
+        # (序号, 事件 JSON) 环形缓冲区
+        self.history: deque[tuple[int, str]] = deque(maxlen=history_size)
+        self.subscribers: set[Subscriber] = set()
+        self.archive = archive
+        self.seq = archive.last_seq() if archive else 0
+        self.pending: deque[dict] = deque(maxlen=self.PENDING_SIZE)
+        self.scheduled = False
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+
+    def publish(self, event: dict):
+        """发布一个事件，可在任意线程调用，立即返回"""
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            self._dispatch([event])
+            return
+        self.pending.append(event)
+        # 已安排发送的批次会一并带走这个事件，不必再唤醒事件循环
+        if not self.scheduled:
+            self.scheduled = True
+            loop.call_soon_threadsafe(loop.call_later, self.batch_delay, self._flush)
+
+    put = publish
+
+    def _flush(self):
+        self.scheduled = False
+        batch = []
+        while self.pending:
+            batch.append(self.pending.popleft())
+        if batch:
+            self._dispatch(batch)
+
+    def _dispatch(self, events: list[dict]):
+        encoded = []
+        for event in events:
+            self.seq += 1
+            # 每个事件只编码一次，历史、磁盘日志与所有订阅者共用
+            line = json.dumps({"seq": self.seq, **event}, ensure_ascii=False)
+            self.history.append((self.seq, line))
+            if self.archive:
+                self.archive.write(line)
+            encoded.append(line)
+        frame = f"[{','.join(encoded)}]"
+        for sub in self.subscribers:
+            sub.offer(frame)
+
+    def since(self, seq: int) -> list[str]:
+        """内存历史中序号大于 seq 的事件 JSON；早于内存历史的部分需经 archive.page 获取"""
+        if seq > self.seq:
+            # 客户端的序号来自重启前且磁盘日志已不在，视为首次连接
+            seq = 0
+        if not self.history or seq >= self.history[-1][0]:
+            return []
+        start = max(0, seq - self.history[0][0] + 1)
+        return [line for _, line in islice(self.history, start, None)]
+
+    def subscribe(self, since: int = 0) -> tuple[Subscriber, list[str]]:
+        """新增订阅者，返回 (订阅者, 序号大于 since 的历史事件 JSON)。须在事件循环线程中调用，
+        历史快照与订阅在同一时刻完成，补发历史后不会漏收或重复收到消息。"""
+        sub = Subscriber(self.queue_size, self.max_dropped)
+        self.subscribers.add(sub)
+        return sub, self.since(since)
+
+    def unsubscribe(self, sub: Subscriber):
+        self.subscribers.discard(sub)
+
+    async def stream(self, websocket: WebSocket, since: int = 0):
+        """向已接受的 websocket 补发序号大于 since 的历史并持续推送新消息，
+        直到连接断开或因过慢被断开"""
+        sub, history = self.subscribe(since)
+
+        async def pump():
+            try:
+                if history:
+                    await websocket.send_text(f"[{','.join(history)}]")
+                while (frame := await sub.get()) is not None:
+                    await websocket.send_text(frame)
+                # 积压过多的慢客户端：断开后由前端重连，从历史补齐
+                await websocket.close(code=1013)
+            except (WebSocketDisconnect, RuntimeError):
+                pass
+
+        async def drain():
+            # 前端不发消息，只为及时发现连接断开
+            try:
+                while True:
+                    await websocket.receive_text()
+            except WebSocketDisconnect:
+                pass
+
+        tasks = [asyncio.create_task(pump()), asyncio.create_task(drain())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self.unsubscribe(sub)
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,177 @@
+"""极速答题的文字匹配：把提示红字与选项文字对应起来，不调用AI。
+选项和红字在入口处各去一次标点，之后只比较去标点后的文字。
+匹配分三级：精确 > 子串 > 模糊(长度比 ≥ 2/3，按编辑距离相似度打分)。
+红字有多段时不再枚举全部排列，而是求红字到选项的指派：
+- 单选题：从选项中的各个位置起把红字逐段首尾相接地铺放，判断"某种顺序拼接后与选项精确/子串匹配"。
+  段的终点由已用段的集合唯一确定，只展开与选项逐字吻合的段集合，同样的段不重复展开，
+  状态数至多 2^段数(红字通常不超过 8 段)，而不是 段数! 种排列
+- 多选题：在 红字 × 选项 的得分矩阵上按得分从高到低贪心指派，每个选项优先只分给一段红字
+每次匹配设有截止时间，超时返回已得到的最好结果。"""
+
+import time
+
+from question_bank import normalize, similarity
+
+EXACT, SUBSTRING, FUZZY = "精确", "子串", "模糊"
+RANK = {EXACT: 0, SUBSTRING: 1, FUZZY: 2}
+# 单次匹配的耗时上限(秒)
+TIME_LIMIT = 0.05
+
+
+def grade(option: str, text: str) -> tuple[str, float] | None:
+    """去标点后的选项与一段文字的匹配等级和得分(0-1)，不匹配返回 None"""
+    if not option or not text:
+        return None
+    if option == text:
+        return EXACT, 1.0
+    shorter, longer = sorted((len(option), len(text)))
+    if option in text or text in option:
+        return SUBSTRING, shorter / longer
+    if shorter / longer >= 2 / 3:
+        return FUZZY, similarity(option, text)
+    return None
+
+
+def _chains(
+    text: str, start: int, fragments: list[str], used: int, deadline: float
+) -> dict[int, int]:
+    """从 text[start] 起把红字逐段首尾相接地放进 text，每段至多用一次，used 中的段不可用。
+    返回 {已放下的段集合(位掩码): 终点}，fragments 须已排序，使相同的段相邻。
+    超时后不再展开，返回已得到的部分。"""
+    reached = {0: start}
+    frontier = [0]
+    while frontier and time.monotonic() <= deadline:
+        grown = []
+        for mask in frontier:
+            pos = reached[mask]
+            for i, frag in enumerate(fragments):
+                bit = 1 << i
+                if (mask | used) & bit or mask | bit in reached:
+                    continue
+                # 相同的段按下标顺序使用，避免重复展开等价的组合
+                if i and frag == fragments[i - 1] and not (mask | used) & (bit >> 1):
+                    continue
+                if text.startswith(frag, pos):
+                    reached[mask | bit] = pos + len(frag)
+                    grown.append(mask | bit)
+        frontier = grown
+    return reached
+
+
+def match_joined(
+    option: str, fragments: list[str], deadline: float
+) -> tuple[str, float] | None:
+    """选项与"红字按某种顺序拼接"的匹配等级(精确/子串)，不匹配或超时返回 None。
+    - 拼接串在选项内：从选项的某个位置起能把全部红字首尾相接地放下
+    - 选项在拼接串内：选项 = 某段的后缀 + 若干整段 + 某段的前缀，枚举首尾两段，中间部分用整段铺满
+    """
+    fragments = sorted(fragments)
+    n = len(fragments)
+    total = sum(map(len, fragments))
+    full = (1 << n) - 1
+    for start in range(len(option) - total + 1):
+        if time.monotonic() > deadline:
+            return None
+        if full in _chains(option, start, fragments, 0, deadline):
+            if total == len(option):
+                return EXACT, 1.0
+            return SUBSTRING, total / len(option)
+    if len(option) >= total:
+        return None
+    heads = [(-1, 0)] + [
+        (i, size)
+        for i, frag in enumerate(fragments)
+        for size in range(1, min(len(frag), len(option)) + 1)
+        if frag.endswith(option[:size])
+    ]
+    tails = [(-1, 0)] + [
+        (i, size)
+        for i, frag in enumerate(fragments)
+        for size in range(1, min(len(frag), len(option)) + 1)
+        if frag.startswith(option[-size:])
+    ]
+    for h, a in heads:
+        for t, b in tails:
+            if time.monotonic() > deadline:
+                return None
+            if (h == t and h >= 0) or a + b > len(option):
+                continue
+            used = (1 << h if h >= 0 else 0) | (1 << t if t >= 0 else 0)
+            ends = _chains(option, a, fragments, used, deadline)
+            if len(option) - b in ends.values():
+                return SUBSTRING, len(option) / total
+    return None
+
+
+def _better(a, b) -> bool:
+    """(等级, 得分) a 是否优于 b；b 为 None 时恒为真"""
+    return b is None or (RANK[a[0]], -a[1]) < (RANK[b[0]], -b[1])
+
+
+def best_option(
+    options: dict[str, str], fragments: list[str], time_limit: float = TIME_LIMIT
+) -> tuple[str, str, float] | None:
+    """单选题：返回与红字最匹配的 (字母, 等级, 得分)，都不匹配返回 None。
+    顺序为 按原顺序拼接的精确/子串 > 调整顺序后的精确/子串 > 按原顺序拼接的模糊。
+    原先模糊匹配排在调整顺序之前，而模糊只看长度比，毫不相干的选项会抢在顺序被打乱的精确匹配之前命中。
+    去标点后为空的选项(如 √、×)按原文是否出现在红字中判定精确匹配。"""
+    deadline = time.monotonic() + time_limit
+    raw_joined = "".join(fragments)
+    frags = [f for f in map(normalize, fragments) if f]
+    joined = "".join(frags)
+    texts = {letter: normalize(raw) for letter, raw in options.items()}
+    graded = {}
+    for letter, text in texts.items():
+        if text:
+            graded[letter] = grade(text, joined)
+        elif options[letter] and options[letter] in raw_joined:
+            graded[letter] = (EXACT, 1.0)
+    best = None
+    for letter, g in graded.items():
+        if g and g[0] != FUZZY and _better(g, best and best[1:]):
+            best = (letter, *g)
+    if best is None and len(frags) > 1:
+        for letter, text in texts.items():
+            g = match_joined(text, frags, deadline) if text else None
+            if g and _better(g, best and best[1:]):
+                best = (letter, *g)
+    if best is None:
+        for letter, g in graded.items():
+            if g and _better(g, best and best[1:]):
+                best = (letter, *g)
+    return best
+
+
+def assign(
+    options: dict[str, str], fragments: list[str], time_limit: float = TIME_LIMIT
+) -> list[tuple[str, str, float] | None]:
+    """多选题：为每段红字指派一个选项，返回与 fragments 同序的 (字母, 等级, 得分) 列表，
+    匹配不上的红字为 None。先在得分矩阵上按 (等级, 得分) 从优到劣贪心指派，
+    每个选项只分给一段红字；剩下的红字再各取自己最好的选项(可与其他红字相同)。"""
+    deadline = time.monotonic() + time_limit
+    texts = {letter: normalize(raw) for letter, raw in options.items()}
+    pairs = []
+    for i, raw_frag in enumerate(fragments):
+        frag = normalize(raw_frag)
+        for letter, text in texts.items():
+            if text:
+                g = grade(text, frag)
+            elif options[letter] and options[letter] in raw_frag:
+                g = (EXACT, 1.0)
+            else:
+                g = None
+            if g:
+                pairs.append((RANK[g[0]], -g[1], i, letter, g))
+        if time.monotonic() > deadline:
+            break
+    pairs.sort()
+    result = [None] * len(fragments)
+    used = set()
+    for *_, i, letter, g in pairs:
+        if result[i] is None and letter not in used:
+            result[i] = (letter, *g)
+            used.add(letter)
+    for *_, i, letter, g in pairs:
+        if result[i] is None:
+            result[i] = (letter, *g)
+    return result
@@ -0,0 +1,159 @@
+"""多设备调度：每台已连接的设备一个 MaaWorker，各自在独立线程中执行任务列表。
+所有 worker 共用已加载的 resource、题库与事件广播 hub，调试开关、极速模式、暂停/终止状态互相独立。
+未指定设备的操作作用于最近连接的设备，与原先只有一台设备时的接口行为一致。"""
+
+import threading
+
+from question_bank import QuestionBank
+from utils import AIResolver, MaaWorker, loader, log_event
+
+
+class DevicePool:
+    def __init__(self, hub, question_bank_path: str = "./config/question_bank.db"):
+        self.hub = hub
+        self.question_bank_path = question_bank_path
+        self.question_bank: QuestionBank | None = None
+        # AI 配置(ConfigModel 的字段)，保存设置后才能连接设备
+        self.config: dict | None = None
+        # 设备地址 → worker / 正在执行任务的线程 / 任务列表
+        self.workers: dict[str, MaaWorker] = {}
+        self.threads: dict[str, threading.Thread] = {}
+        self.tasklists: dict[str, list[str]] = {}
+        self.default: str | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.config and self.config.get("api_key"))
+
+    def configure(self, config: dict):
+        """保存 AI 配置并应用到所有已创建的 worker"""
+        self.config = dict(config)
+        # 其他请求线程可能同时在 connect 中加入新的 worker
+        with self._lock:
+            workers = list(self.workers.values())
+        for worker in workers:
+            worker.update_ai_models(
+                model=config["model"],
+                base_url=config.get("base_url"),
+                hedge_model=config.get("hedge_model"),
+                fast_model=config.get("fast_model"),
+            )
+
+    def _create_worker(self) -> MaaWorker:
+        with self._lock:
+            if self.question_bank is None:
+                self.question_bank = QuestionBank(self.question_bank_path)
+        config = self.config
+        return MaaWorker(
+            self.hub,
+            api_key=config["api_key"],
+            model=config["model"],
+            base_url=config.get("base_url") or AIResolver.DEFAULT_BASE_URL,
+            hedge_model=config.get("hedge_model") or None,
+            fast_model=config.get("fast_model") or None,
+            question_bank=self.question_bank,
+        )
+
+    def connect(self, device) -> bool:
+        """连接设备，首次连接时为其创建 worker；成功后成为默认设备。
+        资源加载或模型预热失败时不创建 worker，返回 False"""
+        worker = self.workers.get(device.address)
+        if worker is None:
+            # 等待资源加载与预热时不能持有锁，否则其他设备的连接与任务都会被阻塞
+            if not loader.wait():
+                self.hub.put(
+                    log_event(
+                        f"MAA初始化失败: {loader.error}",
+                        level="error",
+                        device=device.address,
+                    )
+                )
+                return False
+            worker = self._create_worker()
+            with self._lock:
+                # 同一设备被并发连接时只保留先创建的 worker
+                worker = self.workers.setdefault(device.address, worker)
+        if not worker.connect_device(device):
+            return False
+        self.default = device.address
+        return True
+
+    def resolve(self, address: str | None) -> str | None:
+        """未指定设备时取默认设备；设备未连接过返回 None"""
+        address = address or self.default
+        return address if address in self.workers else None
+
+    def start(
+        self,
+        address: str | None,
+        tasklist: list[str],
+        fast_answer: bool = False,
+        debug: bool = False,
+    ) -> str | None:
+        """在设备上开始执行任务列表，返回失败原因，成功返回 None"""
+        address = self.resolve(address)
+        if address is None:
+            return "请先连接设备"
+        worker = self.workers[address]
+        if not worker.connected:
+            return "请先连接设备"
+        with self._lock:
+            if address in self.threads:
+                return "任务正在终止，请稍后" if worker.stop_flag else "任务已开始"
+            thread = threading.Thread(
+                target=self._run,
+                args=(address, tasklist, fast_answer, debug),
+                name=f"worker-{address}",
+                daemon=True,
+            )
+            self.threads[address] = thread
+            self.tasklists[address] = list(tasklist)
+        thread.start()
+        return None
+
+    def _run(self, address: str, tasklist, fast_answer, debug):
+        try:
+            self.workers[address].task(tasklist, fast_answer, debug)
+        finally:
+            with self._lock:
+                del self.threads[address]
+
+    def stop(self, address: str | None) -> str | None:
+        """通知设备上的任务终止，返回失败原因，成功返回 None。
+        任务在下一个检查点退出，退出前同一设备不能开始新任务"""
+        address = self.resolve(address)
+        if address is None or address not in self.threads:
+            return "任务未开始"
+        worker = self.workers[address]
+        worker.stop_flag = True
+        # 等待接管时也能退出
+        worker.pause_flag = False
+        return None
+
+    def resume(self, address: str | None) -> str | None:
+        """用户完成接管后恢复任务，返回失败原因，成功返回 None"""
+        address = self.resolve(address)
+        if address is None:
+            return "请先连接设备"
+        self.workers[address].pause_flag = False
+        return None
+
+    def status(self) -> list[dict]:
+        """所有设备的当前状态"""
+        return [
+            {
+                "device": address,
+                "default": address == self.default,
+                "connected": worker.connected,
+                "running": address in self.threads and not worker.stop_flag,
+                "stopping": address in self.threads and worker.stop_flag,
+                "paused": worker.pause_flag,
+                "tasklist": self.tasklists.get(address, []),
+                "stage": worker.stage,
+                "question": worker.question,
+                "debug": worker.debug,
+                "fast_answer": worker.fast_answer,
+            }
+            for address, worker in list(self.workers.items())
+        ]
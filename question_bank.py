@@ -0,0 +1,240 @@
+"""本地题库：保存已确认答对的题目与答案，答题前优先查询，命中则跳过查看提示和AI。
+题干以去标点后的OCR文字为主键，OCR失败时以题干区域的差值哈希指纹(十六进制)代替，
+查询时先比文字，再比指纹。
+模糊查询先用二元组(bigram)倒排索引召回候选，再按编辑距离计算相似度。"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    type TEXT NOT NULL,
+    stem TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    updated REAL NOT NULL,
+    UNIQUE (type, stem)
+);
+CREATE TABLE IF NOT EXISTS grams (
+    gram TEXT NOT NULL,
+    qid INTEGER NOT NULL REFERENCES questions (id) ON DELETE CASCADE,
+    PRIMARY KEY (gram, qid)
+) WITHOUT ROWID;
+"""
+
+
+def normalize(text: str) -> str:
+    """去除空白与标点，OCR的断行、全半角标点差异不影响匹配。题干、选项与红字比对共用"""
+    return re.sub(r"\W", "", text)
+
+
+def split_tokens(answer) -> list[str]:
+    """点选填空题答案拆成按填空顺序排列的词：AI 返回 "词1,词2" 或词列表，逗号分隔，全半角均可"""
+    if isinstance(answer, list):
+        return [t for t in answer if t]
+    return [t.strip() for t in answer.replace("，", ",").split(",") if t.strip()]
+
+
+def bigrams(text: str) -> set[str]:
+    return {text[i : i + 2] for i in range(len(text) - 1)}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein 编辑距离，单行滚动数组"""
+    if len(a) < len(b):
+        a, b = b, a
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        cur = [i]
+        for j, cb in enumerate(b, start=1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        prev = cur
+    return prev[-1]
+
+
+def similarity(a: str, b: str) -> float:
+    if not a or not b:
+        return 0.0
+    return 1 - edit_distance(a, b) / max(len(a), len(b))
+
+
+class QuestionBank:
+    """SQLite 题库。answer 字段按题型保存：
+    - 单选题/多选题：{"letters": [...], "texts": [...]}，查询时按选项文字重新映射字母，
+      同题干选项顺序被打乱也能命中
+    - 填空题：{"text": "..."}
+    - 点选填空题：{"tokens": [...]}，按填空顺序排列的词，重放时依次点选
+    """
+
+    # 模糊匹配最低相似度；召回候选数上限
+    MIN_SIMILARITY = 0.9
+    MAX_CANDIDATES = 20
+    # 指纹汉明距离阈值(64位差值哈希)
+    MAX_HAMMING = 4
+    # 题干太短时二元组区分度不够，只做精确匹配
+    MIN_FUZZY_LEN = 6
+
+    def __init__(self, path: str):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def lookup(
+        self, question_type: str, stem: str, fingerprint: int, options: dict
+    ) -> tuple | None:
+        """查询题库，命中返回 (题目id, 答案)，未命中返回 None。
+        options 为当前题目的 {字母: (文字, box)}，选择题据此把保存的答案文字映射回字母。"""
+        with self._lock:
+            for qid, answer in self._candidates(question_type, stem, fingerprint):
+                resolved = self._resolve(question_type, answer, options)
+                if resolved is not None:
+                    self._conn.execute(
+                        "UPDATE questions SET hits = hits + 1 WHERE id = ?", (qid,)
+                    )
+                    self._conn.commit()
+                    self.hits += 1
+                    return qid, resolved
+            self.misses += 1
+        return None
+
+    def _candidates(self, question_type: str, stem: str, fingerprint: int):
+        """按 精确题干 > 模糊题干 > 图片指纹 的顺序产出候选 (id, answer)"""
+        if stem:
+            row = self._conn.execute(
+                "SELECT id, answer FROM questions WHERE type = ? AND stem = ?",
+                (question_type, stem),
+            ).fetchone()
+            if row:
+                yield row
+            if len(stem) >= self.MIN_FUZZY_LEN:
+                yield from self._fuzzy(question_type, stem)
+            return
+        if fingerprint:
+            rows = self._conn.execute(
+                "SELECT id, answer, fingerprint FROM questions WHERE type = ?",
+                (question_type,),
+            ).fetchall()
+            near = [
+                ((int(fp, 16) ^ fingerprint).bit_count(), qid, answer)
+                for qid, answer, fp in rows
+            ]
+            for dist, qid, answer in sorted(near):
+                if dist > self.MAX_HAMMING:
+                    break
+                yield qid, answer
+
+    def _fuzzy(self, question_type: str, stem: str):
+        grams = list(bigrams(stem))
+        placeholders = ",".join("?" * len(grams))
+        rows = self._conn.execute(
+            f"""SELECT q.id, q.stem, q.answer, COUNT(*) AS shared
+                FROM grams g JOIN questions q ON q.id = g.qid
+                WHERE g.gram IN ({placeholders}) AND q.type = ?
+                GROUP BY q.id ORDER BY shared DESC LIMIT ?""",
+            (*grams, question_type, self.MAX_CANDIDATES),
+        ).fetchall()
+        digits = re.findall(r"\d+", stem)
+        scored = []
+        for qid, other, answer, _ in rows:
+            if other == stem:
+                continue
+            # 年份、数量不同的题干字面上几乎一样，答案却不同
+            if re.findall(r"\d+", other) != digits:
+                continue
+            score = similarity(stem, other)
+            if score >= self.MIN_SIMILARITY:
+                scored.append((score, qid, answer))
+        for _, qid, answer in sorted(scored, reverse=True):
+            yield qid, answer
+
+    @staticmethod
+    def _resolve(question_type: str, answer: str, options: dict):
+        answer = json.loads(answer)
+        if question_type in ("单选题", "多选题"):
+            current = {normalize(text): letter for letter, (text, _) in options.items()}
+            letters = [current.get(text) for text in answer["texts"]]
+            if not letters or None in letters:
+                return None
+            return letters
+        if question_type == "点选填空题":
+            # 旧版本按 {"text": ...} 保存，逗号分隔的答案仍能拆出顺序
+            return split_tokens(answer.get("tokens") or answer.get("text", "")) or None
+        return answer["text"] or None
+
+    def record(
+        self,
+        question_type: str,
+        stem: str,
+        fingerprint: int,
+        answer,
+        options: dict,
+    ):
+        """保存答对的题目。选择题同时保存所选选项的文字，缺少选项文字时不入库；
+        点选填空题保存有序的词列表，不拼接成一个字符串，以免丢失分隔与顺序。"""
+        if not stem and not fingerprint:
+            return
+        if question_type in ("单选题", "多选题"):
+            texts = [
+                normalize(options[letter][0]) for letter in answer if letter in options
+            ]
+            if len(texts) != len(answer) or not all(texts):
+                return
+            payload = {"letters": list(answer), "texts": texts}
+        elif question_type == "点选填空题":
+            tokens = split_tokens(answer)
+            if not tokens:
+                return
+            payload = {"tokens": tokens}
+        else:
+            text = "".join(answer) if isinstance(answer, list) else answer
+            if not text:
+                return
+            payload = {"text": text}
+        with self._lock:
+            cur = self._conn.execute(
+                """INSERT INTO questions (type, stem, fingerprint, answer, updated)
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (type, stem) DO UPDATE SET
+                   fingerprint = excluded.fingerprint,
+                   answer = excluded.answer,
+                   updated = excluded.updated
+                   RETURNING id""",
+                (
+                    question_type,
+                    stem or f"#{fingerprint:016x}",
+                    f"{fingerprint:016x}",
+                    json.dumps(payload, ensure_ascii=False),
+                    time.time(),
+                ),
+            )
+            qid = cur.fetchone()[0]
+            if stem:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO grams (gram, qid) VALUES (?, ?)",
+                    [(gram, qid) for gram in bigrams(stem)],
+                )
+            self._conn.commit()
+
+    def forget(self, qid: int):
+        """题库答案被判错时删除该条目"""
+        with self._lock:
+            self._conn.execute("DELETE FROM questions WHERE id = ?", (qid,))
+            self._conn.commit()
+
+    def stats(self) -> str:
+        with self._lock:
+            total = self._conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+        return f"命中={self.hits}, 未命中={self.misses}, 题目数={total}"
@@ -0,0 +1,108 @@
+"""AIResolver 的对冲请求与重试：以假的异步客户端按模型脚本化每次请求的延迟与结果"""
+
+import asyncio
+import unittest
+from unittest import mock
+
+import utils
+from utils import AIResolver
+
+
+class Response:
+    def __init__(self, status_code: int, content: str = ""):
+        self.status_code = status_code
+        self.content = content
+        self.text = content
+
+    def json(self) -> dict:
+        return {"choices": [{"message": {"content": self.content}}]}
+
+
+class FakeClient:
+    """script 为 {模型: (延迟秒数, Response)}，记录每次请求的模型与被取消的请求"""
+
+    def __init__(self, script: dict):
+        self.script = script
+        self.calls = []
+        self.cancelled = []
+
+    async def post(self, url, json):
+        model = json["model"]
+        self.calls.append(model)
+        delay, response = self.script[model]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        return response
+
+
+class HedgeTest(unittest.IsolatedAsyncioTestCase):
+    def resolver(self, script: dict, **kwargs) -> AIResolver:
+        options = {"hedge_model": "hedge", "hedge_after": 0.05, **kwargs}
+        resolver = AIResolver(api_key="", model="main", **options)
+        resolver.session = FakeClient(script)
+        return resolver
+
+    async def complete(self, resolver: AIResolver):
+        data = {"model": "main", "messages": []}
+        return await resolver._complete("选择题", data, AIResolver._parse_choice)
+
+    async def test_fast_primary_fires_no_hedge(self):
+        resolver = self.resolver({"main": (0.0, Response(200, "A"))})
+        self.assertEqual(await self.complete(resolver), ["A"])
+        self.assertEqual(resolver.session.calls, ["main"])
+        self.assertEqual(resolver.counters["hedges_fired"], 0)
+
+    async def test_slow_primary_hedge_wins_and_primary_is_cancelled(self):
+        resolver = self.resolver(
+            {"main": (5.0, Response(200, "A")), "hedge": (0.01, Response(200, "B"))}
+        )
+        self.assertEqual(await self.complete(resolver), ["B"])
+        # cancel() 在下一轮事件循环才送达落败的请求
+        await asyncio.sleep(0)
+        self.assertEqual(resolver.session.calls, ["main", "hedge"])
+        self.assertEqual(resolver.session.cancelled, ["main"])
+        self.assertEqual(resolver.counters["hedges_fired"], 1)
+        self.assertEqual(resolver.counters["hedges_won"], 1)
+
+    async def test_failed_primary_waits_for_pending_hedge(self):
+        """对冲已发出后首个请求失败，不重试，继续等待对冲请求"""
+        resolver = self.resolver(
+            {"main": (0.08, Response(500, "busy")), "hedge": (0.1, Response(200, "C"))}
+        )
+        self.assertEqual(await self.complete(resolver), ["C"])
+        self.assertEqual(resolver.session.calls, ["main", "hedge"])
+        self.assertEqual(resolver.counters["retries"], 0)
+        self.assertEqual(resolver.counters["hedges_won"], 1)
+
+    async def test_unparsable_answer_is_not_a_winner(self):
+        resolver = self.resolver(
+            {"main": (0.08, Response(200, "无")), "hedge": (0.1, Response(200, "D"))}
+        )
+        self.assertEqual(await self.complete(resolver), ["D"])
+
+    async def test_every_attempt_times_out(self):
+        """每轮主请求与对冲请求都超时：重试 max_retries 次后返回 None，退避间隔带全抖动"""
+        resolver = self.resolver(
+            {"main": (5.0, Response(200, "A")), "hedge": (5.0, Response(200, "B"))},
+            attempt_timeout=0.1,
+            hedge_after=0.02,
+            max_retries=2,
+        )
+        with mock.patch.object(utils, "uniform", return_value=0.0) as jitter:
+            self.assertIsNone(await self.complete(resolver))
+        self.assertEqual(resolver.session.calls, ["main", "hedge"] * 3)
+        self.assertEqual(
+            [call.args for call in jitter.call_args_list], [(0, 1.0), (0, 2.0)]
+        )
+        c = resolver.counters
+        self.assertEqual(
+            (c["requests"], c["attempts"], c["timeouts"], c["retries"], c["failures"]),
+            (1, 6, 6, 2, 1),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
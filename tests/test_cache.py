@@ -0,0 +1,91 @@
+"""按像素内容缓存：OCR 结果缓存与信息流卡片记忆"""
+
+import unittest
+
+import numpy as np
+
+from utils import CardMemo, OCRCache
+
+ROI = [10, 20, 40, 30]
+
+
+def screen(seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).integers(0, 256, (100, 80, 3), dtype=np.uint8)
+
+
+class OCRCacheTest(unittest.TestCase):
+    def test_identical_crop_hits(self):
+        """ROI 内像素相同即命中，ROI 外的变化不影响"""
+        cache = OCRCache()
+        image = screen(0)
+        cache.put(OCRCache.key("题干识别", image, ROI), "题干")
+        other = image.copy()
+        other[0, 0] ^= 255
+        self.assertEqual(cache.get(OCRCache.key("题干识别", other, ROI)), "题干")
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_one_pixel_change_misses(self):
+        cache = OCRCache()
+        image = screen(0)
+        cache.put(OCRCache.key("题干识别", image, ROI), "题干")
+        changed = image.copy()
+        changed[ROI[1] + 29, ROI[0] + 39, 2] ^= 1
+        self.assertIsNone(cache.get(OCRCache.key("题干识别", changed, ROI)))
+        # 同一区域的其他识别名、其他 ROI 各自独立
+        self.assertIsNone(cache.get(OCRCache.key("扫描选项", image, ROI)))
+        self.assertIsNone(cache.get(OCRCache.key("题干识别", image, [10, 20, 40, 29])))
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+
+    def test_evicts_least_recently_used(self):
+        cache = OCRCache(maxsize=2)
+        keys = [OCRCache.key("题干识别", screen(seed), ROI) for seed in range(3)]
+        cache.put(keys[0], "a")
+        cache.put(keys[1], "b")
+        # 读取使 a 成为最近使用，放入 c 时淘汰 b
+        self.assertEqual(cache.get(keys[0]), "a")
+        cache.put(keys[2], "c")
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertEqual(cache.get(keys[0]), "a")
+        self.assertEqual(cache.get(keys[2]), "c")
+        self.assertEqual(cache.stats(), "命中=3, 未命中=1, 命中率=75.0%, 条目=2")
+
+
+def flip(card: np.ndarray, bits: int) -> np.ndarray:
+    """翻转 card 的前 bits 位"""
+    flipped = np.unpackbits(card)
+    flipped[:bits] ^= 1
+    return np.packbits(flipped)
+
+
+class CardMemoTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.cards = rng.integers(0, 256, (2, 32), dtype=np.uint8)
+        self.memo = CardMemo()
+        self.memo.remember(self.cards, np.array([True, False]))
+
+    def test_near_duplicate_is_reused(self):
+        """滑动后同一张卡片的哈希有少量位不同，在阈值内沿用记录"""
+        near = np.stack([flip(self.cards[0], CardMemo.MAX_HAMMING), self.cards[1]])
+        self.assertEqual(self.memo.lookup(near).tolist(), [1, 0])
+        self.assertEqual((self.memo.hits, self.memo.misses), (2, 0))
+
+    def test_different_card_is_new(self):
+        far = flip(self.cards[0], CardMemo.MAX_HAMMING + 1)[None]
+        other = np.random.default_rng(2).integers(0, 256, (1, 32), dtype=np.uint8)
+        self.assertEqual(
+            self.memo.lookup(np.concatenate((far, other))).tolist(), [-1, -1]
+        )
+        self.assertEqual((self.memo.hits, self.memo.misses), (0, 2))
+
+    def test_mark_read_and_stats(self):
+        self.memo.mark_read(flip(self.cards[0], 3))
+        self.assertEqual(self.memo.lookup(self.cards).tolist(), [0, 0])
+        self.assertEqual(self.memo.stats(), "命中=2, 未命中=0, 命中率=100.0%, 条目=2")
+        self.memo.clear()
+        self.assertEqual(self.memo.lookup(self.cards).tolist(), [-1, -1])
+        self.assertEqual(self.memo.stats(), "命中=0, 未命中=2, 命中率=0.0%, 条目=0")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+"""事件广播 Hub：广播、背压、按序号补发与磁盘日志"""
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from hub import Hub, LogArchive
+
+
+def event(message: str) -> dict:
+    return {"level": "info", "message": message}
+
+
+def messages(frame: str) -> list[str]:
+    return [e["message"] for e in json.loads(frame)]
+
+
+class BroadcastTest(unittest.IsolatedAsyncioTestCase):
+    async def test_every_subscriber_gets_every_event(self):
+        hub = Hub(batch_delay=0)
+        hub.bind(asyncio.get_running_loop())
+        subs = [hub.subscribe()[0] for _ in range(3)]
+        publisher = threading.Thread(
+            target=lambda: [hub.publish(event(str(i))) for i in range(5)]
+        )
+        publisher.start()
+        publisher.join()
+        for sub in subs:
+            received = []
+            while len(received) < 5:
+                received += messages(await asyncio.wait_for(sub.get(), 1))
+            self.assertEqual(received, ["0", "1", "2", "3", "4"])
+
+    async def test_unsubscribed_gets_nothing(self):
+        hub = Hub()
+        sub, _ = hub.subscribe()
+        hub.unsubscribe(sub)
+        hub._dispatch([event("x")])
+        self.assertTrue(sub.queue.empty())
+
+
+class BatchTest(unittest.IsolatedAsyncioTestCase):
+    async def test_events_within_batch_delay_share_one_frame(self):
+        hub = Hub(batch_delay=0.05)
+        hub.bind(asyncio.get_running_loop())
+        sub, _ = hub.subscribe()
+        publisher = threading.Thread(
+            target=lambda: [hub.publish(event(str(i))) for i in range(20)]
+        )
+        publisher.start()
+        publisher.join()
+        frame = await asyncio.wait_for(sub.get(), 1)
+        self.assertEqual(messages(frame), [str(i) for i in range(20)])
+        self.assertEqual([e["seq"] for e in json.loads(frame)], list(range(1, 21)))
+        self.assertTrue(sub.queue.empty())
+
+    def test_publish_before_bind_goes_to_history(self):
+        hub = Hub()
+        hub.publish(event("early"))
+        self.assertEqual(json.loads(hub.since(0)[0])["message"], "early")
+
+
+class BackpressureTest(unittest.TestCase):
+    def test_drops_oldest_then_closes(self):
+        hub = Hub(queue_size=8, max_dropped=16)
+        sub, _ = hub.subscribe()
+        for i in range(10):
+            hub._dispatch([event(str(i))])
+        self.assertEqual((sub.queue.qsize(), sub.dropped), (8, 2))
+        self.assertEqual(messages(sub.queue.get_nowait()), ["2"])
+        for i in range(30):
+            hub._dispatch([event(str(i))])
+        self.assertTrue(sub.closed)
+        self.assertIsNone(sub.queue.get_nowait())
+        self.assertTrue(sub.queue.empty())
+
+
+class HistoryTest(unittest.TestCase):
+    def test_since_replays_only_missing_events(self):
+        hub = Hub(history_size=5)
+        hub._dispatch([event(str(i)) for i in range(8)])
+        seqs = [json.loads(line)["seq"] for line in hub.since(6)]
+        self.assertEqual(seqs, [7, 8])
+        # 早于内存历史的部分不再补发，内存中只保留最近 5 条
+        self.assertEqual(
+            [json.loads(line)["seq"] for line in hub.since(0)], [4, 5, 6, 7, 8]
+        )
+        self.assertEqual(hub.since(8), [])
+
+    def test_since_from_before_restart(self):
+        """客户端的序号大于服务端当前序号时视为首次连接"""
+        hub = Hub()
+        hub._dispatch([event("a")])
+        self.assertEqual(len(hub.since(100)), 1)
+
+    def test_subscribe_returns_history_snapshot(self):
+        hub = Hub()
+        hub._dispatch([event("a"), event("b")])
+        sub, history = hub.subscribe(since=1)
+        self.assertEqual([json.loads(line)["message"] for line in history], ["b"])
+        self.assertTrue(sub.queue.empty())
+
+
+class ArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "logs", "webui.log")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_page_across_rotated_files(self):
+        archive = LogArchive(self.path, max_bytes=400, backups=10)
+        hub = Hub(archive=archive)
+        for i in range(40):
+            hub._dispatch([event(str(i))])
+        archive.close()
+        self.assertTrue(os.path.exists(f"{self.path}.1"))
+        page = archive.page(before=21, limit=5)
+        self.assertEqual([e["seq"] for e in page], [16, 17, 18, 19, 20])
+        self.assertEqual([e["seq"] for e in archive.page(limit=2)], [39, 40])
+
+    def test_seq_continues_after_restart(self):
+        archive = LogArchive(self.path)
+        Hub(archive=archive)._dispatch([event("a"), event("b")])
+        archive.close()
+        archive = LogArchive(self.path)
+        hub = Hub(archive=archive)
+        hub._dispatch([event("c")])
+        archive.close()
+        self.assertEqual(hub.seq, 3)
+        self.assertEqual(archive.last_seq(), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""极速答题文字匹配：单选题拼接匹配与穷举排列一致，多选题指派"""
+
+import random
+import unittest
+
+from benchmark.matching import random_case, reference_best
+from matching import EXACT, FUZZY, SUBSTRING, assign, best_option, grade
+
+
+class GradeTest(unittest.TestCase):
+    def test_tiers(self):
+        self.assertEqual(grade("发展", "发展"), (EXACT, 1.0))
+        self.assertEqual(grade("发展", "高质量发展"), (SUBSTRING, 0.4))
+        self.assertEqual(grade("高质量发展", "高质发展")[0], FUZZY)
+        self.assertIsNone(grade("发展", "改革开放新时代"))
+
+
+class BestOptionTest(unittest.TestCase):
+    def test_fragment_fits_only_at_later_occurrence(self):
+        """ "发展"第一次出现的位置放不下，须用第二次出现的位置才能与"高质量"首尾相接"""
+        options = {"A": "推动发展和高质量发展", "B": "改革开放"}
+        self.assertEqual(best_option(options, ["发展", "高质量"])[:2], ("A", SUBSTRING))
+
+    def test_reordered_exact(self):
+        options = {"A": "创新协调绿色", "B": "开放共享"}
+        self.assertEqual(
+            best_option(options, ["绿色", "创新", "协调"]), ("A", EXACT, 1.0)
+        )
+
+    def test_option_inside_reordered_fragments(self):
+        """选项 = 某段的后缀 + 整段 + 某段的前缀"""
+        options = {"A": "量发展推", "B": "改革"}
+        self.assertEqual(
+            best_option(options, ["发展", "高质量", "推动"])[:2], ("A", SUBSTRING)
+        )
+
+    def test_reordered_match_outranks_in_order_fuzzy(self):
+        options = {"A": "改革开放促进", "B": "高质量发展"}
+        self.assertEqual(best_option(options, ["发展", "高质量"])[:2], ("B", EXACT))
+
+    def test_symbol_option(self):
+        self.assertEqual(best_option({"A": "√", "B": "×"}, ["×"]), ("B", EXACT, 1.0))
+
+    def test_matches_exhaustive_permutations(self):
+        rng = random.Random(1)
+        for _ in range(2000):
+            options, frags = random_case(rng)
+            expected = reference_best(options, frags)
+            actual = best_option(options, frags, time_limit=1.0)
+            if expected is None:
+                self.assertIsNone(actual, (options, frags))
+                continue
+            tier, letters = expected
+            self.assertEqual(actual[1], tier, (options, frags))
+            self.assertIn(actual[0], letters, (options, frags))
+
+
+class AssignTest(unittest.TestCase):
+    def test_each_option_used_once_first(self):
+        options = {"A": "人民至上", "B": "人民", "C": "自信自立"}
+        result = assign(options, ["人民至上", "人民", "自立"])
+        self.assertEqual([r[0] for r in result], ["A", "B", "C"])
+
+    def test_unmatched_fragment(self):
+        self.assertEqual(assign({"A": "守正创新"}, ["甲乙丙丁戊己庚辛"]), [None])
+
+
+if __name__ == "__main__":
+    unittest.main()
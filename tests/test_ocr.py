@@ -0,0 +1,78 @@
+"""批量OCR：拼接裁剪图一次识别，按文字框位置分回各块，未检出的块单独兜底识别"""
+
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from utils import batch_ocr
+
+# 各块的纯色底色 → 块内的文字框 (相对块左上角的 x, y, 文字)；空列表表示整体识别检不出文字
+CROPS = {
+    10: [(40, 2, "乙"), (0, 0, "甲")],
+    20: [],
+    30: [(0, 30, "第二行"), (0, 0, "第一行")],
+}
+
+
+def crop(value: int, height: int = 48, width: int = 120) -> np.ndarray:
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+class StubOCR:
+    """按画布上各块的底色定位块，返回其中预设的文字框；仅识别模式返回底色编号"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, param, image):
+        self.calls.append((param.only_rec, image.shape[:2]))
+        if param.only_rec:
+            text = f" 兜底{image[0, 0, 0]} "
+            return SimpleNamespace(best_result=SimpleNamespace(text=text))
+        results = []
+        for value, words in CROPS.items():
+            rows = np.flatnonzero((image[:, :, 0] == value).any(axis=1))
+            if not rows.size:
+                continue
+            left = np.flatnonzero(image[rows[0], :, 0] == value)[0]
+            for dx, dy, text in words:
+                box = [left + dx, rows[0] + dy, 30, 14]
+                results.append(SimpleNamespace(box=box, text=text))
+        # 识别结果的顺序与块无关
+        return SimpleNamespace(filtered_results=results[::-1])
+
+
+class BatchOCRTest(unittest.TestCase):
+    def test_results_map_back_to_their_crops(self):
+        run = StubOCR()
+        texts = batch_ocr([crop(value) for value in CROPS], run)
+        # 块内按行、行内按列拼接；检不出文字的块单独仅识别兜底并去掉空白
+        self.assertEqual(texts, ["甲乙", "兜底20", "第一行第二行"])
+        # 一次整体识别(三块拼在一张画布上)，加上对空白块的一次仅识别
+        (_, canvas), fallback = run.calls
+        self.assertEqual(canvas[0], 8 + 3 * 48 + 2 * 32 + 8)
+        self.assertEqual(fallback, (True, (48, 120)))
+
+    def test_no_fallback_when_every_crop_has_text(self):
+        run = StubOCR()
+        texts = batch_ocr([crop(30), crop(10, height=80)], run)
+        self.assertEqual(texts, ["第一行第二行", "甲乙"])
+        self.assertEqual(len(run.calls), 1)
+
+    def test_failed_detection_falls_back_for_every_crop(self):
+        calls = []
+
+        def run(param, image):
+            calls.append(param.only_rec)
+            if not param.only_rec:
+                return None
+            return SimpleNamespace(best_result=None)
+
+        self.assertEqual(batch_ocr([crop(10), crop(30)], run), ["", ""])
+        self.assertEqual(calls, [False, True, True])
+        self.assertEqual(batch_ocr([], run), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
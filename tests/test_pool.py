@@ -0,0 +1,136 @@
+"""设备池与资源加载：加载失败时不卡死、不创建 worker，等待资源时不持有设备池的锁"""
+
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import pool
+from pool import DevicePool
+from utils import ResourceLoader
+
+CONFIG = {"api_key": "sk-test", "model": "test"}
+
+
+class Recorder:
+    """只记录事件的 hub"""
+
+    def __init__(self):
+        self.events = []
+
+    def put(self, event: dict):
+        self.events.append(event)
+
+
+class FakeLoader:
+    def __init__(self, ok: bool, gate: threading.Event | None = None):
+        self.ok = ok
+        self.gate = gate
+        self.error = None if ok else "缺少模型文件: model/ocr/rec.onnx"
+
+    def wait(self, timeout=None) -> bool:
+        if self.gate is not None:
+            self.gate.wait(5)
+        return self.ok
+
+
+class BrokenResource:
+    def post_bundle(self, path):
+        raise OSError("磁盘错误")
+
+
+class RejectedResource:
+    def post_bundle(self, path):
+        return SimpleNamespace(wait=lambda: SimpleNamespace(succeeded=False))
+
+
+def device(address: str):
+    return SimpleNamespace(address=address)
+
+
+class LoaderTest(unittest.TestCase):
+    def check_failed(self, resource, error: str):
+        statuses = []
+        loader = ResourceLoader(resource, "./missing")
+        loader.start(statuses.append)
+        self.assertFalse(loader.wait(5))
+        self.assertTrue(loader.done.is_set())
+        self.assertEqual(loader.state, "failed")
+        self.assertIn(error, loader.error)
+        self.assertEqual(len(statuses), 1)
+        self.assertFalse(statuses[0]["ready"])
+        # 已结束后注册的回调立即调用
+        loader.start(statuses.append)
+        self.assertEqual(len(statuses), 2)
+
+    def test_exception_still_finishes(self):
+        with mock.patch("traceback.print_exc"):
+            self.check_failed(BrokenResource(), "磁盘错误")
+
+    def test_failed_bundle_is_reported(self):
+        self.check_failed(RejectedResource(), "资源加载失败")
+
+
+class PoolTest(unittest.TestCase):
+    def setUp(self):
+        self.hub = Recorder()
+        self.pool = DevicePool(self.hub, question_bank_path=":memory:")
+        self.pool.configure(CONFIG)
+
+    def test_connect_fails_when_resources_failed(self):
+        with mock.patch.object(pool, "loader", FakeLoader(ok=False)):
+            self.assertFalse(self.pool.connect(device("127.0.0.1:5555")))
+        self.assertEqual(self.pool.workers, {})
+        self.assertIsNone(self.pool.default)
+        (event,) = self.hub.events
+        self.assertEqual(event["level"], "error")
+        self.assertEqual(event["device"], "127.0.0.1:5555")
+        self.assertIn("缺少模型文件", event["message"])
+
+    def test_connect_waits_for_resources_without_the_lock(self):
+        """一台设备等待资源加载时，其他设备的操作不被阻塞"""
+        gate = threading.Event()
+        with mock.patch.object(pool, "loader", FakeLoader(ok=False, gate=gate)):
+            connecting = threading.Thread(
+                target=self.pool.connect, args=(device("127.0.0.1:5555"),)
+            )
+            connecting.start()
+            time.sleep(0.05)
+            acquired = self.pool._lock.acquire(timeout=1)
+            if acquired:
+                self.pool._lock.release()
+            gate.set()
+            connecting.join(5)
+        self.assertTrue(acquired)
+        self.assertFalse(connecting.is_alive())
+
+    def test_configure_while_a_device_connects(self):
+        """更新配置期间其他线程加入新 worker，不影响遍历"""
+        pool_ = self.pool
+        updated = []
+
+        class Worker:
+            def __init__(self, address):
+                self.address = address
+
+            def update_ai_models(self, **kwargs):
+                updated.append((self.address, kwargs["model"]))
+                # 模拟 connect 在此期间加入了新设备
+                with pool_._lock:
+                    pool_.workers.setdefault("new", Worker("new"))
+
+        pool_.workers = {"a": Worker("a"), "b": Worker("b")}
+        pool_.configure({**CONFIG, "model": "bigger"})
+        self.assertEqual(updated, [("a", "bigger"), ("b", "bigger")])
+        self.assertIn("new", pool_.workers)
+
+    def test_operations_need_a_connected_device(self):
+        self.assertEqual(self.pool.start(None, ["每日答题"]), "请先连接设备")
+        self.assertEqual(self.pool.stop(None), "任务未开始")
+        self.assertEqual(self.pool.resume("127.0.0.1:5555"), "请先连接设备")
+        self.assertEqual(self.pool.status(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
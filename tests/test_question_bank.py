@@ -0,0 +1,106 @@
+"""本地题库：精确/模糊题干、图片指纹查询与选项重映射，使用内存数据库"""
+
+import threading
+import unittest
+
+from question_bank import (
+    QuestionBank,
+    edit_distance,
+    normalize,
+    similarity,
+    split_tokens,
+)
+
+STEM = normalize("习近平新时代中国特色社会主义思想的核心要义是什么？")
+
+
+def options(*texts: str) -> dict:
+    return {letter: (text, [0, 0, 1, 1]) for letter, text in zip("ABCD", texts)}
+
+
+class HelperTest(unittest.TestCase):
+    def test_normalize_strips_punctuation_and_spaces(self):
+        self.assertEqual(normalize("坚持 人民，至上！(A)"), "坚持人民至上A")
+
+    def test_edit_distance(self):
+        self.assertEqual(edit_distance("", "abc"), 3)
+        self.assertEqual(edit_distance("kitten", "sitting"), 3)
+        self.assertEqual(edit_distance("发展", "发展"), 0)
+        self.assertEqual(similarity("", "发展"), 0.0)
+
+    def test_split_tokens(self):
+        self.assertEqual(split_tokens("词1, 词2，词3,"), ["词1", "词2", "词3"])
+        self.assertEqual(split_tokens(["词1", "", "词2"]), ["词1", "词2"])
+
+
+class QuestionBankTest(unittest.TestCase):
+    def setUp(self):
+        self.bank = QuestionBank(":memory:")
+
+    def tearDown(self):
+        self.bank.close()
+
+    def test_choice_answer_follows_option_text(self):
+        """同题干选项顺序被打乱时按选项文字映射回新的字母"""
+        self.bank.record("单选题", STEM, 0, ["B"], options("甲", "乙", "丙"))
+        _, letters = self.bank.lookup("单选题", STEM, 0, options("丙", "甲", "乙"))
+        self.assertEqual(letters, ["C"])
+
+    def test_choice_miss_when_option_is_gone(self):
+        self.bank.record("单选题", STEM, 0, ["B"], options("甲", "乙", "丙"))
+        self.assertIsNone(self.bank.lookup("单选题", STEM, 0, options("甲", "丁")))
+        self.assertEqual(self.bank.misses, 1)
+
+    def test_fuzzy_stem(self):
+        self.bank.record("填空题", STEM, 0, "八个明确", {})
+        # OCR 错一个字
+        ocr = STEM.replace("核心", "核必")
+        self.assertEqual(self.bank.lookup("填空题", ocr, 0, {})[1], "八个明确")
+
+    def test_fuzzy_requires_same_numbers(self):
+        stem = normalize("党的十八大以来，我国在2012年提出了什么？")
+        self.bank.record("填空题", stem, 0, "甲", {})
+        other = stem.replace("2012", "2013")
+        self.assertIsNone(self.bank.lookup("填空题", other, 0, {}))
+
+    def test_fingerprint_when_ocr_failed(self):
+        self.bank.record("填空题", "", 0xF0F0, "乙", {})
+        self.assertEqual(self.bank.lookup("填空题", "", 0xF0F1, {})[1], "乙")
+        self.assertIsNone(self.bank.lookup("填空题", "", 0x0F0F, {}))
+
+    def test_click_blank_keeps_token_order(self):
+        """点选填空题按词列表保存，字符串与列表答案都不丢失分隔"""
+        self.bank.record("点选填空题", STEM, 0, "丙词，甲词", {})
+        self.assertEqual(
+            self.bank.lookup("点选填空题", STEM, 0, {})[1], ["丙词", "甲词"]
+        )
+        self.bank.record("点选填空题", STEM, 0, ["乙词", "甲词"], {})
+        self.assertEqual(
+            self.bank.lookup("点选填空题", STEM, 0, {})[1], ["乙词", "甲词"]
+        )
+
+    def test_forget(self):
+        self.bank.record("填空题", STEM, 0, "丙", {})
+        qid, _ = self.bank.lookup("填空题", STEM, 0, {})
+        self.bank.forget(qid)
+        self.assertIsNone(self.bank.lookup("填空题", STEM, 0, {}))
+
+    def test_counters_are_thread_safe(self):
+        self.bank.record("填空题", STEM, 0, "丁", {})
+
+        def query():
+            for i in range(200):
+                stem = STEM if i % 2 else f"{STEM}{i}"
+                self.bank.lookup("填空题", stem, 0, {})
+
+        threads = [threading.Thread(target=query) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.bank.hits, 400)
+        self.assertEqual(self.bank.misses, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,229 @@
+"""vision 模块的纯 NumPy 图像处理工具，逐像素与原先的朴素实现比对"""
+
+import unittest
+from collections import deque
+
+import numpy as np
+
+from benchmark.fixtures import load, load_chip_boxes
+from benchmark.morphology import legacy_dilate
+from benchmark.red_text import _legacy_runs, legacy_scan
+from vision import (
+    assign_rows,
+    box_dhash,
+    box_sums,
+    color_mask,
+    dilate,
+    find_runs,
+    find_runs_2d,
+    hamming,
+    integral,
+    label_boxes,
+    pack_crops,
+    red_mask,
+    segment_blocks,
+    whiten_crop,
+)
+
+from .test_worker import make_worker
+
+
+def flood_boxes(mask: np.ndarray) -> list[tuple]:
+    """逐像素 8 邻域洪泛，返回 ([x, y, w, h], 像素数)，按左上角行优先排序"""
+    h, w = mask.shape
+    seen = np.zeros_like(mask)
+    found = []
+    for y, x in zip(*np.nonzero(mask)):
+        if seen[y, x]:
+            continue
+        seen[y, x] = True
+        queue = deque([(y, x)])
+        pixels = []
+        while queue:
+            cy, cx = queue.popleft()
+            pixels.append((cy, cx))
+            for ny in range(max(cy - 1, 0), min(cy + 2, h)):
+                for nx in range(max(cx - 1, 0), min(cx + 2, w)):
+                    if mask[ny, nx] and not seen[ny, nx]:
+                        seen[ny, nx] = True
+                        queue.append((ny, nx))
+        ys, xs = zip(*pixels)
+        x0, y0 = min(xs), min(ys)
+        found.append(([x0, y0, max(xs) + 1 - x0, max(ys) + 1 - y0], len(pixels)))
+    return sorted(found, key=lambda item: (item[0][1], item[0][0]))
+
+
+class DilateTest(unittest.TestCase):
+    def test_matches_legacy_dilate(self):
+        """随机尺寸、密度与核大小(含偶数核、核大于图像)下与原 utils._dilate 逐像素一致"""
+        rng = np.random.default_rng(0)
+        for _ in range(500):
+            h, w = rng.integers(1, 64, 2)
+            mask = rng.random((h, w)) < rng.random() * 0.3
+            kh, kw = rng.integers(1, 90, 2)
+            expected = legacy_dilate(mask, kh, kw)
+            actual = dilate(mask, kh, kw)
+            self.assertEqual(actual.dtype, expected.dtype)
+            self.assertEqual(actual.shape, expected.shape)
+            self.assertTrue(np.array_equal(actual, expected), f"{h}x{w} 核 {kh}x{kw}")
+
+    def test_anchor(self):
+        """偶数核的锚点偏右：窗口为 [i - k//2, i - k//2 + k)"""
+        mask = np.zeros((1, 9), dtype=bool)
+        mask[0, 4] = True
+        np.testing.assert_array_equal(
+            dilate(mask, 1, 4)[0], [0, 0, 0, 1, 1, 1, 1, 0, 0]
+        )
+
+    def test_identity_kernel_returns_copy(self):
+        mask = np.eye(4, dtype=bool)
+        result = dilate(mask, 1, 1)
+        np.testing.assert_array_equal(result, mask)
+        self.assertIsNot(result, mask)
+
+
+class SegmentTest(unittest.TestCase):
+    def test_find_runs_matches_loop(self):
+        rng = np.random.default_rng(1)
+        for _ in range(200):
+            flags = rng.random(rng.integers(0, 80)) < rng.random()
+            min_len = int(rng.integers(0, 6))
+            starts, ends = find_runs(flags, min_len)
+            self.assertEqual(
+                list(zip(starts.tolist(), ends.tolist())),
+                _legacy_runs(flags, min_len),
+            )
+
+    def test_find_runs_2d_is_row_major(self):
+        flags = np.array([[1, 1, 0, 1], [0, 0, 0, 0], [0, 1, 1, 1]], dtype=bool)
+        rows, starts, ends = find_runs_2d(flags)
+        self.assertEqual(rows.tolist(), [0, 0, 2])
+        self.assertEqual(starts.tolist(), [0, 3, 1])
+        self.assertEqual(ends.tolist(), [2, 4, 4])
+
+    def test_segment_blocks_matches_dilate_then_scan(self):
+        """kw 参数只膨胀行内列投影，结果与先膨胀整幅掩码再逐像素扫描相同"""
+        rng = np.random.default_rng(2)
+        for _ in range(200):
+            h, w = rng.integers(1, 120, 2)
+            mask = rng.random((h, w)) < rng.random() * 0.05
+            kw = int(rng.integers(1, 40))
+            self.assertEqual(
+                segment_blocks(mask, 5, 5, kw).tolist(),
+                legacy_scan(legacy_dilate(mask, 1, kw)),
+            )
+
+    def test_segment_blocks_empty(self):
+        self.assertEqual(segment_blocks(np.zeros((10, 10), dtype=bool)).shape, (0, 4))
+
+    def test_red_mask_and_whiten_crop(self):
+        rng = np.random.default_rng(3)
+        img = rng.integers(0, 256, (40, 60, 3), dtype=np.uint8)
+        redness = img[:, :, 2].astype(int) - img[:, :, :2].max(axis=2)
+        mask = red_mask(img, 50)
+        np.testing.assert_array_equal(mask, redness > 50)
+        # 越过右下边界的框按原图截断
+        box = [50, 30, 20, 20]
+        crop = whiten_crop(img, mask, box)
+        region = img[30:, 50:]
+        expected = np.where(mask[30:, 50:, None], region, np.uint8(255))
+        np.testing.assert_array_equal(crop, expected)
+
+
+class LabelTest(unittest.TestCase):
+    def test_label_boxes_matches_flood_fill(self):
+        """随机掩码(含斜对角相连、U 形等需多轮传播的连通域)与逐像素洪泛一致"""
+        rng = np.random.default_rng(4)
+        for _ in range(300):
+            h, w = rng.integers(1, 40, 2)
+            mask = rng.random((h, w)) < rng.random() * 0.6
+            boxes, areas = label_boxes(mask)
+            self.assertEqual(
+                list(zip(boxes.tolist(), areas.tolist())), flood_boxes(mask)
+            )
+
+    def test_label_boxes_empty(self):
+        boxes, areas = label_boxes(np.zeros((5, 5), dtype=bool))
+        self.assertEqual(boxes.shape, (0, 4))
+        self.assertEqual(areas.shape, (0,))
+
+    def test_color_mask(self):
+        rng = np.random.default_rng(5)
+        img = rng.integers(0, 256, (30, 50, 3), dtype=np.uint8)
+        bgr = (120, 10, 250)
+        expected = (np.abs(img.astype(int) - bgr) <= 16).all(axis=2)
+        np.testing.assert_array_equal(color_mask(img, bgr, 16), expected)
+
+
+class PackTest(unittest.TestCase):
+    def test_pack_crops_and_assign_rows(self):
+        rng = np.random.default_rng(6)
+        crops = [
+            rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+            for h, w in [(20, 50), (35, 80), (10, 30)]
+        ]
+        canvas, slots = pack_crops(crops, gap=32, pad=8)
+        self.assertEqual(canvas.shape[1], 80 + 16)
+        for crop, (y0, y1) in zip(crops, slots):
+            self.assertEqual(y1 - y0, crop.shape[0])
+            np.testing.assert_array_equal(canvas[y0:y1, 8 : 8 + crop.shape[1]], crop)
+        # 每块中心的框归属该块；块间空白按中线分给上下两块，画布外的框不属于任何块
+        centers = (slots[:, 0] + slots[:, 1]) // 2
+        boxes = np.array(
+            [[8, y - 2, 10, 4] for y in centers]
+            + [[8, slots[0, 1] + 15 - 2, 10, 4], [8, slots[0, 1] + 16 - 2, 10, 4]]
+            + [[8, canvas.shape[0] + 40, 10, 4]]
+        )
+        self.assertEqual(assign_rows(boxes, slots, 32).tolist(), [0, 1, 2, 0, 1, -1])
+        self.assertEqual(assign_rows(np.empty((0, 4)), slots).shape, (0,))
+
+
+class HashTest(unittest.TestCase):
+    def test_box_sums(self):
+        rng = np.random.default_rng(7)
+        a = rng.integers(0, 256, (25, 40))
+        sat = integral(a, np.int64)
+        for _ in range(100):
+            x0, x1 = sorted(rng.integers(0, 41, 2))
+            y0, y1 = sorted(rng.integers(0, 26, 2))
+            self.assertEqual(box_sums(sat, x0, y0, x1, y1), a[y0:y1, x0:x1].sum())
+
+    def test_box_dhash_matches_per_box_hash(self):
+        """同一内容出现在画面不同位置时指纹相同，内容不同则距离较大"""
+        rng = np.random.default_rng(8)
+        card = rng.integers(0, 256, (48, 90)).astype(np.float64)
+        other = rng.integers(0, 256, (48, 90)).astype(np.float64)
+        gray = np.zeros((200, 300))
+        gray[10:58, 20:110] = card
+        gray[120:168, 150:240] = card
+        gray[60:108, 200:290] = other
+        boxes = np.array([[20, 10, 90, 48], [150, 120, 90, 48], [200, 60, 90, 48]])
+        hashes = box_dhash(integral(gray), boxes)
+        self.assertEqual(hashes.shape, (3, 8))
+        distances = hamming(hashes, hashes)
+        np.testing.assert_array_equal(np.diag(distances), 0)
+        self.assertEqual(distances[0, 1], 0)
+        self.assertGreater(distances[0, 2], 10)
+
+
+class ChipTest(unittest.TestCase):
+    """点选填空题选项框检测(替代原先按 1-4 字分别匹配的模板)"""
+
+    def setUp(self):
+        self.worker = make_worker()
+
+    def tearDown(self):
+        self.worker.question_bank.close()
+
+    def test_finds_chips_in_reading_order(self):
+        """各字数的框都能检出，圆角缺口不影响外接框；同行顶边错位不打乱顺序；
+        实心色块、分隔线与过矮的框不算选项"""
+        boxes = self.worker._find_chips(load("chips"))
+        self.assertEqual(boxes, load_chip_boxes())
+
+    def test_blank_screen(self):
+        self.assertEqual(self.worker._find_chips(load("options")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,273 @@
+"""MaaWorker 中不依赖设备的答题逻辑：点选顺序与题库重放、画面等待与正误检测"""
+
+import unittest
+from concurrent.futures import Future
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+
+import utils
+from hub import Hub
+from question_bank import QuestionBank
+
+STEM = "下列词语按顺序填入横线处正确的是"
+# 屏幕阅读顺序排列的选项框
+CHIPS = {
+    "甲词": [50, 800, 120, 80],
+    "乙词": [200, 800, 120, 80],
+    "丙词": [350, 800, 120, 80],
+}
+
+
+def make_worker(**kwargs) -> utils.MaaWorker:
+    """不等待资源加载、使用内存题库的 worker"""
+    with mock.patch.object(utils, "loader"):
+        return utils.MaaWorker(
+            Hub(),
+            api_key="",
+            model="test",
+            question_bank=QuestionBank(":memory:"),
+            **kwargs,
+        )
+
+
+def screen(value: int, button: int | None = None) -> np.ndarray:
+    """纯色画面，button 给出时按钮区域(BUTTON_ROI)填充另一种颜色"""
+    frame = np.full((1280, 720, 3), value, dtype=np.uint8)
+    if button is not None:
+        x, y, w, h = utils.MaaWorker.BUTTON_ROI
+        frame[y : y + h, x : x + w] = button
+    return frame
+
+
+class ScriptedScreen:
+    """按顺序返回预设画面的截图源，替换 worker.tasker。
+    播放完后重复最后一帧，cycle=True 时从头循环"""
+
+    def __init__(self, frames: list[np.ndarray], cycle: bool = False):
+        self.frames = list(frames)
+        self.cycle = cycle
+        self.captures = 0
+        self.controller = self
+
+    def post_screencap(self):
+        n = len(self.frames)
+        frame = self.frames[
+            self.captures % n if self.cycle else min(self.captures, n - 1)
+        ]
+        self.captures += 1
+        return SimpleNamespace(wait=lambda: SimpleNamespace(get=lambda: frame))
+
+
+class ClickBlankTest(unittest.TestCase):
+    def setUp(self):
+        self.worker = make_worker()
+        self.clicked = []
+        self.worker._scan_click_options = lambda: dict(CHIPS)
+        self.worker._click_chips = self.click
+
+    def tearDown(self):
+        self.worker.question_bank.close()
+
+    def click(self, targets):
+        self.clicked.append([text for text, _ in targets])
+        return []
+
+    def ask(self):
+        self.worker.current_question = {
+            "type": "点选填空题",
+            "stem": STEM,
+            "fingerprint": 0,
+            "options": {},
+            "bank_id": None,
+        }
+
+    def replay(self) -> list[str]:
+        """按题干查询题库并提交命中的答案，返回点击顺序"""
+        self.ask()
+        hit = self.worker.question_bank.lookup("点选填空题", STEM, 0, {})
+        self.assertIsNotNone(hit)
+        self.worker.current_question["bank_id"] = hit[0]
+        self.clicked.clear()
+        self.assertTrue(self.worker._submit_answer("点选填空题", hit[1], "题库"))
+        return self.clicked[0]
+
+    def test_bank_replays_ai_answer_in_order(self):
+        """AI 答案与屏幕顺序不同：入库后重放仍按答案顺序点选"""
+        self.ask()
+        self.worker._submit_answer("点选填空题", "丙词，甲词", "AI")
+        self.assertEqual(self.clicked, [["丙词", "甲词"]])
+        self.worker._learn(True)
+        self.assertEqual(self.replay(), ["丙词", "甲词"])
+
+    def test_fast_answer_clicks_in_red_text_order(self):
+        """极速模式按词在红字中的先后点选，入库的是有序词列表"""
+        self.ask()
+        self.worker._submit_answer("点选填空题", "乙词甲词", "极速模式")
+        self.assertEqual(self.clicked, [["乙词", "甲词"]])
+        self.worker._learn(True)
+        self.assertEqual(self.replay(), ["乙词", "甲词"])
+
+
+class WaitTest(unittest.TestCase):
+    """画面等待：在脚本化的截图序列上检查何时返回、截了几次图、留下哪一帧"""
+
+    def setUp(self):
+        self.worker = make_worker()
+        self.worker.POLL_INTERVAL = 0
+
+    def tearDown(self):
+        self.worker.question_bank.close()
+
+    def play(self, frames: list[np.ndarray], cycle: bool = False) -> ScriptedScreen:
+        self.worker.tasker = ScriptedScreen(frames, cycle)
+        return self.worker.tasker
+
+    def test_stable_after_two_equal_frames(self):
+        source = self.play([screen(0), screen(50), screen(90), screen(90), screen(0)])
+        self.assertTrue(self.worker.wait_until_stable(timeout=1))
+        self.assertEqual(source.captures, 4)
+        np.testing.assert_array_equal(self.worker.frame(), screen(90))
+
+    def test_changed_from_waits_for_the_screen_to_leave(self):
+        """点击尚未生效时画面仍是操作前的静止状态，不能就此返回"""
+        before = screen(30)
+        source = self.play([before, before, before, screen(80), screen(80)])
+        self.assertTrue(self.worker.wait_until_stable(timeout=1, changed_from=before))
+        self.assertEqual(source.captures, 5)
+
+    def test_roi_ignores_changes_elsewhere(self):
+        """roi 外的画面一直在变(如视频播放)，roi 内静止即返回；全屏判断则直到超时"""
+        moving = [screen(0), screen(200)]
+        for frame in moving:
+            frame[:100, :100] = 0
+        source = self.play(moving, cycle=True)
+        self.assertTrue(self.worker.wait_until_stable(roi=(0, 0, 100, 100), timeout=1))
+        self.assertEqual(source.captures, 2)
+        self.play(moving, cycle=True)
+        self.assertFalse(self.worker.wait_until_stable(timeout=0.05))
+
+    def test_stop_flag_ends_waiting(self):
+        self.worker.stop_flag = True
+        source = self.play([screen(0)])
+        self.assertFalse(self.worker.wait_until_stable(timeout=1))
+        self.assertEqual(source.captures, 0)
+
+    def test_changed(self):
+        before = screen(0)
+        self.play([before, before, screen(0, button=100)])
+        self.assertFalse(self.worker.wait_until_changed(before, timeout=0.05))
+        source = self.play([before, before, screen(0, button=100)])
+        rois = (None, utils.MaaWorker.BUTTON_ROI)
+        self.assertTrue(self.worker.wait_until_changed(before, rois, timeout=1))
+        self.assertEqual(source.captures, 3)
+
+
+class CheckAnswerTest(unittest.TestCase):
+    """点击确定后的正误检测：答错时按钮处出现"下一题"，答对时画面跳到下一题"""
+
+    ANSWERED = screen(100, button=30)
+    WRONG = screen(100, button=120)
+    NEXT = screen(160, button=30)
+
+    def setUp(self):
+        self.worker = make_worker()
+        self.worker.POLL_INTERVAL = 0
+        self.worker.recognize = self.recognize
+
+    def tearDown(self):
+        self.worker.question_bank.close()
+
+    def recognize(self, name, fallback=False):
+        self.assertEqual(name, "下一题检测")
+        hit = np.array_equal(self.worker.frame(), self.WRONG)
+        return SimpleNamespace() if hit else None
+
+    def check(self, frames: list[np.ndarray]) -> bool:
+        self.worker.tasker = ScriptedScreen(frames)
+        return self.worker._check_answer(self.ANSWERED)
+
+    def test_wrong_answer_judged_on_first_changed_frame(self):
+        """按钮在全屏缩略图上几乎看不出变化，按钮区域单独比较"""
+        self.assertFalse(self.check([self.ANSWERED, self.WRONG]))
+        self.assertEqual(self.worker.tasker.captures, 2)
+
+    def test_correct_answer_keeps_settled_next_question(self):
+        mid = ((self.ANSWERED.astype(int) + self.NEXT) // 2).astype(np.uint8)
+        self.assertTrue(self.check([self.ANSWERED, mid, self.NEXT, self.NEXT]))
+        np.testing.assert_array_equal(self.worker.frame(), self.NEXT)
+
+
+def choices(*texts: str) -> dict:
+    return {letter: (text, [0, 0, 1, 1]) for letter, text in zip("ABCD", texts)}
+
+
+def done(answer) -> Future:
+    future = Future()
+    future.set_result(answer)
+    return future
+
+
+class RejectReasonTest(unittest.TestCase):
+    """AI 答案校验：不通过即从小模型升级到大模型"""
+
+    OPTIONS = choices("实事求是", "与时俱进", "求真务实")
+    JUDGE = choices("正确", "错误")
+    # 题型, 答案, 选项, 红字, 格子数, 不通过原因中应包含的文字(None 为通过)
+    CASES = (
+        ("单选题", ["A"], OPTIONS, [], 0, None),
+        ("单选题", None, OPTIONS, [], 0, "为空"),
+        ("单选题", ["A", "B"], OPTIONS, [], 0, "不是单个选项"),
+        ("单选题", ["E"], OPTIONS, [], 0, "超出识别到的选项"),
+        ("多选题", ["A", "F"], OPTIONS, [], 0, "超出识别到的选项"),
+        ("多选题", ["A", "C"], OPTIONS, [], 0, None),
+        ("单选题", ["B"], OPTIONS, ["实事求是"], 0, "与提示红字不符"),
+        ("单选题", ["A"], OPTIONS, ["实事", "求是"], 0, None),
+        # 判断题的红字是陈述句，不与 正确/错误 比对
+        ("单选题", ["B"], JUDGE, ["这一说法并不成立"], 0, None),
+        ("填空题", "", {}, [], 4, "为空"),
+        ("填空题", "新发展", {}, [], 4, "与格子数4不符"),
+        ("填空题", "新发展理念", {}, [], 5, None),
+        ("填空题", "高质量的", {}, ["新发展理念"], 4, "与提示红字不符"),
+        ("点选填空题", "甲词,乙词", {}, [], 0, None),
+        ("点选填空题", "甲词，丁词", {}, [], 0, '"丁词"不在选项'),
+    )
+
+    def setUp(self):
+        self.worker = make_worker()
+        self.worker._scan_click_options = lambda: dict(CHIPS)
+
+    def tearDown(self):
+        self.worker.question_bank.close()
+
+    def test_reasons(self):
+        for question_type, answer, options, red, blanks, expected in self.CASES:
+            with self.subTest(question_type=question_type, answer=answer):
+                reason = self.worker._reject_reason(
+                    question_type, answer, options, red, blanks
+                )
+                if expected is None:
+                    self.assertIsNone(reason)
+                else:
+                    self.assertIn(expected, reason)
+
+    def test_escalate_only_rejected_answers(self):
+        self.worker.ai_resolver.fast_model = "small"
+        asked = []
+
+        def start_ai(question_type, img_list, blank_num=0, model=None):
+            asked.append(model)
+            return done(["A"])
+
+        self.worker._start_ai = start_ai
+        escalate = self.worker._escalate
+        self.assertEqual(escalate("单选题", ["C"], [], self.OPTIONS, [], 0), ["C"])
+        self.assertEqual(asked, [])
+        self.assertEqual(escalate("单选题", ["E"], [], self.OPTIONS, [], 0), ["A"])
+        self.assertEqual(asked, ["test"])
+        self.assertEqual(self.worker.ai_resolver.counters["escalations"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,73 +1,316 @@
-import re
-from typing import Optional
+import asyncio
+import json
+import threading
+from typing import ClassVar, Optional
 import os
 import time
 import traceback
 from base64 import b64encode
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Future
+from hashlib import blake2b
+from importlib.util import find_spec
 from io import BytesIO
-from queue import SimpleQueue
-from random import randint
+from random import randint, uniform
 
 import numpy as np
 import plyer
 from PIL import Image, ImageDraw, ImageFont
 from PIL import ImageFilter
-from httpx import Client, Timeout
-from maa.controller import AdbController
+from httpx import AsyncClient, HTTPError, Limits, Timeout
+from maa.controller import AdbController, CustomController
 from maa.custom_recognition import CustomRecognition
-from maa.define import TaskDetail
+from maa.define import RecognitionDetail, TaskDetail
+from maa.pipeline import JCustomRecognition, JOCR, JRecognitionType, JTemplateMatch
 from maa.resource import Resource
 from maa.tasker import Tasker
 from maa.toolkit import Toolkit
 
+from hub import Hub
+from matching import assign, best_option
+from question_bank import QuestionBank, normalize, split_tokens
+from vision import (
+    assign_rows,
+    box_dhash,
+    box_sums,
+    color_mask,
+    dhash,
+    dilate,
+    find_runs,
+    hamming,
+    integral,
+    label_boxes,
+    pack_crops,
+    red_mask,
+    roi_medians,
+    segment_blocks,
+    thumbnail,
+    whiten_crop,
+)
+
 
 class AIResolver:
+    # 图片编码格式 → (data URL 中的 MIME 类型, 额外编码参数)
+    # WebP 默认 method=4 编码很慢，用 method=0 换取速度，体积仍小于同质量 JPEG
+    IMAGE_FORMATS: ClassVar[dict[str, tuple[str, dict]]] = {
+        "JPEG": ("image/jpeg", {}),
+        "WEBP": ("image/webp", {"method": 0}),
+    }
+    DEFAULT_BASE_URL = "https://api.siliconflow.cn/v1"
+
     def __init__(
         self,
         api_key,
         model,
+        base_url: str = DEFAULT_BASE_URL,
+        image_format: str = "JPEG",
+        image_quality: int = 75,
+        max_image_bytes: int | None = None,
+        attempt_timeout: float = 30.0,
+        max_retries: int = 2,
+        hedge_model: str | None = None,
+        hedge_percentile: float = 90.0,
+        hedge_after: float = 8.0,
+        fast_model: str | None = None,
     ):
-        self.session = Client(timeout=Timeout(120.0))
-        self.session.headers = {"Authorization": f"Bearer {api_key}"}
-        self.url = "https://api.siliconflow.cn/v1/chat/completions"
+        # 长期存活的后台事件循环 + 连接池，请求可在答题线程之外提前发起
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(
+            target=self._loop.run_forever, name="AIResolver", daemon=True
+        ).start()
+        self.session = AsyncClient(
+            timeout=Timeout(120.0),
+            http2=find_spec("h2") is not None,
+            limits=Limits(max_connections=8, max_keepalive_connections=4),
+            headers={"Authorization": f"Bearer {api_key}"},
+        )
+        # 任意 OpenAI 兼容服务的 base_url，例如本地模拟服务 http://127.0.0.1:8001/v1
+        self.url = f"{base_url.rstrip('/')}/chat/completions"
         self.model = model
-
-    @staticmethod
-    def image_encode(img: np.ndarray) -> str:
-        buffered = BytesIO()
-        im = Image.fromarray(img)
-        im = im.filter(ImageFilter.SHARPEN)
-        im.save(buffered, format="JPEG")
-        encoded_image = b64encode(buffered.getvalue()).decode()
-        return encoded_image
-
-    @staticmethod
-    def image_combine(imgs: list[np.ndarray], pre_scale: float = 1.0) -> np.ndarray:
-        if pre_scale != 1.0:
-            imgs = [
-                np.array(
-                    Image.fromarray(img).resize(
-                        (
-                            round(img.shape[1] * pre_scale),
-                            round(img.shape[0] * pre_scale),
-                        ),
-                        Image.Resampling.LANCZOS,
-                    )
-                )
-                for img in imgs
-            ]
+        # 分级模型：先用小模型作答，答案未通过校验时再交给 model
+        self.fast_model = fast_model
+        # 单次尝试的截止时间(秒)与失败后的重试次数，重试间隔为带抖动的指数退避
+        self.attempt_timeout = attempt_timeout
+        self.max_retries = max_retries
+        # 对冲请求：首个请求超过近期延迟的 hedge_percentile 分位仍未返回时，
+        # 再向 hedge_model(默认同一模型)发一份相同请求，先得到有效解析结果者胜出；
+        # 样本不足时以 hedge_after 秒为准
+        self.hedge_model = hedge_model
+        self.hedge_percentile = hedge_percentile
+        self.hedge_after = hedge_after
+        self._latencies = deque(maxlen=50)
+        self.counters = Counter()
+        # 调试输出，由所属 MaaWorker 在任务开始时设置
+        self.debug = False
+        self.image_format = image_format.upper()
+        self.image_quality = image_quality
+        # 编码后字节数上限，超出则逐步降低质量重新编码；None 表示不限制
+        self.max_image_bytes = max_image_bytes
+        # 最近一次请求的图片体积与预处理耗时，供日志与调参使用
+        self.last_image_bytes = 0
+        self.last_encode_ms = 0.0
+        # 跨请求复用的拼接画布与编码缓冲区
+        self._canvas = None
+        self._buffer = BytesIO()
+
+    def _combine(self, imgs: list[np.ndarray]) -> np.ndarray:
+        """横向拼接截图到复用画布，保持 MAA 的 BGR 通道顺序"""
         max_h = max(img.shape[0] for img in imgs)
         total_w = sum(img.shape[1] for img in imgs)
-        new_img = np.zeros((max_h, total_w, 3), dtype=np.uint8)
+        if self._canvas is None or self._canvas.shape != (max_h, total_w, 3):
+            self._canvas = np.zeros((max_h, total_w, 3), dtype=np.uint8)
+        canvas = self._canvas
         x_offset = 0
         for img in imgs:
-            new_img[: img.shape[0], x_offset : x_offset + img.shape[1]] = img
-            x_offset += img.shape[1]
-        return new_img
+            h, w = img.shape[:2]
+            canvas[:h, x_offset : x_offset + w] = img[:, :, :3]
+            canvas[h:, x_offset : x_offset + w] = 0
+            x_offset += w
+        return canvas
+
+    def prepare_image(self, imgs: list[np.ndarray], scale: float = 1.0) -> str:
+        """图片预处理流水线：拼接 → 一次缩放 → 锐化 → 编码，返回 data URL。
+        BGR 在载入 PIL 时直接解码为 RGB；缩放倍数为 1/n 时用 n×n 区域平均代替 LANCZOS。
+        超出 max_image_bytes 时每次降低 10 点质量重新编码，最低 30。"""
+        t0 = time.perf_counter()
+        canvas = self._combine(imgs)
+        dims = (canvas.shape[1], canvas.shape[0])
+        im = Image.frombuffer("RGB", dims, canvas, "raw", "BGR", 0, 1)
+        if scale != 1.0:
+            factor = 1 / scale
+            if factor == int(factor):
+                im = im.reduce(int(factor))
+            else:
+                im = im.resize(
+                    (round(im.width * scale), round(im.height * scale)),
+                    Image.Resampling.LANCZOS,
+                )
+        im = im.filter(ImageFilter.SHARPEN)
+        mime, save_options = self.IMAGE_FORMATS[self.image_format]
+        quality = self.image_quality
+        while True:
+            self._buffer.seek(0)
+            self._buffer.truncate()
+            im.save(
+                self._buffer, format=self.image_format, quality=quality, **save_options
+            )
+            size = self._buffer.tell()
+            if (
+                self.max_image_bytes is None
+                or size <= self.max_image_bytes
+                or quality <= 30
+            ):
+                break
+            quality -= 10
+        with self._buffer.getbuffer() as view:
+            encoded = b64encode(view).decode()
+        self.last_image_bytes = size
+        self.last_encode_ms = (time.perf_counter() - t0) * 1000
+        if self.debug:
+            print(
+                f"[AI] 图片 {im.width}x{im.height} {self.image_format} 质量={quality} "
+                f"大小={size / 1024:.1f}KB 预处理耗时={self.last_encode_ms:.1f}ms"
+            )
+        return f"data:{mime};base64,{encoded}"
+
+    def submit(self, coro) -> Future:
+        """把协程提交到后台事件循环，立即返回 Future；调用 cancel() 即可取消进行中的请求"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def tiers(self) -> list[str]:
+        """按从小到大排列的模型列表，未配置小模型时只有 model"""
+        if self.fast_model and self.fast_model != self.model:
+            return [self.fast_model, self.model]
+        return [self.model]
+
+    def resolve_choice(
+        self, imgs: list[np.ndarray], model: str | None = None
+    ) -> list[str] | None:
+        return self.submit(self.aresolve_choice(imgs, model)).result()
+
+    def resolve_blank(
+        self,
+        imgs: list[np.ndarray],
+        answer: bool,
+        blank_num: Optional[int],
+        model: str | None = None,
+    ) -> str | None:
+        return self.submit(self.aresolve_blank(imgs, answer, blank_num, model)).result()
+
+    def resolve_click_blank(
+        self, imgs: list[np.ndarray], model: str | None = None
+    ) -> str | None:
+        return self.submit(self.aresolve_click_blank(imgs, model)).result()
+
+    def stats(self) -> str:
+        c = self.counters
+        return (
+            f"请求={c['requests']}, 尝试={c['attempts']}, 超时={c['timeouts']}, "
+            f"重试={c['retries']}, 对冲发起={c['hedges_fired']}, 对冲胜出={c['hedges_won']}, "
+            f"失败={c['failures']}, 升级={c['escalations']}, "
+            f"对冲阈值={self._hedge_delay():.2f}s"
+        )
+
+    def _hedge_delay(self) -> float:
+        if len(self._latencies) < 10:
+            return self.hedge_after
+        return float(np.percentile(self._latencies, self.hedge_percentile))
+
+    @staticmethod
+    def _parse_choice(raw: str) -> list[str] | None:
+        answer = [c for c in raw.strip() if c in "ABCDEF"]
+        return answer or None
+
+    @staticmethod
+    def _parse_text(raw: str) -> str | None:
+        return raw.strip() or None
 
-    def resolve_choice(self, imgs: list[np.ndarray]) -> list[str] | None:
+    async def _attempt(self, label: str, data: dict, parse, model: str):
+        """单次请求：超过 attempt_timeout 即放弃；非200、返回格式错误或解析失败均返回 None"""
+        self.counters["attempts"] += 1
+        t0 = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(
+                self.session.post(self.url, json={**data, "model": model}),
+                self.attempt_timeout,
+            )
+        except TimeoutError:
+            self.counters["timeouts"] += 1
+            if self.debug:
+                print(f"[AI] {label} 请求超时({self.attempt_timeout}s) model={model}")
+            return None
+        except HTTPError as e:
+            if self.debug:
+                print(f"[AI] {label} 请求异常: {e!r}")
+            return None
+        if self.debug:
+            print(f"[AI] {label} 请求状态={response.status_code} model={model}")
+        if response.status_code != 200:
+            if self.debug:
+                print(f"[AI] {label} 请求失败: {response.text}")
+            return None
+        self._latencies.append(time.perf_counter() - t0)
+        try:
+            raw = response.json()["choices"][0]["message"]["content"]
+            if self.debug:
+                print(f'[AI] {label} 原始返回="{raw}"')
+            answer = parse(raw)
+        except Exception as e:
+            if self.debug:
+                print(f"[AI] {label} 异常: {e}, body={response.text}")
+            return None
+        if self.debug:
+            print(f"[AI] {label} 解析结果={answer}")
+        return answer
+
+    async def _hedged(self, label: str, data: dict, parse):
+        """发起请求，超过对冲阈值未返回则追加一份对冲请求，返回最先得到的有效结果"""
+        tasks = {
+            asyncio.create_task(self._attempt(label, data, parse, data["model"])): False
+        }
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self._hedge_delay())
+            if not done:
+                self.counters["hedges_fired"] += 1
+                model = self.hedge_model or data["model"]
+                if self.debug:
+                    print(f"[AI] {label} 等待超过对冲阈值，追加请求 model={model}")
+                hedge = asyncio.create_task(self._attempt(label, data, parse, model))
+                tasks[hedge] = True
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.result() is not None:
+                        if tasks[task]:
+                            self.counters["hedges_won"] += 1
+                        return task.result()
+            return None
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _complete(self, label: str, data: dict, parse):
+        """带对冲与有限次重试的请求，全部失败返回 None"""
+        self.counters["requests"] += 1
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.counters["retries"] += 1
+                # 全抖动指数退避，避免多台设备同时重试
+                await asyncio.sleep(uniform(0, min(4.0, 0.5 * 2**attempt)))
+            answer = await self._hedged(label, data, parse)
+            if answer is not None:
+                return answer
+        self.counters["failures"] += 1
+        return None
+
+    async def aresolve_choice(
+        self, imgs: list[np.ndarray], model: str | None = None
+    ) -> list[str] | None:
         data = {
-            "model": self.model,
+            "model": model or self.model,
             "messages": [
                 {
                     "role": "system",
@@ -83,10 +326,7 @@ class AIResolver:
                     "content": [
                         {
                             "type": "image_url",
-                            "image_url": {
-                                "url": "data:image/jpg;base64,"
-                                + self.image_encode(self.image_combine(imgs, 0.5))
-                            },
+                            "image_url": {"url": self.prepare_image(imgs, 0.5)},
                         }
                     ],
                 },
@@ -94,38 +334,17 @@ class AIResolver:
             "temperature": 0.2,
             "enable_thinking": False,
         }
-        response = self.session.post(self.url, json=data)
-        if DEBUG_MODE:
-            print(f"[AI] 选择题 请求状态={response.status_code}")
-        try:
-            if response.status_code == 200:
-                result = response.json()
-                raw = result["choices"][0]["message"]["content"]
-                if DEBUG_MODE:
-                    print(f'[AI] 选择题 原始返回="{raw}"')
-                answer = list(raw.strip())
-                for i in answer.copy():
-                    if i not in ["A", "B", "C", "D", "E", "F"]:
-                        answer.remove(i)
-                if len(answer) == 0:
-                    raise ValueError("Invalid answer")
-                if DEBUG_MODE:
-                    print(f"[AI] 选择题 解析结果={answer}")
-            else:
-                if DEBUG_MODE:
-                    print(f"[AI] 选择题 请求失败: {response.text}")
-                answer = None
-        except Exception as e:
-            if DEBUG_MODE:
-                print(f"[AI] 选择题 异常: {e}, body={response.text}")
-            answer = None
-        return answer
+        return await self._complete("选择题", data, self._parse_choice)
 
-    def resolve_blank(
-        self, imgs: list[np.ndarray], answer: bool, blank_num: Optional[int]
+    async def aresolve_blank(
+        self,
+        imgs: list[np.ndarray],
+        answer: bool,
+        blank_num: Optional[int],
+        model: str | None = None,
     ) -> str | None:
         data = {
-            "model": self.model,
+            "model": model or self.model,
             "messages": [
                 {
                     "role": "system",
@@ -141,10 +360,7 @@ class AIResolver:
                     "content": [
                         {
                             "type": "image_url",
-                            "image_url": {
-                                "url": "data:image/jpg;base64,"
-                                + self.image_encode(self.image_combine(imgs, 0.5))
-                            },
+                            "image_url": {"url": self.prepare_image(imgs, 0.5)},
                         }
                     ],
                 },
@@ -156,30 +372,13 @@ class AIResolver:
             data["messages"][0]["content"] = (
                 f"能力与角色:你是一位答题助手\n背景信息:你会得到一张包含填空题的图片\n指令:你需要阅读该图片中的问题，认真理解题目和前后文，其中答案为{blank_num}个字符，思考后作出回答，确保填入答案后的全文逻辑正确，语义正确\n输出风格:你无需给出推理过程，也无需给出任何解释。你只需要回答空缺处应当填的内容，填充字数应当为{blank_num}"
             )
-            data["model"] = self.model
-        response = self.session.post(self.url, json=data)
-        if DEBUG_MODE:
-            print(f"[AI] 填空题 请求状态={response.status_code}")
-        try:
-            if response.status_code == 200:
-                result = response.json()
-                raw = result["choices"][0]["message"]["content"]
-                if DEBUG_MODE:
-                    print(f'[AI] 填空题 原始返回="{raw}"')
-                result = raw.strip()
-            else:
-                if DEBUG_MODE:
-                    print(f"[AI] 填空题 请求失败: {response.text}")
-                result = None
-        except Exception as e:
-            if DEBUG_MODE:
-                print(f"[AI] 填空题 异常: {e}, body={response.text}")
-            result = None
-        return result
+        return await self._complete("填空题", data, self._parse_text)
 
-    def resolve_click_blank(self, imgs: list[np.ndarray]) -> str | None:
+    async def aresolve_click_blank(
+        self, imgs: list[np.ndarray], model: str | None = None
+    ) -> str | None:
         data = {
-            "model": self.model,
+            "model": model or self.model,
             "messages": [
                 {
                     "role": "system",
@@ -195,10 +394,7 @@ class AIResolver:
                     "content": [
                         {
                             "type": "image_url",
-                            "image_url": {
-                                "url": "data:image/jpg;base64,"
-                                + self.image_encode(self.image_combine(imgs, 0.5))
-                            },
+                            "image_url": {"url": self.prepare_image(imgs, 0.5)},
                         }
                     ],
                 },
@@ -206,48 +402,61 @@ class AIResolver:
             "temperature": 0.2,
             "enable_thinking": False,
         }
-        response = self.session.post(self.url, json=data)
-        if DEBUG_MODE:
-            print(f"[AI] 点选填空题 请求状态={response.status_code}")
-        try:
-            if response.status_code == 200:
-                result = response.json()
-                raw = result["choices"][0]["message"]["content"]
-                if DEBUG_MODE:
-                    print(f'[AI] 点选填空题 原始返回="{raw}"')
-                result = raw.strip()
-            else:
-                if DEBUG_MODE:
-                    print(f"[AI] 点选填空题 请求失败: {response.text}")
-                result = None
-        except Exception as e:
-            if DEBUG_MODE:
-                print(f"[AI] 点选填空题 异常: {e}, body={response.text}")
-            result = None
-        return result
+        return await self._complete("点选填空题", data, self._parse_text)
 
 
+# 模板与 OCR/YOLO 模型由 loader 在后台加载，见 ResourceLoader
 resource = Resource()
 resource.set_cpu()
-resource.post_bundle("./resource").wait()
 
-DEBUG_MODE = False
+
+# 选项字母模板：一次模板匹配同时查找 A-F，匹配框尺寸即模板尺寸，据此区分字母(各模板尺寸互不相同)
+OPTION_LETTERS = {
+    Image.open(f"./resource/image/{letter}.png").size: letter for letter in "ABCDEF"
+}
+
+
+# 判断题的选项文字
+JUDGE_WORDS = frozenset({"正确", "错误", "对", "错", "√", "×"})
 
 
-def _dilate(mask: np.ndarray, kh: int, kw: int) -> np.ndarray:
-    """形态学膨胀：用 kh×kw 矩形核连接相邻像素"""
-    ph, pw = kh // 2, kw // 2
-    padded = np.pad(mask, ((ph, ph), (pw, pw)), mode="constant", constant_values=False)
-    h, w = mask.shape
-    result = np.zeros_like(mask)
-    for di in range(kh):
-        for dj in range(kw):
-            result |= padded[di : di + h, dj : dj + w]
-    return result
+def is_judge(texts) -> bool:
+    """选项文字全部是 正确/错误 一类时为判断题"""
+    return all(t in JUDGE_WORDS for t in texts)
 
 
-def strip_punct(s):
-    return re.sub(r"\W", "", s)
+def char_overlap(text: str, evidence: str) -> float:
+    """text 去标点后的字符中出现在 evidence 里的比例，用于判断答案与红字是否相符"""
+    chars = normalize(text)
+    if not chars:
+        return 0.0
+    return sum(c in evidence for c in chars) / len(chars)
+
+
+def batch_ocr(crops: list[np.ndarray], run) -> list[str]:
+    """批量OCR：把所有裁剪图纵向拼到一张白底画布上，一次 检测+识别 得到全部文字，
+    再按文字框的纵向位置分回各块(块内按行、行内按列拼接)。
+    某块未检出文字时单独对其做一次仅识别OCR兜底，结果不差于逐块识别。
+    run(param, image) 执行一次OCR并返回 RecognitionDetail 或 None。返回与 crops 同序的文字列表。"""
+    if not crops:
+        return []
+    canvas, slots = pack_crops(crops)
+    reco = run(JOCR(), canvas)
+    items = reco.filtered_results if reco else []
+    owner = assign_rows(np.array([r.box for r in items]).reshape(-1, 4), slots)
+    texts = []
+    for i, crop in enumerate(crops):
+        mine = sorted(
+            (items[k] for k in np.flatnonzero(owner == i)),
+            key=lambda r: (r.box[1] // 16, r.box[0]),
+        )
+        if mine:
+            texts.append("".join(r.text for r in mine).strip())
+            continue
+        # 参数与 pipeline 中的 扫描选项 节点保持一致
+        reco = run(JOCR(only_rec=True), crop)
+        texts.append(reco.best_result.text.strip() if reco and reco.best_result else "")
+    return texts
 
 
 class RedTextOCR(CustomRecognition):
@@ -256,8 +465,8 @@ class RedTextOCR(CustomRecognition):
     1. 裁剪提示区域(0,483,720,517)
     2. 红色度过滤：R - max(B,G) > 50，非红色像素置白，只保留红色文字
     3. 估算文字行高，确定形态学膨胀核大小（水平方向膨胀连接同行字符）
-    4. 形态学膨胀 → 行列扫描分块：将相连的红色像素聚合成文本块
-    5. 逐块裁剪处理后图片，调用MAA内置OCR(扫描选项)识别文字
+    4. 行列扫描分块：将水平膨胀后相连的红色像素聚合成文本块(只膨胀每行的列投影)
+    5. 逐块裁剪处理后图片，批量OCR一次识别所有块 (batch_ocr)
     6. 出血线合并：处理跨行文本（提示区域左右边缘的文本块合并为同一行）
     """
 
@@ -267,102 +476,49 @@ class RedTextOCR(CustomRecognition):
     LEFT_BLEED, RIGHT_BLEED, BLEED_TH = 37, 682, 5
 
     def analyze(self, context, argv: CustomRecognition.AnalyzeArg):
+        # 识别器由所有设备共用，调试开关随每次调用的参数传入
+        debug = bool(json.loads(argv.custom_recognition_param or "{}").get("debug"))
         img = argv.image
         rx, ry, rw, rh = self.ROI_X, self.ROI_Y, self.ROI_W, self.ROI_H
         hint_img = img[ry : ry + rh, rx : rx + rw]
 
         # 1. 红色度过滤：R - max(B, G) > 50，非红色像素置白
-        redness = hint_img[:, :, 2].astype(np.int16) - np.maximum(
-            hint_img[:, :, 0], hint_img[:, :, 1]
-        ).astype(np.int16)
-        red_mask = redness > 50
-        processed = np.full_like(hint_img, 255)
-        processed[red_mask] = hint_img[red_mask]
+        mask = red_mask(hint_img, 50)
 
         # 2. 估算文字行高，确定膨胀核大小
-        rows_with_red = np.any(red_mask, axis=1)
-        line_heights = []
-        lh_start = None
-        for i, has in enumerate(rows_with_red):
-            if has and lh_start is None:
-                lh_start = i
-            elif not has and lh_start is not None:
-                line_heights.append(i - lh_start)
-                lh_start = None
-        if lh_start is not None:
-            line_heights.append(len(rows_with_red) - lh_start)
-        if not line_heights:
-            if DEBUG_MODE:
+        lh_starts, lh_ends = find_runs(np.any(mask, axis=1))
+        if lh_starts.size == 0:
+            if debug:
                 print("[RedTextOCR] 无红色像素")
             return CustomRecognition.AnalyzeResult(
                 box=[0, 0, 1, 1], detail={"texts": []}
             )
-        text_h = int(np.median(line_heights))
-        kh, kw = 1, max(5, text_h)  # 垂直不膨胀，水平按行高膨胀连接同行文字
-
-        # 3. 形态学膨胀 + 行列扫描分块
-        dilated = _dilate(red_mask, kh, kw)
-        rows_with_text = np.any(dilated, axis=1)
-        line_ranges = []
-        start = None
-        for i, has_text in enumerate(rows_with_text):
-            if has_text and start is None:
-                start = i
-            elif not has_text and start is not None:
-                if i - start > 5:
-                    line_ranges.append((start, i))
-                start = None
-        if start is not None and len(rows_with_text) - start > 5:
-            line_ranges.append((start, len(rows_with_text)))
-        blocks = []
-        for r_start, r_end in line_ranges:
-            cols_with_text = np.any(dilated[r_start:r_end], axis=0)
-            col_start = None
-            for j, has_text in enumerate(cols_with_text):
-                if has_text and col_start is None:
-                    col_start = j
-                elif not has_text and col_start is not None:
-                    if j - col_start > 5:
-                        blocks.append(
-                            [
-                                max(0, col_start - 5),
-                                max(0, r_start - 5),
-                                j - col_start + 10,
-                                r_end - r_start + 10,
-                            ]
-                        )
-                    col_start = None
-            if col_start is not None and len(cols_with_text) - col_start > 5:
-                blocks.append(
-                    [
-                        max(0, col_start - 5),
-                        max(0, r_start - 5),
-                        len(cols_with_text) - col_start + 10,
-                        r_end - r_start + 10,
-                    ]
-                )
+        text_h = int(np.median(lh_ends - lh_starts))
+        kw = max(5, text_h)  # 垂直不膨胀，水平按行高膨胀连接同行文字
+
+        # 3. 水平膨胀 + 行列扫描分块，垂直不膨胀时只需膨胀每行的列投影
+        blocks = segment_blocks(mask, 5, 5, kw).tolist()
         if not blocks:
-            if DEBUG_MODE:
+            if debug:
                 print("[RedTextOCR] 无文本块")
             return CustomRecognition.AnalyzeResult(
                 box=[0, 0, 1, 1], detail={"texts": []}
             )
 
-        # 4. 逐块裁剪处理后图片，调用OCR识别
-        texts = []
-        for idx, block in enumerate(blocks):
-            bx, by, bw, bh = block
-            crop = processed[max(0, by) : by + bh, max(0, bx) : bx + bw].copy()
-            reco = context.run_recognition("扫描选项", crop)
-            text = ""
-            if reco and reco.best_result:
-                text = reco.best_result.text.strip()
-            if DEBUG_MODE:
+        # 4. 逐块裁剪(仅在块内置白非红色像素)，所有块一次批量OCR
+        texts = batch_ocr(
+            [whiten_crop(hint_img, mask, block) for block in blocks],
+            lambda param, image: context.run_recognition_direct(
+                JRecognitionType.OCR, param, image
+            ),
+        )
+        if debug:
+            for idx, (block, text) in enumerate(zip(blocks, texts)):
                 print(f'[RedTextOCR] block[{idx}] roi={block} => "{text}"')
-            texts.append(text)
 
         # 5. 保存调试图片（处理后图片 + 绿框标注）
-        if DEBUG_MODE:
+        if debug:
+            processed = np.where(mask[:, :, np.newaxis], hint_img, np.uint8(255))
             vis = Image.fromarray(processed[:, :, ::-1]).convert("RGB")
             draw = ImageDraw.Draw(vis)
             try:
@@ -387,8 +543,7 @@ class RedTextOCR(CustomRecognition):
                 draw.text((bx, by - 16), label, fill=color, font=font)
             os.makedirs("debug", exist_ok=True)
             vis.save("debug/hint_processed.png")
-            if DEBUG_MODE:
-                print("[RedTextOCR] 已保存 debug/hint_processed.png")
+            print("[RedTextOCR] 已保存 debug/hint_processed.png")
 
         # 6. 出血线合并：当前块右边缘靠右出血线 且 下一块左边缘靠左出血线，则合并
         i = 0
@@ -414,7 +569,7 @@ class RedTextOCR(CustomRecognition):
             else:
                 i += 1
         result = [t for t in texts if t]
-        if DEBUG_MODE:
+        if debug:
             print(f"[RedTextOCR] 最终结果: {result}")
         return CustomRecognition.AnalyzeResult(
             box=[0, 0, 1, 1], detail={"texts": result}
@@ -424,42 +579,346 @@ class RedTextOCR(CustomRecognition):
 resource.register_custom_recognition("RedTextOCR", RedTextOCR())
 
 
+def log_event(
+    message: str,
+    level: str = "info",
+    kind: str | None = None,
+    stage: str | None = None,
+    device: str | None = None,
+    question: int | None = None,
+    **payload,
+) -> dict:
+    """构造一条日志事件，字段含义见 MaaWorker.send_log"""
+    event = {
+        "time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
+        "level": level,
+        "stage": stage,
+        "device": device,
+        "question": question,
+        "message": message,
+    }
+    if kind:
+        event["kind"] = kind
+    if payload:
+        event["payload"] = payload
+    return event
+
+
+class BlankController(CustomController):
+    """只返回固定画面的控制器，用于在没有设备时运行识别(模型预热)"""
+
+    def __init__(self, frame: np.ndarray):
+        super().__init__()
+        self.frame = frame
+
+    def connect(self) -> bool:
+        return True
+
+    def request_uuid(self) -> str:
+        return "blank"
+
+    def screencap(self) -> np.ndarray:
+        return self.frame
+
+
+class ResourceLoader:
+    """在后台线程加载 resource(模板、OCR 与 YOLO 模型)，加载后在空白画面上把每个模型各运行一次，
+    使第一次真实识别不再承担推理初始化的开销。
+    start 可重复调用，只加载一次；wait 等待加载与预热完成。状态依次为 idle/loading/warming/ready，失败为 failed。"""
+
+    # 预热画面尺寸(高, 宽)，与设备截图一致
+    WARMUP_SHAPE = (1280, 720)
+
+    def __init__(self, resource: Resource, path: str):
+        self.resource = resource
+        self.path = path
+        self.state = "idle"
+        self.error: str | None = None
+        # 各阶段耗时(毫秒)
+        self.timings: dict[str, float] = {}
+        self.done = threading.Event()
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def start(self, on_done=None):
+        """开始后台加载；on_done(status) 在加载与预热结束后于加载线程中调用，已结束则立即调用"""
+        with self._lock:
+            finished = self.done.is_set()
+            if on_done and not finished:
+                self._listeners.append(on_done)
+            idle = self.state == "idle"
+            if idle:
+                self.state = "loading"
+        if on_done and finished:
+            on_done(self.status())
+        if idle:
+            threading.Thread(
+                target=self._load, name="resource_loader", daemon=True
+            ).start()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """确保已开始加载并等待完成，成功加载返回 True"""
+        self.start()
+        self.done.wait(timeout)
+        return self.state == "ready"
+
+    def _load(self):
+        try:
+            t0 = time.perf_counter()
+            job = self.resource.post_bundle(self.path).wait()
+            self.timings["加载"] = (time.perf_counter() - t0) * 1000
+            if not job.succeeded:
+                raise RuntimeError(f"资源加载失败: {self.path}")
+            self.state = "warming"
+            self._warmup()
+            self.state = "ready"
+        except RuntimeError as e:
+            self.state = "failed"
+            self.error = str(e)
+        except Exception as e:
+            traceback.print_exc()
+            self.state = "failed"
+            self.error = f"资源加载失败: {e!r}"
+        finally:
+            # 无论成败都要唤醒 wait()，否则等待资源的 MaaWorker 会永远阻塞
+            with self._lock:
+                self.done.set()
+                listeners, self._listeners = self._listeners, []
+            for listener in listeners:
+                listener(self.status())
+
+    def _warmup(self):
+        yolo = self.resource.get_node_object("yolo_detect").recognition
+        # 缺少模型文件时 MAA 只在日志中报错，识别照常"成功"返回空结果，须事先检查
+        models = [
+            "model/ocr/det.onnx",
+            "model/ocr/rec.onnx",
+            "model/ocr/keys.txt",
+            f"model/detect/{yolo.param.model}",
+        ]
+        missing = [m for m in models if not os.path.exists(f"{self.path}/{m}")]
+        if missing:
+            raise RuntimeError(f"缺少模型文件: {', '.join(missing)}")
+        frame = np.zeros((*self.WARMUP_SHAPE, 3), dtype=np.uint8)
+        controller = BlankController(frame)
+        controller.post_connection().wait()
+        tasker = Tasker()
+        tasker.bind(self.resource, controller)
+        steps = {
+            "OCR检测": (JRecognitionType.OCR, JOCR(), frame),
+            # 空白画面检测不到文字，识别模型需单独运行一次
+            "OCR识别": (JRecognitionType.OCR, JOCR(only_rec=True), frame[:48, :320]),
+            "YOLO": (yolo.type, yolo.param, frame),
+        }
+        for name, (reco_type, param, image) in steps.items():
+            t0 = time.perf_counter()
+            job = tasker.post_recognition(reco_type, param, image).wait()
+            self.timings[name] = (time.perf_counter() - t0) * 1000
+            # 空白画面上不会命中，只要求识别确实执行并返回了结果
+            detail = job.get() if job.succeeded else None
+            if not detail or not detail.nodes or detail.nodes[0].recognition is None:
+                raise RuntimeError(f"{name}模型预热失败")
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "ready": self.state == "ready",
+            "timings": {name: round(ms, 1) for name, ms in self.timings.items()},
+            "error": self.error,
+        }
+
+
+loader = ResourceLoader(resource, "./resource")
+
+
+class OCRCache:
+    """OCR结果缓存：以 (识别名, ROI, ROI内像素哈希) 为键的定长LRU。
+    同一区域像素未变化时直接返回上次结果，不再执行OCR。"""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    @staticmethod
+    def key(name: str, image: np.ndarray, roi) -> tuple:
+        x, y, w, h = roi
+        crop = np.ascontiguousarray(image[y : y + h, x : x + w])
+        return name, tuple(roi), blake2b(crop, digest_size=16).digest()
+
+    def get(self, key: tuple):
+        """命中返回缓存值并计入命中次数，未命中返回 None"""
+        if key in self._data:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+        self.misses += 1
+        return None
+
+    def put(self, key: tuple, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return f"命中={self.hits}, 未命中={self.misses}, 命中率={rate:.1f}%, 条目={len(self._data)}"
+
+
+class CardMemo:
+    """信息流卡片记忆：记录本次任务中已判定或已打开的卡片的差值哈希与未读状态。
+    滑动后仍在屏幕上的卡片、返回列表后再次出现的卡片直接沿用记录，不再计数像素。
+    哈希为 16×16 位，汉明距离不超过 MAX_HAMMING 视为同一张卡片。"""
+
+    MAX_HAMMING = 12
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._hashes = np.empty((0, 32), dtype=np.uint8)
+        self._unread = np.empty(0, dtype=bool)
+
+    def clear(self):
+        """任务开始时清空记录与计数"""
+        self.hits = self.misses = 0
+        self._hashes = self._hashes[:0]
+        self._unread = self._unread[:0]
+
+    def _nearest(self, hashes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """各哈希在记录中最近的条目下标，以及是否在阈值内"""
+        if not len(self._hashes) or not len(hashes):
+            return np.zeros(len(hashes), dtype=np.intp), np.zeros(len(hashes), bool)
+        dist = hamming(hashes, self._hashes)
+        nearest = dist.argmin(axis=1)
+        return nearest, dist[np.arange(len(hashes)), nearest] <= self.MAX_HAMMING
+
+    def lookup(self, hashes: np.ndarray) -> np.ndarray:
+        """返回各卡片的记录状态：1 未读，0 已读，-1 未见过"""
+        nearest, found = self._nearest(hashes)
+        self.hits += int(found.sum())
+        self.misses += int((~found).sum())
+        state = np.full(len(hashes), -1, dtype=np.int8)
+        state[found] = self._unread[nearest[found]]
+        return state
+
+    def remember(self, hashes: np.ndarray, unread: np.ndarray):
+        self._hashes = np.concatenate((self._hashes, hashes))
+        self._unread = np.concatenate((self._unread, unread))
+
+    def mark_read(self, card_hash: np.ndarray):
+        """已打开的卡片记为已读"""
+        nearest, found = self._nearest(card_hash[None])
+        if found[0]:
+            self._unread[nearest[0]] = False
+        else:
+            self.remember(card_hash[None], np.zeros(1, dtype=bool))
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return f"命中={self.hits}, 未命中={self.misses}, 命中率={rate:.1f}%, 条目={len(self._hashes)}"
+
+
 class MaaWorker:
+    # 题干区域：题型标签下方到选项/填空区域上方，用于题库查询
+    STEM_ROI = (0, 257, 720, 443)
+    # 选项字母所在的左侧窄条，只在此区域做模板匹配，比全屏快约6倍
+    OPTION_LETTER_ROI = (0, 250, 240, 1030)
+    # 点选填空题选项框：白底圆角框，灰色描边(底边为6px阴影)，BGR
+    CHIP_BORDER = (212, 208, 204)
+    CHIP_HEIGHT = (60, 110)
+    CHIP_MIN_WIDTH = 50
+    # 选项框选中判定：框内底色(中位色)相对点击前的各通道绝对差之和超过该值
+    CHIP_SELECTED_DIFF = 50
+    # 未读卡片：左上 1/4 区域内未读标题黑字 rgb(45, 51, 56) ±15 的像素数超过阈值，BGR
+    UNREAD_TITLE = (56, 51, 45)
+    UNREAD_MIN_PIXELS = 80
+    # 画面稳定判定：相邻两次截图的灰度缩略图平均差值不超过该值视为静止；轮询最小间隔(秒)
+    STABLE_DIFF = 1.0
+    POLL_INTERVAL = 0.1
+    # 确定/下一题按钮区域，与 pipeline 中 确定、下一题检测 节点的 roi 一致
+    BUTTON_ROI = (552, 44, 131, 61)
+
     def __init__(
         self,
-        queue: SimpleQueue,
+        hub: Hub,
         api_key,
         model: str,
+        base_url: str = AIResolver.DEFAULT_BASE_URL,
+        hedge_model: str | None = None,
+        fast_model: str | None = None,
+        question_bank: QuestionBank | None = None,
     ):
         user_path = "./"
         Toolkit.init_option(user_path)
+        # 资源尚未加载完成时在此等待(通常已由 WebUI 启动时在后台开始加载)
+        loader.wait()
 
-        self.queue = queue
+        self.hub = hub
         self.tasker = Tasker()
         self.connected = False
         self.api_key = api_key
         self.ai_resolver = AIResolver(
             api_key=api_key,
             model=model,
+            base_url=base_url,
+            hedge_model=hedge_model,
+            fast_model=fast_model,
         )
         self.stop_flag = False
         self.pause_flag = False
         self.fast_answer = False
+        self.debug = False
+        # 日志事件的上下文：已连接设备的地址、当前任务、当前题号
+        self.device = None
+        self.stage = None
+        self.question = None
+        self.ocr_cache = OCRCache()
+        self.card_memo = CardMemo()
+        # 多台设备可共用同一题库，一台设备答对的题其余设备直接复用
+        self.question_bank = question_bank or QuestionBank("./config/question_bank.db")
+        # 当前题目的题库信息，正误检测后据此保存或删除题库条目
+        self.current_question = None
+        # 当前持有的截图：同一画面上的识别共用一帧，点击/滑动后作废
+        self._frame = None
+        self.screencap_count = 0
         self.send_log("MAA初始化成功")
 
     def update_ai_models(
         self,
         model: str | None = None,
+        base_url: str | None = None,
+        hedge_model: str | None = None,
+        fast_model: str | None = None,
     ):
-        self.ai_resolver = AIResolver(
-            api_key=self.api_key,
-            model=model or self.ai_resolver.model,
+        # 只切换模型与地址，保留已建立的连接池
+        if model:
+            self.ai_resolver.model = model
+        self.ai_resolver.hedge_model = hedge_model or None
+        self.ai_resolver.fast_model = fast_model or None
+        if base_url:
+            self.ai_resolver.url = f"{base_url.rstrip('/')}/chat/completions"
+
+    def send_log(self, msg, level: str = "info", kind: str | None = None, **payload):
+        """发布一个日志事件，立即返回。level 为 info/warning/error；
+        kind 标记界面需要响应的状态变化：start 任务开始、takeover 请求接管、stopped 已终止、done 全部完成、
+        ready 资源加载完成(由 WebUI 发布)；
+        其余关键字参数作为 payload 附带的结构化数据。"""
+        self.hub.publish(
+            log_event(
+                msg,
+                level,
+                kind,
+                stage=self.stage,
+                device=self.device,
+                question=self.question,
+                **payload,
+            )
         )
 
-    def send_log(self, msg):
-        self.queue.put(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())} {msg}")
-        time.sleep(0.05)
-
     def pause(self):
         plyer.notification.notify(
             title="MaaXuexi",
@@ -499,10 +958,12 @@ class MaaWorker:
                 app_name="MaaXuexi",
                 timeout=30,
             )
-            self.send_log("设备连接失败，请检查终端日志")
+            self.send_log("设备连接失败，请检查终端日志", level="error")
             return self.connected
         if self.tasker.bind(resource, controller):
             self.connected = True
+            # 以地址区分设备，同型号的多个模拟器名称相同
+            self.device = device.address
             # size = subprocess.run([device.adb_path, "shell", "wm", "size"], text=True, capture_output=True).stdout
             # size = size.strip().split(": ")[1]
             # dpi = subprocess.run([device.adb_path, "shell", "wm", "density"], text=True, capture_output=True).stdout
@@ -518,31 +979,152 @@ class MaaWorker:
                 app_name="MaaXuexi",
                 timeout=30,
             )
-            self.send_log("设备连接失败，请检查终端日志")
+            self.send_log("设备连接失败，请检查终端日志", level="error")
         return self.connected
 
-    def detect(self):
-        result: TaskDetail = self.tasker.post_task("yolo_detect").wait().get()
-        if result.status.failed:
-            return [], []
-        details = result.nodes[0].recognition.raw_detail["all"]
-        boxes, labels = [], []
-        for detail in details:
-            boxes.append(detail["box"])
-            labels.append(detail["label"])
-        return list(boxes), list(labels)
+    def frame(self) -> np.ndarray:
+        """当前画面的截图：没有持有截图时截一次图，之后的识别都复用这一帧"""
+        if self._frame is None:
+            self._frame = self.tasker.controller.post_screencap().wait().get()
+            self.screencap_count += 1
+        return self._frame
+
+    def invalidate_frame(self):
+        """画面已变化(点击、滑动、输入之后)，下次 frame() 重新截图"""
+        self._frame = None
+
+    def _thumb(self, image: np.ndarray, roi=None) -> np.ndarray:
+        if roi is not None:
+            x, y, w, h = roi
+            image = image[y : y + h, x : x + w]
+        # 全屏约 8 像素一块，小区域逐像素比较
+        return thumbnail(image, max(1, min(image.shape[:2]) // 90))
+
+    def _poll(self, done, roi, timeout: float, min_delay) -> bool:
+        """轮询截图直到 done(上一帧缩略图, 当前缩略图) 为真或超时，截图同时作为新的持有帧。
+        min_delay 为最短等待时间(秒)，可为 (下限, 上限) 随机取值以模拟人的操作间隔，
+        画面提前满足条件时补足剩余时间。"""
+        start = time.monotonic()
+        floor = uniform(*min_delay) if isinstance(min_delay, tuple) else min_delay
+        prev = None
+        hit = False
+        while not self.stop_flag:
+            t0 = time.monotonic()
+            self._frame = self.tasker.controller.post_screencap().wait().get()
+            self.screencap_count += 1
+            cur = self._thumb(self._frame, roi)
+            if done(prev, cur):
+                hit = True
+                break
+            prev = cur
+            if time.monotonic() - start >= timeout:
+                break
+            time.sleep(max(0.0, self.POLL_INTERVAL - (time.monotonic() - t0)))
+        rest = floor - (time.monotonic() - start)
+        if rest > 0:
+            time.sleep(rest)
+        return hit
+
+    def _differs(self, a: np.ndarray, b: np.ndarray) -> bool:
+        return float(np.abs(a - b).mean()) > self.STABLE_DIFF
+
+    def wait_until_changed(
+        self, reference: np.ndarray, rois=(None,), timeout: float = 3.0, min_delay=0.0
+    ) -> bool:
+        """等待 rois 中任一区域(None 为全屏)与操作前的截图 reference 不同。变化返回 True，超时返回 False。
+        按钮等小区域的变化在全屏缩略图上会被平均掉，需单独列出。"""
+        refs = [(roi, self._thumb(reference, roi)) for roi in rois]
+
+        def done(prev, cur):
+            return any(
+                self._differs(
+                    ref, cur if roi is None else self._thumb(self._frame, roi)
+                )
+                for roi, ref in refs
+            )
+
+        return self._poll(done, None, timeout, min_delay)
+
+    def wait_until_stable(
+        self, roi=None, timeout: float = 3.0, min_delay=0.0, changed_from=None
+    ) -> bool:
+        """等待画面(或 roi 区域)静止：相邻两次截图没有变化即返回 True，超时返回 False。
+        指定 changed_from(操作前的截图)时先等画面离开该状态再判断静止，
+        避免在点击尚未生效、画面还没开始过渡时就提前返回。"""
+        ref = None if changed_from is None else self._thumb(changed_from, roi)
+
+        def done(prev, cur):
+            nonlocal ref
+            if ref is not None:
+                if self._differs(ref, cur):
+                    ref = None
+                return False
+            return prev is not None and not self._differs(prev, cur)
+
+        return self._poll(done, roi, timeout, min_delay)
+
+    def recognize(self, name: str, fallback: bool = False) -> RecognitionDetail | None:
+        """在持有的截图上执行 pipeline 节点 name 的识别(不截图、不等待超时)。
+        命中返回识别详情，未命中返回 None；节点的 inverse 不生效，由调用方自行取反。
+        fallback=True 时未命中改用 post_task 按节点 timeout 重新截图等待，适合画面可能仍在过渡的场合，
+        并把其最后一次截图作为新的持有帧。"""
+        node = resource.get_node_object(name).recognition
+        result: TaskDetail = (
+            self.tasker.post_recognition(node.type, node.param, self.frame())
+            .wait()
+            .get()
+        )
+        if result and result.status.succeeded and result.nodes[0].recognition.hit:
+            return result.nodes[0].recognition
+        if not fallback:
+            return None
+        result = self.tasker.post_task(name).wait().get()
+        self._frame = self.tasker.controller.cached_image
+        self.screencap_count += 1
+        if result.status.succeeded:
+            return result.nodes[0].recognition
+        return None
+
+    def detect(
+        self, image: np.ndarray, labels: tuple[str, ...] | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """在给定截图上执行 yolo_detect 节点的 NeuralNetworkDetect 识别(不另行截图)，
+        使检测框与调用方用于判定的像素来自同一帧。
+        返回 (N×4 int32 的 [x, y, w, h] 检测框, 长度 N 的 int8 类别编号)，编号为类别在 labels 中的下标；
+        labels 为空时使用节点的全部类别，其余类别的检测结果被丢弃。未识别到时返回两个空数组。"""
+        node = resource.get_node_object("yolo_detect").recognition
+        labels = labels or tuple(node.param.labels)
+        boxes = np.empty((0, 4), dtype=np.int32)
+        classes = np.empty(0, dtype=np.int8)
+        result: TaskDetail = (
+            self.tasker.post_recognition(node.type, node.param, image).wait().get()
+        )
+        if not (result and result.status.succeeded):
+            return boxes, classes
+        detail = result.nodes[0].recognition
+        if not detail.hit:
+            return boxes, classes
+        found = [
+            (r.box, labels.index(r.label))
+            for r in detail.all_results
+            if r.label in labels
+        ]
+        if found:
+            boxes = np.array([list(box) for box, _ in found], dtype=np.int32)
+            classes = np.array([cls for _, cls in found], dtype=np.int8)
+        return boxes, classes
 
     def task(self, tasks, fast_answer=False, debug=False):
-        global DEBUG_MODE
-        DEBUG_MODE = debug
+        self.debug = self.ai_resolver.debug = debug
         self.stop_flag = False
         self.fast_answer = fast_answer
-        self.send_log("任务开始")
+        self.send_log("任务开始", kind="start", tasks=list(tasks))
         try:
             for task in tasks:
                 if self.stop_flag:
-                    self.send_log("任务已终止")
+                    self.send_log("任务已终止", kind="stopped")
                     return
+                self.stage = task
                 if task == "选读文章":
                     self.read_article()
                 elif task == "视听学习":
@@ -551,10 +1133,11 @@ class MaaWorker:
                     self.daily_answer()
                 elif task == "趣味答题":
                     self.funny_answer()
+                self.stage = self.question = None
             if self.stop_flag:
-                self.send_log("任务已终止")
+                self.send_log("任务已终止", kind="stopped")
                 return
-        except Exception:
+        except Exception as e:
             traceback.print_exc()
             plyer.notification.notify(
                 title="MaaXuexi",
@@ -562,10 +1145,11 @@ class MaaWorker:
                 app_name="MaaXuexi",
                 timeout=30,
             )
-            self.send_log("任务出现异常，请检查终端日志")
+            self.send_log("任务出现异常，请检查终端日志", level="error", error=repr(e))
             self.send_log("请将日志反馈至 https://github.com/ravizhan/MaaXuexi/issues")
-        self.send_log("所有任务完成")
-        time.sleep(0.5)
+        finally:
+            self.stage = self.question = None
+        self.send_log("所有任务完成", kind="done")
 
     def read_article(self):
         self.send_log("开始任务：选读文章")
@@ -573,17 +1157,18 @@ class MaaWorker:
         reading_time = 0
         self.send_log("进入板块 综合")
         self.tasker.post_task("综合").wait()
-        time.sleep(randint(4, 5))
+        self.wait_until_stable(timeout=5, min_delay=(1, 2))
+        self.card_memo.clear()
         while reading_time < 400:
             if self.stop_flag:
                 return
             # 识别文章，获取点击文章的坐标范围
-            image = self.tasker.controller.post_screencap().wait().get()
-            boxes, box_class = self.detect()
+            # 每次滑动后只截一次图，检测与已读判定共用这一帧
+            self.invalidate_frame()
+            image = self.frame()
+            boxes, _ = self.detect(image, ("article", "article_image"))
             # 没有文章就滑动屏幕
-            if len(boxes) == 0 or (
-                "article" not in box_class and "article_image" not in box_class
-            ):
+            if len(boxes) == 0:
                 self.send_log("未识别到文章，正在滑动屏幕")
                 self.tasker.controller.post_swipe(
                     randint(200, 300),
@@ -593,29 +1178,22 @@ class MaaWorker:
                     randint(1000, 1500),
                 ).wait()
                 continue
-            boxes, box_class = zip(
-                *[
-                    (box, cls)
-                    for box, cls in zip(boxes, box_class)
-                    if cls in ["article", "article_image"]
-                ]
-            )
             self.send_log(f"识别到{len(boxes)}篇文章")
-            article_list = []
-            for box in boxes:
-                img = image[box[1] : box[1] + box[3], box[0] : box[0] + box[2]]
-                article_list.append(img)
+            unread, hashes = self._classify_cards(image, boxes)
 
-            for i in range(len(box_class)):
+            for i in range(len(boxes)):
                 if self.stop_flag:
                     return
-                if not self._has_unread_text(article_list[i]):
+                if not unread[i]:
                     continue
+                self.card_memo.mark_read(hashes[i])
                 read_count += 1
                 self.send_log(f"正在阅读第{read_count}篇文章")
                 time.sleep(0.5)
-                self.tasker.controller.post_click(boxes[i][0] + 150, boxes[i][1] + 10)
-                time.sleep(3)
+                self.tasker.controller.post_click(
+                    int(boxes[i, 0]) + 150, int(boxes[i, 1]) + 10
+                )
+                self.wait_until_stable(timeout=5, min_delay=1, changed_from=image)
                 for _ in range(5):
                     if self.stop_flag:
                         return
@@ -631,7 +1209,7 @@ class MaaWorker:
                     reading_time += t
                 time.sleep(1)
                 self.tasker.post_task("返回").wait()
-                time.sleep(randint(3, 5))
+                self.wait_until_stable(timeout=5, min_delay=(1, 2))
             self.tasker.controller.post_swipe(
                 randint(200, 300),
                 randint(900, 1000),
@@ -639,38 +1217,65 @@ class MaaWorker:
                 randint(300, 400),
                 randint(1000, 1500),
             ).wait()
+        if self.debug:
+            print(f"[缓存] 卡片 {self.card_memo.stats()}")
         self.send_log("选读文章任务完成")
 
-    def _has_unread_text(self, img: np.ndarray) -> bool:
-        """检测文章卡片左上角 50%x50% 区域是否存在未读文章的黑色标题文字"""
-        h, w = img.shape[:2]
-        roi = img[: h // 2, : w // 2]
-        # rgb(45, 51, 56) -> bgr(56, 51, 45)，容差 +-15
-        lower = np.array([41, 36, 30], dtype=np.uint8)
-        upper = np.array([71, 66, 60], dtype=np.uint8)
-        mask = np.all((roi >= lower) & (roi <= upper), axis=2)
-        count = np.count_nonzero(mask)
-        unread = bool(count > 80)
-        self.send_log(
-            f"[颜色检测] 黑色像素={count}, 阈值=80, 判定={'未读' if unread else '已读'}"
-        )
-        return unread
+    def _classify_cards(
+        self, image: np.ndarray, boxes
+    ) -> tuple[list[bool], np.ndarray]:
+        """一次判定截图上所有卡片是否未读，返回 (与 boxes 同序的未读标记, 各卡片哈希)。
+        卡片左上 1/4 区域的黑字像素数、卡片的差值哈希都由积分图一次查表得到，不逐张裁剪。
+        本次任务中见过的卡片直接沿用记录，只有新卡片参与计数，每帧最多输出一条日志。"""
+        height, width = image.shape[:2]
+        boxes = np.array(boxes, dtype=np.intp).reshape(-1, 4)
+        x0 = boxes[:, 0].clip(0, width)
+        y0 = boxes[:, 1].clip(0, height)
+        x1 = (boxes[:, 0] + boxes[:, 2]).clip(0, width)
+        y1 = (boxes[:, 1] + boxes[:, 3]).clip(0, height)
+        # 哈希在 1/4 缩略图上计算，积分图只有整帧的 1/16
+        step = 4
+        thumb = integral(thumbnail(image, step))
+        small = np.column_stack((x0, y0, x1 - x0, y1 - y0)) // step
+        hashes = box_dhash(thumb, small, 16)
+        state = self.card_memo.lookup(hashes)
+        new = state < 0
+        if new.any():
+            # 只对新卡片左上 1/4 区域覆盖的条带做颜色过滤
+            qx1 = x0 + (x1 - x0) // 2
+            qy1 = y0 + (y1 - y0) // 2
+            bx, by = x0[new].min(), y0[new].min()
+            band = image[by : qy1[new].max(), bx : qx1[new].max()]
+            dark = integral(color_mask(band, self.UNREAD_TITLE, 15), np.int32)
+            counts = box_sums(
+                dark, x0[new] - bx, y0[new] - by, qx1[new] - bx, qy1[new] - by
+            )
+            unread = counts > self.UNREAD_MIN_PIXELS
+            self.card_memo.remember(hashes[new], unread)
+            state[new] = unread
+            self.send_log(
+                f"[颜色检测] 新卡片{int(new.sum())}张(未读{int(unread.sum())}张), "
+                f"已判定过{int((~new).sum())}张"
+            )
+        return (state == 1).tolist(), hashes
 
     def watch_video(self):
         self.send_log("开始任务：视听学习")
         watch_count = 0
         waiting_time = 0
         self.tasker.post_task("电视台").wait()
-        time.sleep(randint(3, 5))
+        self.wait_until_stable(timeout=5, min_delay=(1, 2))
+        self.card_memo.clear()
         video_box = []
         while not video_box:
             if self.stop_flag:
                 return
             # 识别视频，获取点击视频的坐标范围
-            image = self.tasker.controller.post_screencap().wait().get()
-            boxes, box_class = self.detect()
+            self.invalidate_frame()
+            image = self.frame()
+            boxes, _ = self.detect(image, ("video",))
             # 没有视频就滑动屏幕
-            if len(boxes) == 0 or "video" not in box_class:
+            if len(boxes) == 0:
                 self.send_log("未识别到视频，正在滑动屏幕")
                 self.tasker.controller.post_swipe(
                     randint(200, 300),
@@ -680,17 +1285,13 @@ class MaaWorker:
                     randint(1000, 1500),
                 ).wait()
                 continue
-            boxes, box_class = zip(
-                *[(box, cls) for box, cls in zip(boxes, box_class) if cls in ["video"]]
-            )
             self.send_log(f"识别到{len(boxes)}个视频")
-            for box in boxes:
-                img = image[box[1] : box[1] + box[3], box[0] : box[0] + box[2]]
-                if not self._has_unread_text(img):
-                    continue
-                else:
-                    video_box = box
-                    break
+            unread, hashes = self._classify_cards(image, boxes)
+            if any(unread):
+                i = unread.index(True)
+                video_box = boxes[i].tolist()
+                self.card_memo.mark_read(hashes[i])
+                break
             self.send_log("所有视频已看，正在滑动屏幕")
             self.tasker.controller.post_swipe(
                 randint(200, 300),
@@ -699,6 +1300,8 @@ class MaaWorker:
                 randint(300, 400),
                 randint(1000, 1500),
             ).wait()
+        if self.debug:
+            print(f"[缓存] 卡片 {self.card_memo.stats()}")
         time.sleep(0.5)
         self.tasker.controller.post_click(video_box[0] + 150, video_box[1] + 10)
         while waiting_time < 400:
@@ -722,12 +1325,12 @@ class MaaWorker:
     def _enter_learning_score(self) -> bool:
         """进入 我的 → 学习积分，等待积分规则出现确认加载完成"""
         self.tasker.post_task("我的").wait()
-        time.sleep(0.5 + randint(0, 500) / 1000)
+        self.wait_until_stable(timeout=3, min_delay=(0.5, 1.0))
         result: TaskDetail = self.tasker.post_task("学习积分").wait().get()
         if result.status.failed:
             self.send_log("未找到学习积分按钮")
             self.tasker.post_task("返回").wait()
-            time.sleep(1)
+            self.wait_until_stable(timeout=3)
             self.tasker.post_task("积分").wait()
         else:
             box = result.nodes[0].recognition.best_result.box
@@ -743,7 +1346,7 @@ class MaaWorker:
             if rule_result.status.failed:
                 self.send_log("积分界面加载失败")
                 return False
-        time.sleep(0.5)
+        self.wait_until_stable(timeout=2)
         self.send_log("已进入学习积分")
         return True
 
@@ -759,19 +1362,21 @@ class MaaWorker:
             randint(100, 200),
             randint(1000, 1500),
         ).wait()
-        time.sleep(randint(1, 2))
+        self.wait_until_stable(timeout=3)
         self._click_daily_answer_button()
 
     def _click_daily_answer_button(self):
         result: TaskDetail = self.tasker.post_task("每日答题").wait().get()
         box = result.nodes[0].recognition.best_result.box
+        before = self.tasker.controller.cached_image
         self.tasker.controller.post_click(
             box[0] + randint(10, 30), box[1] + randint(10, 30)
         )
         self.send_log("开始答题")
         if self.stop_flag:
             return
-        time.sleep(5)
+        # 答题页加载较慢，先等画面离开积分页再等加载完成
+        self.wait_until_stable(timeout=8, min_delay=(1, 2), changed_from=before)
 
     def daily_answer(self):
         """每日答题主流程：
@@ -794,7 +1399,7 @@ class MaaWorker:
 
             first_q = self.tasker.post_task("第一题").wait().get()
             if first_q.status.failed:
-                self.send_log("未找到第一题，答题页面异常")
+                self.send_log("未找到第一题，答题页面异常", level="error")
                 plyer.notification.notify(
                     title="MaaXuexi",
                     message="未找到第一题，答题页面异常",
@@ -810,21 +1415,22 @@ class MaaWorker:
                 if self.stop_flag:
                     return
 
+                self.question = i + 1
                 proceed_next = False
+                self.current_question = None
+                captures = self.screencap_count
 
-                result = self.tasker.post_task("题型识别").wait().get()
-                question_type = (
-                    result.nodes[0].recognition.best_result.text.strip()
-                    if result.status.succeeded
-                    else ""
-                )
+                # 之后的题目直接使用正误检测时留下的静止帧
+                if i == 0:
+                    self.invalidate_frame()
+                question_type, options = self._detect_question()
                 match question_type:
                     case "单选题":
                         self.send_log(f"第{i + 1}题 单选题")
-                        proceed_next = self._handle_choice("单选题")
+                        proceed_next = self._handle_choice("单选题", options)
                     case "多选题":
                         self.send_log(f"第{i + 1}题 多选题")
-                        proceed_next = self._handle_choice("多选题")
+                        proceed_next = self._handle_choice("多选题", options)
                     case "填空题":
                         self.send_log(f"第{i + 1}题 填空题")
                         proceed_next = self._handle_fill_blank()
@@ -832,7 +1438,11 @@ class MaaWorker:
                         self.send_log(f"第{i + 1}题 点选填空题")
                         proceed_next = self._handle_click_blank()
                     case _:
-                        self.send_log(f"第{i + 1}题 无法识别题型，请求接管")
+                        self.send_log(
+                            f"第{i + 1}题 无法识别题型，请求接管",
+                            level="warning",
+                            kind="takeover",
+                        )
                         plyer.notification.notify(
                             title="MaaXuexi",
                             message="无法识别题型，请求接管",
@@ -842,12 +1452,20 @@ class MaaWorker:
                         self.pause()
                         return
 
-                time.sleep(1)
+                if self.debug:
+                    print(
+                        f"[截图] 第{i + 1}题 共截图{self.screencap_count - captures}次"
+                    )
+                self.wait_until_stable(timeout=2, min_delay=(0.3, 0.6))
+                answered = self.frame()
                 self.tasker.post_task("确定").wait()
-                # 正误检测：答对后界面自动跳转，答错则仍显示"下一题"按钮
-                next_btn = self.tasker.post_task("下一题检测").wait().get()
-                if next_btn.status.succeeded:
-                    self.send_log(f"[正误检测] 第{i + 1}题答错，重新答题")
+                self.invalidate_frame()
+                correct = self._check_answer(answered)
+                self._learn(correct)
+                if not correct:
+                    self.send_log(
+                        f"[正误检测] 第{i + 1}题答错，重新答题", level="warning"
+                    )
                     if fast_mode_this_round:
                         self.fast_answer = False
                         self.send_log("极速模式已关闭，切换为常规答题")
@@ -860,7 +1478,7 @@ class MaaWorker:
                 # 本轮答错，重试：重新点击"每日答题"按钮进入
                 retry_count += 1
                 if retry_count > max_retries:
-                    self.send_log("重试次数已达上限，答题失败")
+                    self.send_log("重试次数已达上限，答题失败", level="error")
                     plyer.notification.notify(
                         title="MaaXuexi",
                         message="重试次数已达上限，答题失败",
@@ -870,13 +1488,17 @@ class MaaWorker:
                     return
                 self.send_log(f"第 {retry_count} 次重试")
                 self.tasker.post_task("返回").wait()
-                time.sleep(0.5)
+                self.wait_until_stable(timeout=2)
                 self.tasker.post_task("放弃答题退出").wait().get()
-                time.sleep(2)
+                self.wait_until_stable(timeout=3)
                 self._click_daily_answer_button()
 
+        if self.debug:
+            print(f"[缓存] OCR {self.ocr_cache.stats()}")
+            print(f"[题库] {self.question_bank.stats()}")
+            print(f"[AI] {self.ai_resolver.stats()}")
         # 答题结束后两次验证码检测（答题结束和提交后各一次）
-        time.sleep(2)
+        self.wait_until_stable(timeout=3)
         reco_result: TaskDetail = self.tasker.post_task("访问异常").wait().get()
         if reco_result.status.succeeded:
             plyer.notification.notify(
@@ -885,15 +1507,14 @@ class MaaWorker:
                 app_name="MaaXuexi",
                 timeout=60,
             )
-            self.send_log("发现验证码，请求接管")
+            self.send_log("发现验证码，请求接管", level="warning", kind="takeover")
             self.pause()
 
             if proceed_next:
-                time.sleep(0.5)
+                self.wait_until_stable(timeout=2)
                 self.tasker.post_task("确定").wait()
-                time.sleep(randint(2, 3))
         # 结束答题，大概率会弹验证码
-        time.sleep(2)
+        self.wait_until_stable(timeout=4, min_delay=1)
         reco_result: TaskDetail = self.tasker.post_task("访问异常").wait().get()
         if reco_result.status.succeeded:
             plyer.notification.notify(
@@ -902,14 +1523,79 @@ class MaaWorker:
                 app_name="MaaXuexi",
                 timeout=60,
             )
-            self.send_log("发现验证码，请求接管")
+            self.send_log("发现验证码，请求接管", level="warning", kind="takeover")
             self.pause()
 
-    def _get_red_texts(self) -> list[str]:
-        """调用 RedTextOCR 自定义识别器，从提示区域提取红色文字。
+    def _check_answer(self, answered: np.ndarray) -> bool:
+        """正误检测，答对返回 True。answered 为点击确定前的截图。
+        答对后界面自动跳到下一题，答错则在确定按钮处显示"下一题"按钮：
+        画面一离开作答状态就在变化后的帧上识别该按钮，答对时不再等待 下一题检测 节点超时。
+        未识别到时等画面静止再复核一次，静止的这一帧留作持有帧，即下一题的首帧。"""
+        changed = self.wait_until_changed(answered, (None, self.BUTTON_ROI), timeout=2)
+        if self.recognize("下一题检测") is not None:
+            return False
+        self.wait_until_stable(timeout=3)
+        # 画面始终没有变化(点击未生效、截图卡顿)时按节点超时重新等待
+        return self.recognize("下一题检测", fallback=not changed) is None
+
+    def _detect_question(self) -> tuple[str, dict | None]:
+        """在持有帧上识别当前题目的题型，选择题顺带扫描选项，返回 (题型, 选项)，非选择题选项为 None。
+        识别所用的截图留作持有帧，供 _prepare 继续使用。"""
+        reco = self.recognize("题型识别", fallback=True)
+        question_type = reco.best_result.text.strip() if reco else ""
+        options = None
+        if question_type in ("单选题", "多选题"):
+            options = self._get_options()
+        return question_type, options
+
+    def _run_ocr(self, param: JOCR, image: np.ndarray) -> RecognitionDetail | None:
+        result: TaskDetail = (
+            self.tasker.post_recognition(JRecognitionType.OCR, param, image)
+            .wait()
+            .get()
+        )
+        if result and result.status.succeeded:
+            return result.nodes[0].recognition
+        return None
+
+    def _ocr_texts(self, image: np.ndarray, rois: list) -> list[str]:
+        """识别截图 image 上多个 roi 区域的文字，按像素内容缓存结果；
+        未命中缓存的区域合并为一次批量OCR (batch_ocr)。返回与 rois 同序的文字，识别失败为空字符串。"""
+        keys = [self.ocr_cache.key("批量OCR", image, roi) for roi in rois]
+        texts = [self.ocr_cache.get(key) for key in keys]
+        missing = [i for i, text in enumerate(texts) if text is None]
+        crops = [
+            image[y : y + h, x : x + w] for x, y, w, h in (rois[i] for i in missing)
+        ]
+        for i, text in zip(missing, batch_ocr(crops, self._run_ocr)):
+            texts[i] = text
+            self.ocr_cache.put(keys[i], text)
+        return texts
+
+    def _get_red_texts(self, image: np.ndarray) -> list[str]:
+        """对提示截图调用 RedTextOCR 自定义识别器，从提示区域提取红色文字。
         OCR流程：红度过滤 → 形态学膨胀 → 分块裁剪 → 逐块OCR → 出血线合并。
+        提示区域像素未变化(如重试轮次)时直接使用缓存结果。
         返回红字文本列表，每组红字为一个元素。"""
-        result: TaskDetail = self.tasker.post_task("红字识别").wait().get()
+        roi = (RedTextOCR.ROI_X, RedTextOCR.ROI_Y, RedTextOCR.ROI_W, RedTextOCR.ROI_H)
+        key = self.ocr_cache.key("红字识别", image, roi)
+        cached = self.ocr_cache.get(key)
+        if cached is not None:
+            if self.debug:
+                print(f"[识别] 红色文字(缓存): {cached}")
+            return list(cached)
+        result: TaskDetail = (
+            self.tasker.post_recognition(
+                JRecognitionType.Custom,
+                JCustomRecognition(
+                    custom_recognition="RedTextOCR",
+                    custom_recognition_param={"debug": self.debug},
+                ),
+                image,
+            )
+            .wait()
+            .get()
+        )
         texts = []
         if result.status.succeeded:
             raw = result.nodes[0].recognition.raw_detail
@@ -930,39 +1616,119 @@ class MaaWorker:
                                         break
                                 if texts:
                                     break
-        if DEBUG_MODE:
+        self.ocr_cache.put(key, tuple(texts))
+        if self.debug:
             print(f"[识别] 红色文字: {texts}")
         return texts
 
+    def _get_stem(self, image: np.ndarray, bottom: int) -> tuple[str, int]:
+        """识别题干：对题干区域(到 bottom 为止)执行OCR，按行拼接后去标点。
+        同时计算该区域的差值哈希，OCR失败时题库以指纹匹配。返回 (题干, 指纹)。"""
+        x, y, w, h = self.STEM_ROI
+        roi = (x, y, w, max(1, min(h, bottom - y)))
+        fingerprint = dhash(image[y : y + roi[3], x : x + w])
+        key = self.ocr_cache.key("题干识别", image, roi)
+        stem = self.ocr_cache.get(key)
+        if stem is None:
+            result: TaskDetail = (
+                self.tasker.post_recognition(JRecognitionType.OCR, JOCR(roi=roi), image)
+                .wait()
+                .get()
+            )
+            lines = []
+            if result.status.succeeded:
+                lines = sorted(
+                    result.nodes[0].recognition.filtered_results,
+                    key=lambda r: (r.box[1], r.box[0]),
+                )
+            stem = normalize("".join(line.text for line in lines))
+            self.ocr_cache.put(key, stem)
+        if self.debug:
+            print(f'[题库] 题干="{stem}" 指纹={fingerprint:016x}')
+        return stem, fingerprint
+
+    def _lookup_bank(
+        self, question_type: str, image: np.ndarray, options: dict, blank_num: int
+    ):
+        """识别题干并查询题库，命中返回答案，未命中返回 None。
+        无论是否命中都记录当前题目信息，供正误检测后更新题库。"""
+        bottom = self.STEM_ROI[1] + self.STEM_ROI[3]
+        if options:
+            bottom = min(box[1] for _, box in options.values())
+        stem, fingerprint = self._get_stem(image, bottom)
+        self.current_question = {
+            "type": question_type,
+            "stem": stem,
+            "fingerprint": fingerprint,
+            "options": options,
+            "bank_id": None,
+        }
+        hit = self.question_bank.lookup(question_type, stem, fingerprint, options)
+        if hit is None:
+            return None
+        qid, answer = hit
+        if question_type == "填空题" and blank_num and len(answer) != blank_num:
+            if self.debug:
+                print(f"[题库] 答案字数{len(answer)}与格子数{blank_num}不符，忽略")
+            return None
+        self.current_question["bank_id"] = qid
+        return answer
+
+    def _learn(self, correct: bool):
+        """根据正误检测结果更新题库：答对则保存答案，题库答案被判错则删除该条目"""
+        question = self.current_question
+        if question is None or "answer" not in question:
+            return
+        if correct:
+            self.question_bank.record(
+                question["type"],
+                question["stem"],
+                question["fingerprint"],
+                question["answer"],
+                question["options"],
+            )
+        elif question["source"] == "题库":
+            self.question_bank.forget(question["bank_id"])
+            self.send_log("题库答案有误，已从题库删除")
+
+    def _find_chips(self, image: np.ndarray) -> list[list[int]]:
+        """点选填空题选项框检测：按描边颜色过滤出灰色像素，一次连通域标记得到所有描边，
+        保留尺寸符合、内部空心(描边像素占外接框不足一半)的框，与选项字数、个数无关。
+        返回按阅读顺序排列的 [x, y, w, h] 列表。"""
+        # 圆角处是抗锯齿的浅色像素，先膨胀 5×5 把描边连成闭合的框，外接框再各边收回2px
+        mask = dilate(color_mask(image, self.CHIP_BORDER), 5, 5)
+        boxes, areas = label_boxes(mask)
+        w, h = boxes[:, 2], boxes[:, 3]
+        keep = (
+            (h >= self.CHIP_HEIGHT[0])
+            & (h <= self.CHIP_HEIGHT[1])
+            & (w >= self.CHIP_MIN_WIDTH)
+            & (areas < 0.5 * w * h)
+        )
+        boxes = boxes[keep] + [2, 2, -4, -4]
+        # 同一行的选项框顶边可能差几个像素：按顶边排序后相邻差距超过半个框高才算换行
+        boxes = boxes[np.argsort(boxes[:, 1], kind="stable")]
+        line = np.cumsum(np.diff(boxes[:, 1], prepend=0) > self.CHIP_HEIGHT[0] // 2)
+        return boxes[np.lexsort((boxes[:, 0], line))].tolist()
+
     def _scan_click_options(self) -> dict[str, list]:
-        """点选填空题选项识别：模板匹配1-4字选项框，内缩10px后OCR识别文字。
+        """点选填空题选项识别：颜色分割找出全部选项框，内缩10px后批量OCR识别文字。
         返回 {选项文字: [x, y, w, h]} 映射。"""
-        # TODO: 该方法仍不稳定，待改进
         options = {}
         try:
-            for n in [1, 2, 3, 4]:
-                result: TaskDetail = self.tasker.post_task(f"点选{n}字").wait().get()
-                if result.status.failed:
-                    break
-                box = list(result.nodes[0].recognition.best_result.box)
-                x, y, w, h = box
-                roi = [max(0, x + 10), max(0, y + 10), max(1, w - 20), max(1, h - 20)]
-                ocr_result: TaskDetail = (
-                    self.tasker.post_task("扫描选项", {"扫描选项": {"roi": roi}})
-                    .wait()
-                    .get()
-                )
-                if ocr_result.status.failed:
-                    break
-                text = ocr_result.nodes[0].recognition.best_result.text.strip()
+            image = self.frame()
+            boxes = self._find_chips(image)
+            rois = [
+                [max(0, x + 10), max(0, y + 10), max(1, w - 20), max(1, h - 20)]
+                for x, y, w, h in boxes
+            ]
+            texts = self._ocr_texts(image, rois)
+            for n, (box, roi, text) in enumerate(zip(boxes, rois, texts), start=1):
                 if text:
                     options[text] = box
-                    if DEBUG_MODE:
-                        print(f'[点选] {n}字模板 box={box} roi={roi} => "{text}"')
-            if len(options.keys()) == 4:
-                return options
-            else:
-                return {}
+                    if self.debug:
+                        print(f'[点选] 选项框{n} box={box} roi={roi} => "{text}"')
+            return options
         except Exception:
             self.send_log("点选填空题选项识别异常，请检查终端日志")
         return {}
@@ -971,8 +1737,8 @@ class MaaWorker:
         self, question_type: str, options: dict, red_texts: list, blank_num: int = 0
     ):
         """极速答题核心：基于OCR红字和选项文字进行匹配，无需调用AI。
-        - 单选题：判断题直接匹配正确/错误；普通题去标点后模糊匹配（精确/子串/长度≥2/3），多红字尝试排列组合
-        - 多选题：选项数≤红字组数则全选；否则逐条红字匹配选项，全部匹配才返回
+        - 单选题：判断题直接匹配正确/错误；普通题去标点后分级匹配（精确/子串/长度≥2/3），多红字求拼接指派 (matching.best_option)
+        - 多选题：选项数≤红字组数则全选；否则红字到选项贪心指派 (matching.assign)，全部匹配才返回
         - 填空题：红字拼接，字数=格子数则直接填入
         - 点选填空题：红字拼接作为答案
         返回选项字母列表/答案字符串，失败返回None交给AI。"""
@@ -987,75 +1753,53 @@ class MaaWorker:
             case "多选题":
                 option_letters = list(options.keys())
                 if len(option_letters) <= len(red_texts):
-                    if DEBUG_MODE:
+                    if self.debug:
                         print(
                             f"[极速] 多选题: 选项数{len(option_letters)} <= 红字组数{len(red_texts)}, 全选 {option_letters}"
                         )
                     return option_letters
 
                 option_texts = {l: options[l][0] for l in options}
-                if DEBUG_MODE:
+                if self.debug:
                     print(
                         f"[极速] 多选题: 选项数{len(option_letters)} > 红字组数{len(red_texts)}, 红字={red_texts}, 选项={option_texts}"
                     )
 
-                def match_red_to_option(red_text):
-                    red_clean = strip_punct(red_text)
-                    # 优先级：精确 > 子串 > 模糊
-                    exact, substring, fuzzy = None, None, None
-                    for letter, text in option_texts.items():
-                        text_clean = strip_punct(text)
-                        if not text_clean:
-                            if text in red_text:
-                                exact = exact or letter
-                        elif text_clean == red_clean:
-                            exact = letter
-                        elif text_clean in red_clean or red_clean in text_clean:
-                            substring = substring or letter
-                        elif (
-                            red_clean
-                            and min(len(text_clean), len(red_clean))
-                            / max(len(text_clean), len(red_clean))
-                            >= 2 / 3
-                        ):
-                            fuzzy = fuzzy or letter
-                    return exact or substring or fuzzy
-
                 matched = []
                 unmatched_reds = []
-                for rt in red_texts:
-                    result = match_red_to_option(rt)
+                for rt, result in zip(red_texts, assign(option_texts, red_texts)):
                     if result is not None:
-                        if DEBUG_MODE:
+                        letter, tier, score = result
+                        if self.debug:
                             print(
-                                f'[极速] 多选题红字匹配: "{rt}" -> {result} ({option_texts[result]})'
+                                f'[极速] 多选题红字{tier}匹配: "{rt}" -> {letter} ({option_texts[letter]}), 得分={score:.2f}'
                             )
-                        if result not in matched:
-                            matched.append(result)
+                        if letter not in matched:
+                            matched.append(letter)
                     else:
                         unmatched_reds.append(rt)
                 if unmatched_reds:
-                    if DEBUG_MODE:
+                    if self.debug:
                         print(
                             f"[极速] 多选题: 有红字未匹配选项: {unmatched_reds}, 交给AI"
                         )
                     return None
                 if matched:
-                    if DEBUG_MODE:
+                    if self.debug:
                         print(f"[极速] 多选题: 所有红字均匹配选项, 选 {matched}")
                     return matched
-                if DEBUG_MODE:
+                if self.debug:
                     print("[极速] 多选题: 文字匹配失败, 交给AI")
                 return None
             case "填空题":
                 answer = "".join(red_texts)
                 if blank_num > 0 and len(answer) == blank_num:
-                    if DEBUG_MODE:
+                    if self.debug:
                         print(
                             f'[极速] 填空题: 答案="{answer}", 字数={len(answer)}, 格子={blank_num}'
                         )
                     return answer
-                if DEBUG_MODE:
+                if self.debug:
                     print(
                         f"[极速] 填空题: 字数{len(answer)} != 格子{blank_num}, 交给AI"
                     )
@@ -1063,22 +1807,20 @@ class MaaWorker:
             case "点选填空题":
                 answer = "".join(red_texts)
                 if answer:
-                    if DEBUG_MODE:
+                    if self.debug:
                         print(f'[极速] 点选填空题: 答案="{answer}"')
                     return answer
                 return None
             case "单选题":
                 option_texts = {i: options[i][0] for i in options}
-                judge_words = {"正确", "错误", "对", "错", "√", "×"}
-                is_judge = all(t in judge_words for t in option_texts.values())
-                if is_judge:
+                if is_judge(option_texts.values()):
                     combined = "".join(red_texts)
-                    if DEBUG_MODE:
+                    if self.debug:
                         print(f'[极速] 判断题, 红字="{combined}"')
                     if combined == "正确":
                         for letter, text in option_texts.items():
                             if text == "正确":
-                                if DEBUG_MODE:
+                                if self.debug:
                                     print(f"[极速] 判断题直接匹配: {letter} ({text})")
                                 return [letter]
                     # 字多即是对.jpg
@@ -1089,156 +1831,110 @@ class MaaWorker:
                     )
                     for letter, text in option_texts.items():
                         if text in target_words:
-                            if DEBUG_MODE:
+                            if self.debug:
                                 print(f"[极速] 判断题推测: {letter} ({text})")
                             return [letter]
                     return None
 
                 combined = "".join(red_texts)
-                if DEBUG_MODE:
+                if self.debug:
                     print(f'[极速] 选择题, 红字="{combined}", 选项={option_texts}')
 
-                combined_clean = strip_punct(combined)
-                # 优先级匹配：精确 > 子串 > 模糊长度比(≥2/3)
-                exact, substring, fuzzy = [], [], []
-                for letter, text in option_texts.items():
-                    text_clean = strip_punct(text)
-                    if not text_clean:
-                        if text in combined:
-                            exact.append(letter)
-                    elif text_clean == combined_clean:
-                        exact.append(letter)
-                    elif text_clean in combined_clean or combined_clean in text_clean:
-                        substring.append(letter)
-                    elif (
-                        min(len(text_clean), len(combined_clean))
-                        / max(len(text_clean), len(combined_clean))
-                        >= 2 / 3
-                    ):
-                        fuzzy.append(letter)
-                for label, candidates, log_fn in [
-                    (
-                        "精确",
-                        exact,
-                        lambda x: f"[极速] 精确匹配: {x} ({option_texts[x]})",
-                    ),
-                    (
-                        "子串",
-                        substring,
-                        lambda x: f"[极速] 子串匹配: {x} ({option_texts[x]})",
-                    ),
-                    (
-                        "模糊",
-                        fuzzy,
-                        lambda x: f"[极速] 模糊匹配: {x} ({option_texts[x]})",
-                    ),
-                ]:
-                    if candidates:
-                        log_fn(candidates[0])
-                        return [candidates[0]]
-                if len(red_texts) > 1:
-                    from itertools import permutations
-
-                    for perm in permutations(red_texts):
-                        perm_text = "".join(perm)
-                        perm_clean = strip_punct(perm_text)
-                        # 排列匹配也按优先级：精确 > 子串 > 模糊
-                        exact_p, substring_p, fuzzy_p = [], [], []
-                        for letter, text in option_texts.items():
-                            text_clean = strip_punct(text)
-                            if not text_clean:
-                                if text in perm_text:
-                                    exact_p.append(letter)
-                            elif text_clean == perm_clean:
-                                exact_p.append(letter)
-                            elif text_clean in perm_clean or perm_clean in text_clean:
-                                substring_p.append(letter)
-                            elif (
-                                min(len(text_clean), len(perm_clean))
-                                / max(len(text_clean), len(perm_clean))
-                                >= 2 / 3
-                            ):
-                                fuzzy_p.append(letter)
-                        for label, candidates in [
-                            ("排列精确", exact_p),
-                            ("排列子串", substring_p),
-                            ("排列模糊", fuzzy_p),
-                        ]:
-                            if candidates:
-                                if DEBUG_MODE:
-                                    print(
-                                        f'[极速] {label}匹配: {candidates[0]} ({option_texts[candidates[0]]}), 排列="{perm_text}"'
-                                    )
-                                return [candidates[0]]
+                # 精确 > 子串 > 模糊；多段红字按指派判断能否以某种顺序拼成选项，不枚举排列
+                best = best_option(option_texts, red_texts)
+                if best is not None:
+                    letter, tier, score = best
+                    if self.debug:
+                        print(
+                            f"[极速] {tier}匹配: {letter} ({option_texts[letter]}), 得分={score:.2f}"
+                        )
+                    return [letter]
                 self.send_log("[极速答题] 极速答题失败，原因：无法匹配，请求AI解答")
                 return None
             case _:
                 return None
 
+    def _find_option_letters(self, image: np.ndarray) -> dict[str, list]:
+        """在一帧截图上用一次多模板匹配找出所有选项字母，返回按字母排序的 {字母: box}。
+        不存在的字母不再单独等待超时；同一字母多次命中时保留得分最高的框。"""
+        # 阈值与 pipeline 中的 选项A-F 节点保持一致
+        result: TaskDetail = (
+            self.tasker.post_recognition(
+                JRecognitionType.TemplateMatch,
+                JTemplateMatch(
+                    template=[f"{letter}.png" for letter in OPTION_LETTERS.values()],
+                    roi=self.OPTION_LETTER_ROI,
+                    threshold=[0.9] * len(OPTION_LETTERS),
+                ),
+                image,
+            )
+            .wait()
+            .get()
+        )
+        best = {}
+        if result.status.succeeded:
+            for item in result.nodes[0].recognition.filtered_results:
+                box = list(item.box)
+                letter = OPTION_LETTERS.get((box[2], box[3]))
+                if letter and (letter not in best or item.score > best[letter][1]):
+                    best[letter] = (box, item.score)
+        return {letter: best[letter][0] for letter in sorted(best)}
+
     def _get_options(self) -> dict[str, tuple[str, list]]:
         """OCR扫描选择题选项文字。
-        流程：模板匹配A-F字母位置 → 对每个字母右侧区域(到x=635)执行OCR → 去噪(銀園等)。
+        流程：当前帧 → 一次模板匹配找出A-F字母位置 → 各字母右侧区域(到x=635)一次批量OCR → 去噪(銀園等)。
         返回 {字母: (文字, [x, y, w, h])} 映射。"""
         options = {}
-        found = {}
-        for letter in ["A", "B", "C", "D", "E", "F"]:
-            find_result: TaskDetail = (
-                self.tasker.post_task(f"选项{letter}").wait().get()
-            )
-            if find_result.status.succeeded:
-                box = list(find_result.nodes[0].recognition.best_result.box)
-                found[letter] = box
+        image = self.frame()
+        found = self._find_option_letters(image)
         if not found:
-            if DEBUG_MODE:
+            if self.debug:
                 print("[识别] 选项: 未找到任何选项")
             return options
-        if DEBUG_MODE:
+        if self.debug:
             print(f"[识别] 找到选项: {list(found.keys())}")
-        for letter, box in found.items():
-            roi = [box[0] + box[2], box[1], 635 - box[0] - box[2], box[3]]
-            # OCR区域：从字母右侧到x=635，避开字母图标本身
-            ocr_result: TaskDetail = (
-                self.tasker.post_task("扫描选项", {"扫描选项": {"roi": roi}})
-                .wait()
-                .get()
-            )
-            text = ""
-            if ocr_result.status.succeeded:
-                text = ocr_result.nodes[0].recognition.best_result.text.strip()
-                for noise in ["銀園", "銀", "電", "機"]:
-                    if text.endswith(noise):
-                        text = text[: -len(noise)].strip()
-            if DEBUG_MODE:
+        # OCR区域：从字母右侧到x=635，避开字母图标本身
+        rois = [
+            [box[0] + box[2], box[1], 635 - box[0] - box[2], box[3]]
+            for box in found.values()
+        ]
+        for (letter, box), text in zip(found.items(), self._ocr_texts(image, rois)):
+            for noise in ["銀園", "銀", "電", "機"]:
+                if text.endswith(noise):
+                    text = text[: -len(noise)].strip()
+            if self.debug:
                 print(f'[识别] {letter} => "{text}"')
             if text:
                 options[letter] = (text, box)
-        if DEBUG_MODE:
+        if self.debug:
             print(f"[识别] 选项: {options}")
         return options
 
-    def _prepare(self, question_type: str) -> tuple:
-        """准备答题数据，返回 (截图列表, 选项OCR结果, 红字列表, 填空格子数)。
+    def _prepare(self, question_type: str, options: dict | None = None) -> tuple:
+        """准备答题数据，返回 (截图列表, 选项OCR结果, 红字列表, 填空格子数, AI请求, 题库答案)。
         流程：
-        1. [极速+选择题] OCR扫描选项文字 (_get_options)
+        1. [选择题] OCR扫描选项文字 (_get_options)，题库按选项文字匹配答案
         2. [填空题] 统计文本框格子数 (_count_blanks)
-        3. 查找"提示"按钮，未找到则下滑重试（下滑后重新扫描选项）
-        4. 滚动截图找到提示区域
-        5. [极速] RedTextOCR提取红字 (_get_red_texts)
+        3. 识别题干查询题库 (_lookup_bank)，命中则跳过查看提示和AI，直接返回
+        4. 查找"提示"按钮，未找到则下滑重试（下滑后重新扫描选项）
+        5. 滚动截图找到提示区域，截图齐全后立即在后台发起AI请求
+        6. [极速] RedTextOCR提取红字 (_get_red_texts)，与AI请求并行
+        步骤1-4 的识别共用同一帧截图，只在下滑、点开提示后重新截图。
+        options 为识别题型时已在当前帧上扫描到的选项，传入时跳过步骤1的扫描。
         """
-        options = {}
         blank_num = 0
-        if self.fast_answer and question_type in ("单选题", "多选题"):
-            options = self._get_options()
+        if options is None:
+            options = {}
+            if question_type in ("单选题", "多选题"):
+                options = self._get_options()
         if question_type == "填空题":
-            result: TaskDetail = self.tasker.post_task("文本框").wait().get()
-            blank_num = (
-                len(result.nodes[0].recognition.all_results)
-                if result.status.succeeded
-                else 0
-            )
-        img_list = [self.tasker.controller.post_screencap().wait().get()]
-        hint_found: TaskDetail = self.tasker.post_task("查找提示").wait().get()
-        if hint_found.status.failed:
+            reco = self.recognize("文本框")
+            blank_num = len(reco.all_results) if reco else 0
+        img_list = [self.frame()]
+        bank_answer = self._lookup_bank(question_type, img_list[0], options, blank_num)
+        if bank_answer is not None:
+            return img_list, options, [], blank_num, None, bank_answer
+        if self.recognize("查找提示") is None:
             self.tasker.controller.post_swipe(
                 randint(350, 360),
                 randint(990, 1000),
@@ -1246,20 +1942,110 @@ class MaaWorker:
                 randint(580, 590),
                 randint(1500, 2000),
             ).wait()
-            time.sleep(0.5)
-            img_list.append(self.tasker.controller.post_screencap().wait().get())
-            if self.fast_answer and question_type in ("单选题", "多选题"):
+            self.invalidate_frame()
+            self.wait_until_stable(timeout=2)
+            img_list.append(self.frame())
+            if question_type in ("单选题", "多选题"):
                 new_options = self._get_options()
                 for k, v in new_options.items():
                     options[k] = v
         self.tasker.post_task("查看提示").wait()
-        time.sleep(0.5)
-        img_list.append(self.tasker.controller.post_screencap().wait().get())
+        self.invalidate_frame()
+        self.wait_until_stable(timeout=2, changed_from=img_list[-1])
+        img_list.append(self.frame())
+        ai_future = self._start_ai(question_type, img_list, blank_num)
         red_texts = []
         if self.fast_answer:
-            red_texts = self._get_red_texts()
+            red_texts = self._get_red_texts(img_list[-1])
         self.tasker.post_task("关闭提示").wait()
-        return img_list, options, red_texts, blank_num
+        self.invalidate_frame()
+        return img_list, options, red_texts, blank_num, ai_future, None
+
+    def _start_ai(
+        self,
+        question_type: str,
+        img_list: list,
+        blank_num: int = 0,
+        model: str | None = None,
+    ) -> Future | None:
+        """在后台发起AI请求并立即返回 Future，不阻塞答题线程。
+        未指定 model 时使用分级模型中最小的一级。"""
+        model = model or self.ai_resolver.tiers()[0]
+        if question_type in ("单选题", "多选题"):
+            coro = self.ai_resolver.aresolve_choice(img_list, model)
+        elif question_type == "填空题":
+            coro = self.ai_resolver.aresolve_blank(img_list, False, blank_num, model)
+        elif question_type == "点选填空题":
+            coro = self.ai_resolver.aresolve_click_blank(img_list, model)
+        else:
+            return None
+        if self.debug:
+            print(f"[AI] 发起{question_type}解答请求 model={model}")
+        return self.ai_resolver.submit(coro)
+
+    def _reject_reason(
+        self,
+        question_type: str,
+        answer,
+        options: dict,
+        red_texts: list,
+        blank_num: int = 0,
+    ) -> str | None:
+        """校验AI答案，通过返回 None，否则返回不通过的原因。
+        - 选择题：字母须在识别到的选项中，单选题只能有一个字母
+        - 填空题：字数须等于格子数
+        - 点选填空题：每个词须能对应到识别到的选项
+        - 有红字时答案须与红字相符(至少一半的字出现在红字中)，判断题除外"""
+        if not answer:
+            return "为空"
+        evidence = "".join(normalize(t) for t in red_texts)
+        if question_type in ("单选题", "多选题"):
+            if options and any(letter not in options for letter in answer):
+                return f"{answer}超出识别到的选项{list(options)}"
+            if question_type == "单选题" and len(answer) != 1:
+                return f"{answer}不是单个选项"
+            texts = [options[letter][0] for letter in answer if letter in options]
+            # 判断题的红字是一段陈述，几乎不含 正确/错误 字样，不与选项比对
+            judge = is_judge(text for text, _ in options.values())
+            if (
+                evidence
+                and texts
+                and not judge
+                and max(char_overlap(t, evidence) for t in texts) < 0.5
+            ):
+                return "与提示红字不符"
+        elif question_type == "填空题":
+            if blank_num and len(answer) != blank_num:
+                return f"字数{len(answer)}与格子数{blank_num}不符"
+            if evidence and char_overlap(answer, evidence) < 0.5:
+                return "与提示红字不符"
+        elif question_type == "点选填空题":
+            chips = self._scan_click_options()
+            for token in split_tokens(answer):
+                if chips and not any(token in c or c in token for c in chips):
+                    return f'"{token}"不在选项{list(chips)}中'
+        return None
+
+    def _escalate(
+        self,
+        question_type: str,
+        answer,
+        img_list: list,
+        options: dict,
+        red_texts: list,
+        blank_num: int = 0,
+    ):
+        """分级模型：当前答案未通过校验时交给下一级更大的模型，直到通过或没有更大的模型"""
+        for model in self.ai_resolver.tiers()[1:]:
+            reason = self._reject_reason(
+                question_type, answer, options, red_texts, blank_num
+            )
+            if reason is None:
+                break
+            self.ai_resolver.counters["escalations"] += 1
+            self.send_log(f"AI答案{reason}，改用 {model} 解答")
+            answer = self._start_ai(question_type, img_list, blank_num, model).result()
+        return answer
 
     def _determine_answer(
         self,
@@ -1268,35 +2054,47 @@ class MaaWorker:
         red_texts: list,
         img_list: list,
         blank_num: int = 0,
+        ai_future: Future | None = None,
+        bank_answer=None,
     ):
-        """确定答案：优先极速匹配，失败则调用AI。
-        返回 (答案, 是否极速) 元组。极速成功直接返回；否则发截图给AI大模型。
-        AI失败则通知用户接管。"""
+        """确定答案：题库命中直接采用；否则AI请求与极速匹配赛跑，取先得到的有效结果并取消另一方。
+        返回 (答案, 来源) 元组，来源为 "题库"/"极速模式"/"AI"。
+        - AI已返回有效答案：直接采用
+        - 极速匹配成功：取消进行中的AI请求
+        - 两者都未得到结果：等待AI返回，未通过校验则升级到更大的模型，AI失败则通知用户接管
+        配置了小模型时，提前返回的AI答案同样需通过校验才直接采用"""
+        if bank_answer is not None:
+            return bank_answer, "题库"
+        if ai_future is not None and ai_future.done() and not ai_future.cancelled():
+            early = ai_future.result() if ai_future.exception() is None else None
+            if early is not None and (
+                len(self.ai_resolver.tiers()) == 1
+                or not self._reject_reason(
+                    question_type, early, options, red_texts, blank_num
+                )
+            ):
+                if self.debug:
+                    print("[AI] 请求先于极速匹配返回，直接采用")
+                return early, "AI"
         fast_answer = self._fast_try_answer(
             question_type, options, red_texts, blank_num
         )
-        if fast_answer is not None:
-            return fast_answer, True
-        if question_type == "填空题" and red_texts:
+        if fast_answer is None and question_type == "填空题" and red_texts:
             answer = "".join(red_texts)
             if len(answer) == blank_num:
-                return answer, True
-
-        # 极速失败，发截图给AI大模型解答
-        if question_type in ("单选题", "多选题"):
-            if DEBUG_MODE:
-                print("[AI] 请求选择题解答")
-            answer = self.ai_resolver.resolve_choice(img_list)
-        elif question_type == "填空题":
-            if DEBUG_MODE:
-                print("[AI] 请求填空题解答")
-            answer = self.ai_resolver.resolve_blank(img_list, False, blank_num)
-        elif question_type == "点选填空题":
-            if DEBUG_MODE:
-                print("[AI] 请求点选填空题解答")
-            answer = self.ai_resolver.resolve_click_blank(img_list)
-        else:
-            answer = None
+                fast_answer = answer
+        if fast_answer is not None:
+            if ai_future is not None and ai_future.cancel() and self.debug:
+                print("[AI] 极速匹配成功，已取消AI请求")
+            return fast_answer, "极速模式"
+
+        # 极速失败，等待AI大模型解答
+        if ai_future is None:
+            ai_future = self._start_ai(question_type, img_list, blank_num)
+        answer = ai_future.result() if ai_future is not None else None
+        answer = self._escalate(
+            question_type, answer, img_list, options, red_texts, blank_num
+        )
         if answer is None:
             plyer.notification.notify(
                 title="MaaXuexi",
@@ -1304,22 +2102,23 @@ class MaaWorker:
                 app_name="MaaXuexi",
                 timeout=60,
             )
-            self.send_log("AI解答失败, 请求接管")
+            self.send_log("AI解答失败, 请求接管", level="warning", kind="takeover")
             self.pause()
-            return None, False
-        return answer, False
+            return None, "AI"
+        return answer, "AI"
 
-    def _submit_answer(self, question_type: str, answer, from_fast: bool) -> bool:
-        """提交答案到界面。
+    def _submit_answer(self, question_type: str, answer, source: str) -> bool:
+        """提交答案到界面，source 为答案来源("题库"/"极速模式"/"AI")。
         - 选择题：逐个点击选项字母(选A/选B...)，被遮挡则下滑重试
         - 填空题：点击文本框 → 输入文字
-        - 点选填空题：极速模式用颜色验证点选，AI模式用文字匹配点选
+        - 点选填空题：极速模式按红字在选项中查找；题库/AI 的答案是有序的词，按词的顺序依次点选
         """
+        if self.current_question is not None:
+            self.current_question.update(answer=answer, source=source)
+        # 提交会点击、输入，此后的识别需要新截图
+        self.invalidate_frame()
         if question_type in ("单选题", "多选题"):
-            if from_fast:
-                self.send_log(f"极速模式解答成功，答案为{''.join(answer)}")
-            else:
-                self.send_log(f"AI解答成功，答案为{''.join(answer)}")
+            self.send_log(f"{source}解答成功，答案为{''.join(answer)}")
             failed = []
             for choice in answer:
                 result: TaskDetail = (
@@ -1335,7 +2134,7 @@ class MaaWorker:
                 else:
                     failed.append(choice)
             if failed:
-                if DEBUG_MODE:
+                if self.debug:
                     print(f"[选择题] 选项 {failed} 可能被遮挡，下滑重试")
                 self.tasker.controller.post_swipe(
                     randint(300, 400),
@@ -1344,147 +2143,136 @@ class MaaWorker:
                     randint(300, 400),
                     randint(200, 300),
                 ).wait()
-                time.sleep(0.3)
+                self.wait_until_stable(timeout=1.5)
                 for choice in failed:
                     self.tasker.post_task(f"选{choice}").wait()
                     time.sleep(0.2)
             return True
         if question_type == "填空题":
-            if from_fast:
-                self.send_log(f"极速模式解答成功: {answer}")
+            if source != "AI":
+                self.send_log(f"{source}解答成功: {answer}")
             self.tasker.post_task(
                 "文本框", pipeline_override={"文本框": {"action": "Click"}}
             ).wait()
-            time.sleep(0.5)
+            # 等输入法弹出、输入框获得焦点
+            self.wait_until_stable(timeout=1.5, min_delay=0.2)
             self.tasker.controller.post_input_text(answer).wait()
             return True
         if question_type == "点选填空题":
-            if from_fast:
+            if source == "极速模式":
                 return self._fast_click_blanks(answer)
-            answers = (
-                answer
-                if isinstance(answer, list)
-                else [
-                    a.strip() for a in answer.replace("，", ",").split(",") if a.strip()
-                ]
-            )
-            self.send_log(f"AI识别到 {len(answers)} 个答案: {answers}")
+            answers = split_tokens(answer)
+            self.send_log(f"{source}给出 {len(answers)} 个答案: {answers}")
             return self._click_text_answers(answers)
         return False
 
+    def _click_chips(self, targets: list[tuple[str, list]]) -> list[str]:
+        """依次点击点选填空题选项框，全部点完后只截一次图验证选中状态，返回未选中的选项文字。
+        颜色模型：未选中状态取点击前截图中框内(内缩10px，避开描边)的底色，
+        点击后框内底色与之相差超过 CHIP_SELECTED_DIFF 即为选中。"""
+        before = self.frame()
+        probes = [
+            [x + 10, y + 10, max(1, w - 20), max(1, h - 20)]
+            for _, (x, y, w, h) in targets
+        ]
+        for text, (x, y, w, h) in targets:
+            cx, cy = x + w // 2, y + h // 2
+            if self.debug:
+                print(f'[点选填空题] 点击 "{text}" 位置({cx},{cy})')
+            self.tasker.controller.post_click(cx, cy).wait()
+            time.sleep(0.2)
+        self.invalidate_frame()
+        # 只在选项框所在区域判断画面是否稳定
+        x0 = min(x for x, _, _, _ in probes)
+        y0 = min(y for _, y, _, _ in probes)
+        x1 = max(x + w for x, _, w, _ in probes)
+        y1 = max(y + h for _, y, _, h in probes)
+        self.wait_until_stable(
+            roi=(x0, y0, x1 - x0, y1 - y0), timeout=1.5, changed_from=before
+        )
+        diff = np.abs(
+            roi_medians(self.frame(), probes) - roi_medians(before, probes)
+        ).sum(axis=1)
+        if self.debug:
+            for (text, _), d in zip(targets, diff):
+                print(f'[点选填空题] "{text}" 底色差值={d:.0f}')
+        return [
+            text for (text, _), d in zip(targets, diff) if d <= self.CHIP_SELECTED_DIFF
+        ]
+
+    def _notify_chip_failure(self, message: str):
+        self.send_log(
+            f"[点选填空题] {message}, 请求接管", level="warning", kind="takeover"
+        )
+        plyer.notification.notify(
+            title="MaaXuexi",
+            message=message,
+            app_name="MaaXuexi",
+            timeout=60,
+        )
+        self.pause()
+
     def _fast_click_blanks(self, answer: str) -> bool:
-        """极速点选填空题：扫描选项文字位置 → 按答案顺序逐个点击 → 颜色差值验证选中状态。
-        颜色差值>50判定为选中成功，否则请求接管。"""
+        """极速点选填空题：扫描选项文字位置 → 按答案挑出要点的选项 → 按在答案中的先后依次点击 → 一次截图验证选中状态。
+        有选项未选中则请求接管。点选的词按顺序记入当前题目，答对后以词列表存入题库。"""
         text_positions = self._scan_click_options()
         if not text_positions:
-            self.send_log("[点选填空题] 未识别到选项, 请求接管")
-            plyer.notification.notify(
-                title="MaaXuexi",
-                message="未识别到选项文本",
-                app_name="MaaXuexi",
-                timeout=60,
-            )
-            self.pause()
+            self._notify_chip_failure("未识别到选项文本")
             return True
         self.send_log(
             f'[点选填空题] 答案="{answer}", 选项={list(text_positions.keys())}'
         )
-        clicked_any = False
+        found = []
         remaining = answer
         for text, box in text_positions.items():
-            if text not in remaining:
-                continue
-            cx = box[0] + box[2] // 2
-            cy = box[1] + box[3] // 2
-            img_before = self.tasker.controller.post_screencap().wait().get()
-            color_before = img_before[cy, cx].tolist()
-            if DEBUG_MODE:
-                print(f'[点选填空题] 点击 "{text}" 位置({cx},{cy})')
-            self.tasker.controller.post_click(cx, cy).wait()
-            time.sleep(0.5)
-            img_after = self.tasker.controller.post_screencap().wait().get()
-            color_after = img_after[cy, cx].tolist()
-            diff = sum(abs(int(a) - int(b)) for a, b in zip(color_before, color_after))
-            if diff > 50:
-                clicked_any = True
-                remaining = remaining.replace(text, "", 1)
-                if DEBUG_MODE:
-                    print(f'[点选填空题] "{text}" 选中成功')
-            else:
-                self.send_log(f'[点选填空题] "{text}" 选中失败, 请求接管')
-                plyer.notification.notify(
-                    title="MaaXuexi",
-                    message=f'选项 "{text}" 选中失败',
-                    app_name="MaaXuexi",
-                    timeout=60,
+            pos = remaining.find(text)
+            if pos >= 0:
+                found.append((pos, text, box))
+                # 占位而不删除，保持其余选项在答案中的位置
+                remaining = (
+                    remaining[:pos] + "\0" * len(text) + remaining[pos + len(text) :]
                 )
-                self.pause()
-                return True
-        if not clicked_any:
+        if not found:
             self.send_log("极速点选: 未匹配任何选项, 交给AI")
             return False
+        targets = [(text, box) for _, text, box in sorted(found, key=lambda f: f[0])]
+        if self.current_question is not None:
+            self.current_question["answer"] = [text for text, _ in targets]
+        failed = self._click_chips(targets)
+        if failed:
+            self._notify_chip_failure(f"选项 {failed} 选中失败")
+            return True
         self.send_log("极速点选完成")
         return True
 
     def _click_text_answers(self, answers: list[str]) -> bool:
-        """点选填空题AI流程：AI返回选项文本列表 → 扫描选项位置 → 文字匹配 → 逐个点击 → 颜色验证。
+        """点选填空题AI流程：AI返回选项文本列表 → 扫描选项位置 → 文字匹配 → 依次点击 → 一次截图验证选中状态。
         匹配失败或选中失败则请求接管。"""
         text_positions = self._scan_click_options()
         if not text_positions:
-            self.send_log("[点选填空题] 未识别到选项, 请求接管")
-            plyer.notification.notify(
-                title="MaaXuexi",
-                message="未识别到选项文本",
-                app_name="MaaXuexi",
-                timeout=60,
-            )
-            self.pause()
+            self._notify_chip_failure("未识别到选项文本")
             return True
         self.send_log(
             f"[点选填空题] 选项: {list(text_positions.keys())}, 答案: {answers}"
         )
+        targets = []
         for ans in answers:
-            target_box = None
-            matched_text = None
-            for text, box in text_positions.items():
-                if ans == text or ans in text or text in ans:
-                    target_box = box
-                    matched_text = text
-                    break
-            if target_box is None:
-                self.send_log(f'[点选填空题] 未找到 "{ans}", 请求接管')
-                plyer.notification.notify(
-                    title="MaaXuexi",
-                    message=f'未找到选项 "{ans}", 请求接管',
-                    app_name="MaaXuexi",
-                    timeout=60,
-                )
-                self.pause()
-                return True
-            cx = target_box[0] + target_box[2] // 2
-            cy = target_box[1] + target_box[3] // 2
-            img_before = self.tasker.controller.post_screencap().wait().get()
-            color_before = img_before[cy, cx].tolist()
-            if DEBUG_MODE:
-                print(f'[点选填空题] 点击 "{matched_text}" 位置({cx},{cy})')
-            self.tasker.controller.post_click(cx, cy).wait()
-            time.sleep(0.5)
-            img_after = self.tasker.controller.post_screencap().wait().get()
-            color_after = img_after[cy, cx].tolist()
-            diff = sum(abs(int(a) - int(b)) for a, b in zip(color_before, color_after))
-            if diff > 50:
-                if DEBUG_MODE:
-                    print(f'[点选填空题] "{matched_text}" 选中成功')
-            else:
-                self.send_log(f'[点选填空题] "{matched_text}" 选中失败, 请求接管')
-                plyer.notification.notify(
-                    title="MaaXuexi",
-                    message=f'选项 "{matched_text}" 选中失败, 请求接管',
-                    app_name="MaaXuexi",
-                    timeout=60,
-                )
-                self.pause()
+            match = next(
+                (
+                    (text, box)
+                    for text, box in text_positions.items()
+                    if ans == text or ans in text or text in ans
+                ),
+                None,
+            )
+            if match is None:
+                self._notify_chip_failure(f'未找到选项 "{ans}"')
                 return True
+            targets.append(match)
+        failed = self._click_chips(targets)
+        if failed:
+            self._notify_chip_failure(f"选项 {failed} 选中失败")
+            return True
         self.send_log("点选完成")
         return True
 
@@ -1492,11 +2280,11 @@ class MaaWorker:
         """处理填空题：先检测是否为视频题（视频题直接截图发AI），否则走标准流程 prepare → determine → submit。"""
         if self.stop_flag:
             return False
-        video_result: TaskDetail = self.tasker.post_task("填空题视频").wait().get()
-        if not video_result.status.succeeded:
+        # 填空题视频 节点为 inverse，在当前帧上命中模板即为视频题
+        if self.recognize("填空题视频") is not None:
             self.send_log("发现视频，正在请求AI解答")
-            image = self.tasker.controller.post_screencap().wait().get()
-            if DEBUG_MODE:
+            image = self.frame()
+            if self.debug:
                 print("[AI] 请求填空题解答(视频)")
             answer = self.ai_resolver.resolve_blank([image], False, None)
             if answer is None:
@@ -1506,42 +2294,60 @@ class MaaWorker:
                     app_name="MaaXuexi",
                     timeout=60,
                 )
-                self.send_log("AI解答失败, 请求接管")
+                self.send_log("AI解答失败, 请求接管", level="warning", kind="takeover")
                 self.pause()
                 return False
-            return self._submit_answer("填空题", answer, False)
-        img_list, options, red_texts, blank_num = self._prepare("填空题")
-        answer, from_fast = self._determine_answer(
-            "填空题", options, red_texts, img_list, blank_num
+            return self._submit_answer("填空题", answer, "AI")
+        img_list, options, red_texts, blank_num, ai_future, bank_answer = self._prepare(
+            "填空题"
+        )
+        answer, source = self._determine_answer(
+            "填空题", options, red_texts, img_list, blank_num, ai_future, bank_answer
         )
         if answer is None or answer == "":
             return False
-        return self._submit_answer("填空题", answer, from_fast)
+        return self._submit_answer("填空题", answer, source)
 
-    def _handle_choice(self, question_type) -> bool:
-        """处理单选题/多选题：prepare(OCR选项+红字) → determine(极速匹配/AI) → submit(点击选项)。
-        多选题通过 question_type="多选题" 复用此方法。"""
+    def _handle_choice(self, question_type, options: dict | None = None) -> bool:
+        """处理单选题/多选题：prepare(OCR选项+题库+红字) → determine(题库/极速匹配/AI) → submit(点击选项)。
+        多选题通过 question_type="多选题" 复用此方法；options 为识别题型时扫描到的选项。"""
         if self.stop_flag:
             return False
-        img_list, options, red_texts, blank_num = self._prepare(question_type)
-        answer, from_fast = self._determine_answer(
-            question_type, options, red_texts, img_list, blank_num
+        img_list, options, red_texts, blank_num, ai_future, bank_answer = self._prepare(
+            question_type, options
+        )
+        answer, source = self._determine_answer(
+            question_type,
+            options,
+            red_texts,
+            img_list,
+            blank_num,
+            ai_future,
+            bank_answer,
         )
         if answer is None:
             return False
-        return self._submit_answer(question_type, answer, from_fast)
+        return self._submit_answer(question_type, answer, source)
 
     def _handle_click_blank(self) -> bool:
         """处理点选填空题：prepare → determine(红字拼接/AI) → submit(极速点选/AI点选)。"""
         if self.stop_flag:
             return False
-        img_list, options, red_texts, blank_num = self._prepare("点选填空题")
-        answer, from_fast = self._determine_answer(
-            "点选填空题", options, red_texts, img_list, blank_num
+        img_list, options, red_texts, blank_num, ai_future, bank_answer = self._prepare(
+            "点选填空题"
+        )
+        answer, source = self._determine_answer(
+            "点选填空题",
+            options,
+            red_texts,
+            img_list,
+            blank_num,
+            ai_future,
+            bank_answer,
         )
         if answer is None:
             return False
-        return self._submit_answer("点选填空题", answer, from_fast)
+        return self._submit_answer("点选填空题", answer, source)
 
     def funny_answer(self):
         self.send_log("开始任务：趣味答题")
@@ -0,0 +1,253 @@
+"""纯 NumPy 图像处理工具：游程检测、文本分块、形态学运算等。
+不依赖 MAA，可在无设备环境下单独调用与测速。"""
+
+import numpy as np
+
+
+def find_runs(flags: np.ndarray, min_len: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """一维游程检测：返回连续 True 段的起点数组与终点数组(左闭右开)。
+    只保留长度 > min_len 的段。"""
+    edges = np.diff(flags.astype(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if min_len > 0:
+        keep = ends - starts > min_len
+        starts, ends = starts[keep], ends[keep]
+    return starts, ends
+
+
+def find_runs_2d(
+    flags: np.ndarray, min_len: int = 0
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """逐行游程检测：返回 (行号, 起点, 终点)，按行优先顺序排列。"""
+    edges = np.diff(flags.astype(np.int8), axis=1, prepend=0, append=0)
+    rows, starts = np.nonzero(edges == 1)
+    ends = np.nonzero(edges == -1)[1]
+    if min_len > 0:
+        keep = ends - starts > min_len
+        rows, starts, ends = rows[keep], starts[keep], ends[keep]
+    return rows, starts, ends
+
+
+def _dilate_rows(mask: np.ndarray, k: int) -> np.ndarray:
+    """沿最后一个轴做长度为 k 的滑窗"或"运算，窗口为 [i - k//2, i - k//2 + k)，越界视为 False。
+    先倍增求出长度为 2^j 的窗口(2^j <= k < 2^(j+1))，再用两个重叠窗口拼出长度 k，
+    只需 log2(k) + 1 次整幅"或"运算。"""
+    n = mask.shape[-1]
+    p = k // 2
+    win = np.zeros(mask.shape[:-1] + (n + k - 1,), dtype=bool)
+    win[..., p : p + n] = mask
+    span = 1
+    while span * 2 <= k:
+        win = win[..., :-span] | win[..., span:]
+        span *= 2
+    return win[..., :n] | win[..., k - span : k - span + n]
+
+
+def dilate(mask: np.ndarray, kh: int, kw: int) -> np.ndarray:
+    """形态学膨胀：用 kh×kw 矩形核连接相邻像素。
+    矩形核可分离，行、列各做一次一维滑窗膨胀，耗时随核尺寸按对数增长而非线性增长。
+    锚点与零填充方式与逐偏移"或"的朴素实现一致，结果逐像素相同。"""
+    result = mask
+    if kw > 1:
+        result = _dilate_rows(result, kw)
+    if kh > 1:
+        result = _dilate_rows(result.T, kh).T
+    return result if result is not mask else mask.copy()
+
+
+def red_mask(img: np.ndarray, threshold: int = 50) -> np.ndarray:
+    """红色度过滤：R - max(B, G) > threshold，img 为 BGR"""
+    redness = np.subtract(
+        img[:, :, 2], np.maximum(img[:, :, 0], img[:, :, 1]), dtype=np.int16
+    )
+    return redness > threshold
+
+
+def whiten_crop(img: np.ndarray, mask: np.ndarray, box) -> np.ndarray:
+    """按 [x, y, w, h] 裁剪，mask 为 False 的像素置白。
+    只在块内合成，避免为整张图生成处理后的副本；
+    非掩码像素先展开成 0/255 再与原图按位或，比 np.where 广播到通道快数倍。"""
+    x, y, w, h = box
+    crop = img[y : y + h, x : x + w]
+    fill = np.repeat(~mask[y : y + h, x : x + w], 3, axis=1).view(np.uint8)
+    fill = fill.reshape(crop.shape)
+    fill *= 255
+    fill |= crop
+    return fill
+
+
+def segment_blocks(
+    mask: np.ndarray, min_size: int = 5, pad: int = 5, kw: int = 1
+) -> np.ndarray:
+    """行列扫描分块：先按行找文本行，再在每行内按列找文本块。
+    kw > 1 时等价于先对 mask 做 1×kw 的水平膨胀再分块：水平膨胀不改变哪些行有像素，
+    且与按行求"或"可交换，因此只需膨胀每个文本行的一维列投影，不必膨胀整幅掩码。
+    行高、块宽都需 > min_size，块四周外扩 pad 像素(左上角截断到 0)。
+    返回 N×4 的 [x, y, w, h] 数组，按行优先顺序排列。"""
+    r_starts, r_ends = find_runs(np.any(mask, axis=1), min_size)
+    if r_starts.size == 0:
+        return np.empty((0, 4), dtype=np.intp)
+    # 文本行数很少(十几行)，逐行做列投影即可，行内不做逐像素循环
+    line_cols = np.array(
+        [np.any(mask[r0:r1], axis=0) for r0, r1 in zip(r_starts, r_ends)]
+    )
+    if kw > 1:
+        line_cols = dilate(line_cols, 1, kw)
+    line_idx, c_starts, c_ends = find_runs_2d(line_cols, min_size)
+    y0 = r_starts[line_idx]
+    return np.column_stack(
+        (
+            np.maximum(c_starts - pad, 0),
+            np.maximum(y0 - pad, 0),
+            c_ends - c_starts + 2 * pad,
+            r_ends[line_idx] - y0 + 2 * pad,
+        )
+    )
+
+
+def dhash(img: np.ndarray, size: int = 8) -> int:
+    """差值哈希：灰度图分成 size×(size+1) 个块取均值，比较水平相邻块的明暗，
+    得到 size*size 位整数。对轻微缩放、压缩噪声不敏感，用于图片指纹比对。"""
+    gray = img.mean(axis=2) if img.ndim == 3 else img.astype(np.float64)
+    h, w = gray.shape
+    rows = np.linspace(0, h, size + 1, dtype=np.intp)[:-1]
+    cols = np.linspace(0, w, size + 2, dtype=np.intp)[:-1]
+    sums = np.add.reduceat(np.add.reduceat(gray, rows, axis=0), cols, axis=1)
+    counts = np.outer(np.diff(rows, append=h), np.diff(cols, append=w))
+    means = sums / counts
+    bits = (means[:, 1:] > means[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def pack_crops(
+    crops: list[np.ndarray], gap: int = 32, pad: int = 8
+) -> tuple[np.ndarray, np.ndarray]:
+    """把多块裁剪图左对齐、纵向排列到一张白底画布上，块间留 gap 像素空白，
+    使文字检测不会把相邻两块连成一行。返回 (画布, N×2 的 [起始y, 结束y))。"""
+    heights = np.array([c.shape[0] for c in crops])
+    width = max(c.shape[1] for c in crops) + 2 * pad
+    starts = pad + np.concatenate(([0], np.cumsum(heights[:-1] + gap)))
+    canvas = np.full((starts[-1] + heights[-1] + pad, width, 3), 255, dtype=np.uint8)
+    for crop, y in zip(crops, starts):
+        canvas[y : y + crop.shape[0], pad : pad + crop.shape[1]] = crop[:, :, :3]
+    return canvas, np.column_stack((starts, starts + heights))
+
+
+def assign_rows(boxes: np.ndarray, slots: np.ndarray, gap: int = 32) -> np.ndarray:
+    """按框的纵向中心把 [x, y, w, h] 框分配到 pack_crops 的各块，
+    每块的归属范围上下各外扩半个 gap。返回每个框所属块的下标，不属于任何块为 -1。"""
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.intp)
+    centers = boxes[:, 1] + boxes[:, 3] / 2
+    idx = np.searchsorted(slots[:, 0] - gap / 2, centers, side="right") - 1
+    valid = idx >= 0
+    valid[valid] &= centers[valid] < slots[idx[valid], 1] + gap / 2
+    return np.where(valid, idx, -1)
+
+
+def color_mask(img: np.ndarray, bgr, tol: int = 16) -> np.ndarray:
+    """颜色过滤：各通道与 bgr 相差都不超过 tol 的像素为 True。
+    每个通道先查 256 项的布尔表再按位与，不生成整幅 int16 差值图，比逐像素相减快数倍。"""
+    lut = np.abs(np.arange(256) - np.array(bgr)[:, None]) <= tol
+    return (
+        np.take(lut[0], img[:, :, 0])
+        & np.take(lut[1], img[:, :, 1])
+        & np.take(lut[2], img[:, :, 2])
+    )
+
+
+def label_boxes(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """8 邻域连通域标记：以逐行游程为节点，相邻两行有重叠(含斜对角)的游程相连，
+    用向量化的最小标签传播 + 指针跳跃求连通分量，不逐像素循环。
+    返回 (N×4 的 [x, y, w, h] 外接框, 各连通域像素数)，按左上角行优先排序。"""
+    rows, starts, ends = find_runs_2d(mask)
+    n = rows.size
+    if n == 0:
+        return np.empty((0, 4), dtype=np.intp), np.empty(0, dtype=np.intp)
+    # 行号编入排序键，全图一次 searchsorted 找出每个游程在上一行的重叠范围
+    stride = mask.shape[1] + 1
+    end_keys = rows * stride + ends
+    start_keys = rows * stride + starts
+    above = (rows - 1) * stride
+    lo = np.searchsorted(end_keys, above + starts, side="left")
+    hi = np.searchsorted(start_keys, above + ends, side="right")
+    counts = np.maximum(hi - lo, 0)
+    b = np.repeat(np.arange(n), counts)
+    a = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+    labels = np.arange(n)
+    while True:
+        low = np.minimum(labels[a], labels[b])
+        new = labels.copy()
+        np.minimum.at(new, a, low)
+        np.minimum.at(new, b, low)
+        new = new[new]
+        if np.array_equal(new, labels):
+            break
+        labels = new
+    roots, comp = np.unique(labels, return_inverse=True)
+    m = roots.size
+    x0 = np.full(m, mask.shape[1])
+    y0 = np.full(m, mask.shape[0])
+    x1 = np.zeros(m, dtype=np.intp)
+    y1 = np.zeros(m, dtype=np.intp)
+    np.minimum.at(x0, comp, starts)
+    np.minimum.at(y0, comp, rows)
+    np.maximum.at(x1, comp, ends)
+    np.maximum.at(y1, comp, rows + 1)
+    areas = np.bincount(comp, weights=ends - starts, minlength=m).astype(np.intp)
+    order = np.lexsort((x0, y0))
+    boxes = np.column_stack((x0, y0, x1 - x0, y1 - y0))
+    return boxes[order], areas[order]
+
+
+def thumbnail(img: np.ndarray, step: int) -> np.ndarray:
+    """灰度缩略图：按 step×step 块取均值(不足一块的边缘舍去)，用于快速比较两帧画面是否相同。
+    先在 uint16 上累加行、再累加列与通道，不生成浮点整图，全屏 step=8 约 2ms。"""
+    h, w = img.shape[0] // step * step, img.shape[1] // step * step
+    c = img.shape[2] if img.ndim == 3 else 1
+    rows = img[:h, :w].reshape(h // step, step, w * c).sum(axis=1, dtype=np.uint16)
+    blocks = rows.reshape(h // step, w // step, step * c).sum(axis=2, dtype=np.uint32)
+    return blocks / np.float32(step * step * c)
+
+
+def roi_medians(img: np.ndarray, boxes) -> np.ndarray:
+    """各 [x, y, w, h] 区域的中位色，返回 N×3。文字笔画只占少数像素，中位色即为底色。"""
+    return np.array(
+        [
+            np.median(img[y : y + h, x : x + w].reshape(-1, img.shape[2]), axis=0)
+            for x, y, w, h in boxes
+        ]
+    ).reshape(-1, img.shape[2])
+
+
+def integral(a: np.ndarray, dtype=np.float64) -> np.ndarray:
+    """积分图(二维前缀和)，首行首列补零，任意矩形区域求和只需四次查表。
+    对掩码计数时可用 int32 累加，比 int64/float64 快一倍以上。"""
+    sat = np.zeros((a.shape[0] + 1, a.shape[1] + 1), dtype=dtype)
+    np.cumsum(np.cumsum(a, axis=0, dtype=dtype), axis=1, out=sat[1:, 1:])
+    return sat
+
+
+def box_sums(sat: np.ndarray, x0, y0, x1, y1) -> np.ndarray:
+    """由积分图求 [x0, x1) × [y0, y1) 区域之和，坐标可为任意可广播的数组"""
+    return sat[y1, x1] - sat[y0, x1] - sat[y1, x0] + sat[y0, x0]
+
+
+def box_dhash(sat: np.ndarray, boxes: np.ndarray, size: int = 8) -> np.ndarray:
+    """对多个 [x, y, w, h] 区域同时计算差值哈希，分块方式与 dhash 相同，
+    块均值由灰度积分图查表得到，不裁剪、不逐框循环。
+    返回 N×(size*size/8) 的 uint8 位串，用 hamming 比较。"""
+    x, y, w, h = (boxes[:, i, None] for i in range(4))
+    rows = y + np.arange(size + 1) * h // size
+    cols = x + np.arange(size + 2) * w // (size + 1)
+    r0, r1 = rows[:, :-1, None], rows[:, 1:, None]
+    c0, c1 = cols[:, None, :-1], cols[:, None, 1:]
+    means = box_sums(sat, c0, r0, c1, r1) / np.maximum((r1 - r0) * (c1 - c0), 1)
+    bits = means[:, :, 1:] > means[:, :, :-1]
+    return np.packbits(bits.reshape(len(boxes), -1), axis=1)
+
+
+def hamming(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """两组 uint8 位串两两之间的汉明距离，返回 len(a)×len(b) 矩阵"""
+    return np.bitwise_count(a[:, None, :] ^ b[None, :, :]).sum(axis=2, dtype=np.intp)
@@ -1,9 +1,7 @@
 import asyncio
 import json
-import threading
 import webbrowser
 from contextlib import asynccontextmanager
-from queue import SimpleQueue
 from typing import Literal
 
 from fastapi import FastAPI, websockets
@@ -11,12 +9,20 @@ from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
-from utils import MaaWorker
+from hub import Hub, LogArchive
+from pool import DevicePool
+from utils import MaaWorker, loader, log_event
 
 
 class ConfigModel(BaseModel):
     api_key: str
     model: str = "Qwen/Qwen3.5-35B-A3B"
+    # OpenAI 兼容接口地址，离线压测时可指向 benchmark.mock_ai 模拟服务
+    base_url: str = "https://api.siliconflow.cn/v1"
+    # 对冲请求使用的备用模型，为空则对冲请求仍发给 model
+    hedge_model: str = ""
+    # 分级解答的小模型，为空则所有题目直接使用 model
+    fast_model: str = ""
 
 
 class DeviceModel(BaseModel):
@@ -33,24 +39,37 @@ class TaskModel(BaseModel):
     tasklist: list[Literal["选读文章", "视听学习", "每日答题", "趣味答题"]]
     fast_answer: bool = False
     debug: bool = False
+    # 执行任务的设备地址，为空则使用最近连接的设备
+    device: str | None = None
 
 
 class AppState:
     def __init__(self):
-        self.message_conn = SimpleQueue()
-        self.child_process = None
-        self.worker = None
-        self.history_message = []
+        self.hub = Hub(archive=LogArchive("./logs/webui.log"))
+        self.pool = DevicePool(self.hub)
         self.current_status = None
 
 
 app_state = AppState()
 
 
+def notify_ready(status: dict):
+    timings = ", ".join(f"{name}{ms:.0f}ms" for name, ms in status["timings"].items())
+    if status["ready"]:
+        event = log_event(f"资源加载完成({timings})", kind="ready", **status)
+    else:
+        event = log_event(status["error"], level="error", **status)
+    app_state.hub.put(event)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await asyncio.sleep(1)
-    webbrowser.open_new("http://127.0.0.1:8000")
+    loop = asyncio.get_running_loop()
+    app_state.hub.bind(loop)
+    # 资源在后台加载并预热，服务立即开始响应，进度见 /api/ready 与 ready 事件
+    loader.start(notify_ready)
+    # 浏览器启动远慢于服务开始监听，无需等待
+    loop.run_in_executor(None, webbrowser.open_new, "http://127.0.0.1:8000")
     yield
 
 
@@ -67,103 +86,102 @@ async def serve_homepage():
 def get_settings():
     with open("./config/config.json") as f:
         config = json.load(f)
-    if config["api_key"] != "" and app_state.worker is None:
-        app_state.worker = MaaWorker(
-            app_state.message_conn,
-            api_key=config["api_key"],
-            model=config["model"],
-        )
+    if config["api_key"] != "" and not app_state.pool.ready:
+        # 旧配置文件没有 base_url 等字段，使用默认值
+        app_state.pool.configure(ConfigModel(**config).model_dump())
     return config
 
 
 @app.post("/api/settings")
 def post_settings(config: ConfigModel):
+    # 设置页只提交部分字段，未提交的(如 fast_model、hedge_model)保留 config.json 中的值
+    try:
+        with open("./config/config.json") as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        saved = {}
+    config = ConfigModel(**{**saved, **config.model_dump(exclude_unset=True)})
     with open("./config/config.json", "w") as f:
         f.write(config.model_dump_json(indent=4))
-    if app_state.worker is None:
-        app_state.worker = MaaWorker(
-            app_state.message_conn,
-            api_key=config.api_key,
-            model=config.model,
-        )
-    else:
-        app_state.worker.update_ai_models(model=config.model)
+    app_state.pool.configure(config.model_dump())
     return {"status": "success"}
 
 
 @app.get("/api/get_device")
 def get_device():
-    if app_state.worker is None:
+    if not app_state.pool.ready:
         return {"status": "failed", "message": "MAA未初始化，请先保存设置"}
-    devices = app_state.worker.get_device()
+    devices = MaaWorker.get_device()
     return {"devices": devices}
 
 
 @app.post("/api/connect_device")
 def connect_device(device: DeviceModel):
-    if app_state.worker.connect_device(device):
+    if not app_state.pool.ready:
+        return {"status": "failed", "message": "MAA未初始化，请先保存设置"}
+    if app_state.pool.connect(device):
         return {"status": "success"}
     return {"status": "failed"}
 
 
+@app.get("/api/devices")
+def get_devices():
+    """所有已连接设备的任务状态"""
+    return {"devices": app_state.pool.status()}
+
+
 @app.post("/api/start")
 def start(tasks: TaskModel):
-    if app_state.worker is None:
+    if not app_state.pool.ready:
         return {"status": "failed", "message": "MAA未初始化，请先保存设置"}
-    if app_state.child_process is not None:
-        return {"status": "failed", "message": "任务已开始"}
-    if not app_state.worker.connected:
-        return {"status": "failed", "message": "请先连接设备"}
-    app_state.child_process = threading.Thread(
-        target=app_state.worker.task,
-        args=(tasks.tasklist, tasks.fast_answer, tasks.debug),
-        daemon=True,
+    error = app_state.pool.start(
+        tasks.device, tasks.tasklist, tasks.fast_answer, tasks.debug
     )
-    app_state.child_process.start()
+    if error:
+        return {"status": "failed", "message": error}
     return {"status": "success"}
 
 
 @app.post("/api/stop")
-def stop():
-    if app_state.child_process is None or app_state.worker is None:
-        return {"status": "failed", "message": "任务未开始"}
-    app_state.worker.stop_flag = True
-    app_state.child_process = None
+def stop(device: str | None = None):
+    error = app_state.pool.stop(device)
+    if error:
+        return {"status": "failed", "message": error}
     return {"status": "success"}
 
 
 @app.post("/api/continue")
-def going_on():
-    app_state.worker.pause_flag = False
+def going_on(device: str | None = None):
+    error = app_state.pool.resume(device)
+    if error:
+        return {"status": "failed", "message": error}
     return {"status": "success"}
 
 
+@app.get("/api/ready")
+def ready():
+    """资源加载与模型预热状态：state 为 loading/warming/ready/failed，timings 为各阶段耗时(毫秒)"""
+    return loader.status()
+
+
 @app.get("/api/status")
 def status():
     return {"status": "running"}
 
 
+@app.get("/api/logs")
+def get_logs(before: int | None = None, limit: int = 100):
+    """分页读取磁盘日志：序号小于 before 的最新 limit 条，按序号升序；next 为下一页的 before"""
+    limit = min(max(limit, 1), 1000)
+    entries = app_state.hub.archive.page(before, limit)
+    more = len(entries) == limit and entries[0]["seq"] > 1
+    return {"entries": entries, "next": entries[0]["seq"] if more else None}
+
+
 @app.websocket("/api/ws")
-async def websocket_endpoint(websocket: websockets.WebSocket):
+async def websocket_endpoint(websocket: websockets.WebSocket, since: int = 0):
     await websocket.accept()
-    if app_state.history_message:
-        for i in app_state.history_message:
-            await websocket.send_text(i)
-    while True:
-        if not app_state.message_conn.empty():
-            data = app_state.message_conn.get_nowait()
-            app_state.history_message.append(data)
-            if "所有任务完成" in data:
-                app_state.child_process.join()
-                # 重置状态
-                app_state.child_process = None
-                # app_state.history_message = []
-                await websocket.send_text(data)
-                # await websocket.close()
-                # break
-                continue
-            await websocket.send_text(data)
-        await asyncio.sleep(0.01)
+    await app_state.hub.stream(websocket, since)
 
 
 if __name__ == "__main__":